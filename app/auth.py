@@ -2,12 +2,22 @@ from jose import JWTError, jwt
 from fastapi import HTTPException, Depends, Response, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
+from uuid import UUID
 import bcrypt
+import hashlib
+import logging
+import orjson
+import time
+import redis.asyncio as aioredis
 from datetime import datetime, timedelta
-from app.db import get_db
-from app.models import User, BrandMember, Brand
+from app.db import get_db, get_async_db
+from app.utils.auth import password_hasher
+from app.models import User, BrandMember, BrandMemberStatus, Brand
 
 SECRET_KEY = "yoursecretkey"
 ALGORITHM = "HS256"
@@ -15,6 +25,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 
+logger = logging.getLogger(__name__)
+
+# Redis cache for session lookups (/me and /verify-session are polled by the frontend)
+SESSION_CACHE_TTL = 300  # 5 minutes
+# Connects lazily; each cache call handles Redis being down on its own
+session_cache = aioredis.Redis(host='localhost', port=6379, db=0)
+
 # Pydantic models for login
 class BrandLoginRequest(BaseModel):
     email: str
@@ -28,8 +45,10 @@ class BrandLoginResponse(BaseModel):
     token: Optional[str] = None
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
+    """Verify a password against its hash (Argon2id or legacy bcrypt)."""
     try:
+        if hashed_password.startswith("$argon2"):
+            return password_hasher.verify(hashed_password, plain_password)
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception:
         return False
@@ -75,10 +94,10 @@ def brand_login(email: str, password: str, db: Session) -> dict:
     if not verify_password(password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    # Check if user is active (has any active brand memberships) - case insensitive
+    # Check if user is active (has any active brand memberships)
     brand_member = db.query(BrandMember).filter(
         BrandMember.user_id == user.id,
-        BrandMember.status.in_(["active", "ACTIVE", "Active"])
+        BrandMember.status == BrandMemberStatus.active
     ).first()
     
     if not brand_member:
@@ -93,6 +112,48 @@ def brand_login(email: str, password: str, db: Session) -> dict:
     if brand.status not in ["active", "ACTIVE", "Active", "pending", "PENDING", "Pending"]:
         raise HTTPException(status_code=403, detail="Brand account is not active")
     
+    return _login_result(user, brand, brand_member)
+
+async def async_brand_login(email: str, password: str, db: AsyncSession) -> dict:
+    """Async variant of brand_login for handlers running on the event loop."""
+    
+    # Find user by email
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    
+    # Check if user has password hash
+    if not user.password_hash:
+        raise HTTPException(status_code=401, detail="Account not properly set up")
+    
+    # Password hashing is CPU-bound, keep it off the event loop
+    if not await run_in_threadpool(verify_password, password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    
+    # Check if user is active (has any active brand memberships)
+    brand_member = (await db.execute(
+        select(BrandMember).where(
+            BrandMember.user_id == user.id,
+            BrandMember.status == BrandMemberStatus.active
+        ).limit(1)
+    )).scalar_one_or_none()
+    
+    if not brand_member:
+        raise HTTPException(status_code=403, detail="Account is not active or has no brand access")
+    
+    # Get brand information
+    brand = await db.get(Brand, brand_member.brand_id)
+    if not brand:
+        raise HTTPException(status_code=404, detail="Associated brand not found")
+    
+    # Check if brand is active - case insensitive
+    if brand.status not in ["active", "ACTIVE", "Active", "pending", "PENDING", "Pending"]:
+        raise HTTPException(status_code=403, detail="Brand account is not active")
+    
+    return _login_result(user, brand, brand_member)
+
+def _login_result(user: User, brand: Brand, brand_member: BrandMember) -> dict:
+    """Build the login payload returned by brand_login / async_brand_login."""
     return {
         "user": {
             "id": user.id,
@@ -129,3 +190,68 @@ def get_user_from_cookie(session_token: Optional[str] = Cookie(None), db: Sessio
     
     user = db.query(User).filter(User.id == user_id).first()
     return user
+
+def session_cache_key(session_token: str) -> str:
+    """Redis key for a session token (hashed, so raw tokens never hit Redis)."""
+    return "session:" + hashlib.blake2b(session_token.encode('utf-8'), digest_size=16).hexdigest()
+
+async def get_user_from_cookie_cached(
+    session_token: Optional[str] = Cookie(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[dict]:
+    """Get user info from session cookie token, cached in Redis per token."""
+    if not session_token:
+        return None
+    
+    # Verify the token (signature and expiry) on every request, so a cached
+    # user never outlives the token it was cached for
+    payload = decode_token(session_token)
+    if not payload:
+        return None
+    
+    cache_key = session_cache_key(session_token)
+    try:
+        cached = await session_cache.get(cache_key)
+        if cached:
+            return orjson.loads(cached)
+    except Exception as e:
+        logger.warning(f"Session cache error: {e}")
+    
+    user_id = payload.get("sub")
+    if not user_id:
+        return None
+    
+    try:
+        user = await db.get(User, UUID(user_id))
+    except ValueError:
+        return None
+    if not user:
+        return None
+    
+    user_data = {
+        "id": str(user.id),
+        "email": user.email,
+        "name": user.name,
+        "avatar": user.avatar
+    }
+    
+    # Never cache past the token's own expiry
+    ttl = SESSION_CACHE_TTL
+    if payload.get("exp"):
+        ttl = min(ttl, int(payload["exp"] - time.time()))
+    if ttl > 0:
+        try:
+            await session_cache.setex(cache_key, ttl, orjson.dumps(user_data))
+        except Exception as e:
+            logger.warning(f"Session cache error: {e}")
+    
+    return user_data
+
+async def clear_session_cache(session_token: Optional[str]):
+    """Drop the cached user for a session token (on logout)."""
+    if not session_token:
+        return
+    try:
+        await session_cache.delete(session_cache_key(session_token))
+    except Exception as e:
+        logger.warning(f"Session cache error: {e}")
@@ -1,5 +1,8 @@
 from sqlalchemy import text
 from app.db import engine, Base
+from app.models.product import SEARCH_TSV_EXPRESSION
+from app.services.analytics_rollups import create_rollup_views
+from app.services.user_preferences import USER_PREFERENCES_BACKFILL_SQL
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,6 +10,15 @@ logger = logging.getLogger(__name__)
 def create_tables():
     """Create all database tables with optimized indexes for recommendations"""
     try:
+        # Immutable helper used by the products.search_tsv generated column;
+        # must exist before create_all builds the table
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE OR REPLACE FUNCTION products_tags_text(tags text[])
+                RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                AS $$ SELECT array_to_string(tags, ' ') $$
+            """))
+        
         # Create tables
         Base.metadata.create_all(bind=engine)
         
@@ -42,8 +54,144 @@ def create_tables():
                 ON products (category, brand_id) WHERE combined_vector IS NOT NULL
             """))
             
+            # Database-generated ids for tables created before the server defaults
+            conn.execute(text("ALTER TABLE users ALTER COLUMN id SET DEFAULT gen_random_uuid()"))
+            conn.execute(text("ALTER TABLE brand_members ALTER COLUMN id SET DEFAULT gen_random_uuid()"))
+            
+            # Membership uniqueness backs ON CONFLICT (user_id, brand_id) in the
+            # create endpoints; older databases may predate the model constraint
+            conn.execute(text("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '_user_brand_uc') THEN
+                        ALTER TABLE brand_members
+                        ADD CONSTRAINT _user_brand_uc UNIQUE (user_id, brand_id);
+                    END IF;
+                END
+                $$
+            """))
+            
+            # brand_members.status: free-form text -> brand_member_status enum.
+            # Lowercases existing values; anything outside the enum becomes NULL.
+            conn.execute(text("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'brand_member_status') THEN
+                        CREATE TYPE brand_member_status AS ENUM ('active', 'inactive', 'pending');
+                    END IF;
+                    IF (SELECT data_type FROM information_schema.columns
+                        WHERE table_name = 'brand_members' AND column_name = 'status') <> 'USER-DEFINED' THEN
+                        DROP INDEX IF EXISTS brand_members_active_idx;
+                        ALTER TABLE brand_members ALTER COLUMN status TYPE brand_member_status
+                        USING CASE
+                            WHEN lower(status) IN ('active', 'inactive', 'pending')
+                            THEN lower(status)::brand_member_status
+                        END;
+                    END IF;
+                END
+                $$
+            """))
+            
+            # Full-text search column for databases created before it existed
+            conn.execute(text(f"""
+                ALTER TABLE products ADD COLUMN IF NOT EXISTS search_tsv tsvector 
+                GENERATED ALWAYS AS ({SEARCH_TSV_EXPRESSION}) STORED
+            """))
+            
+            # Trigram matching for fuzzy product-name search
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            
+            # Per-user preference counts: merge helper for the swipe upsert, and a
+            # one-off backfill from the swipe history while the table is empty
+            conn.execute(text("""
+                CREATE OR REPLACE FUNCTION jsonb_add_counts(a jsonb, b jsonb)
+                RETURNS jsonb LANGUAGE sql IMMUTABLE PARALLEL SAFE
+                AS $$
+                    SELECT coalesce(a, '{}') || coalesce(
+                        (SELECT jsonb_object_agg(key, coalesce((a ->> key)::int, 0) + value::int)
+                         FROM jsonb_each_text(b)),
+                        '{}')
+                $$
+            """))
+            conn.execute(USER_PREFERENCES_BACKFILL_SQL)
+            
+            # Pre-aggregated dashboard statistics
+            create_rollup_views(conn)
+            
             conn.commit()
         
+        # Analytics indexes, built CONCURRENTLY so existing tables stay writable.
+        # CONCURRENTLY can't run inside a transaction block, hence AUTOCOMMIT.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Brand event feeds / dashboard: WHERE brand_id = ? ORDER BY timestamp DESC
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bae_brand_ts 
+                ON brand_analytics_events (brand_id, timestamp DESC)
+            """))
+            
+            # Product event feeds
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bae_product_ts 
+                ON brand_analytics_events (product_id, timestamp DESC) 
+                WHERE product_id IS NOT NULL
+            """))
+            
+            # Event feeds filtered by event_type and view counts
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bae_brand_type_ts 
+                ON brand_analytics_events (brand_id, event_type, timestamp DESC)
+            """))
+            
+            # Default product listing order; also the keyset for cursor pagination
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS products_created_id_idx 
+                ON products (created_at DESC, id DESC)
+            """))
+            
+            # Distinct category listing (loose index scan in get_categories)
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS products_category_idx 
+                ON products (category) WHERE category IS NOT NULL
+            """))
+            
+            # Tag lookups (DISTINCT unnest, array containment filters)
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS products_tags_gin 
+                ON products USING GIN (tags)
+            """))
+            
+            # Product full-text search
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS products_search_gin 
+                ON products USING GIN (search_tsv)
+            """))
+            
+            # Fuzzy name matching (name % :q) in semantic recommendations
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS products_name_trgm 
+                ON products USING GIN (name gin_trgm_ops)
+            """))
+            
+            # Partial indexes matching the brand stats predicates
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS brand_members_active_idx 
+                ON brand_members (brand_id) WHERE status = 'active'
+            """))
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS swipes_product_right_idx 
+                ON swipes (product_id) WHERE action = 'right'
+            """))
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS swipes_product_left_idx 
+                ON swipes (product_id) WHERE action = 'left'
+            """))
+            
+            # swipes -> products joins filtered on created_at
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_swipes_product_created 
+                ON swipes (product_id, created_at DESC)
+            """))
+        
         logger.info("✅ Database tables and indexes created successfully")
         
     except Exception as e:
@@ -16,12 +16,18 @@ else:
     print(f"⚠️ No .env file found at {env_path}")
 
 from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import users, products, brands, swipes, wishlist, brand_members, analytics, advanced_search, recommendations, reports
 from app.routers.auth import router as auth_router
 from app.utils.api_key_auth import require_api_key
 from app.db import engine
 from app.create_tables import create_tables
+from app.services.analytics_ingest import event_buffer
+from app.services.analytics_rollups import start_rollup_refresh, stop_rollup_refresh
+from app.services.vector_queue import vector_queue
+from app.services.search_index import init_search_index
+from app.utils.response_cache import init_response_cache
 import logging
 import sys
 from sqlalchemy import text
@@ -42,7 +48,11 @@ logging.getLogger('app.services.recommendations').setLevel(logging.INFO)
 logging.getLogger('app.services.vector_service').setLevel(logging.INFO)
 logging.getLogger('app.utils.vectorization').setLevel(logging.INFO)
 
-app = FastAPI(title="Cloth Brand API", version="1.0.0")
+app = FastAPI(
+    title="Cloth Brand API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 @app.on_event("startup")
 async def startup_event():
@@ -67,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,  # Important for cookies
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset cursor of /recommendations/{user_id}
 )
 
 # Health check endpoint (no authentication required)
@@ -178,6 +189,36 @@ async def startup_event():
     create_tables()
     print("✅ Database tables created/verified")
 
+# Redis-backed cache for listing endpoints
+@app.on_event("startup")
+async def start_response_cache():
+    await init_response_cache()
+
+# Meilisearch product index (search falls back to Postgres without it)
+@app.on_event("startup")
+async def start_search_index():
+    init_search_index()
+
+# Batched background vector generation
+@app.on_event("startup")
+async def start_vector_queue():
+    await vector_queue.start()
+
+@app.on_event("shutdown")
+async def stop_vector_queue():
+    await vector_queue.stop()
+
+# Buffered analytics ingestion
+@app.on_event("startup")
+async def start_analytics_buffer():
+    await event_buffer.start()
+    start_rollup_refresh()
+
+@app.on_event("shutdown")
+async def stop_analytics_buffer():
+    await event_buffer.stop()
+    await stop_rollup_refresh()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
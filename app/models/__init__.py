@@ -2,9 +2,10 @@ from .user import User
 from .role import Role
 from .brand import Brand
 from .user_role import UserRole
-from .brand_member import BrandMember
+from .brand_member import BrandMember, BrandMemberStatus
 from .product import Product
 from .swipe import Swipe
+from .user_preference import UserPreference
 from .wishlist_item import WishlistItem
 from .referral import Referral
 from .brand_analytics_event import BrandAnalyticsEvent
@@ -17,8 +18,10 @@ __all__ = [
     "Brand",
     "UserRole",
     "BrandMember",
+    "BrandMemberStatus",
     "Product",
     "Swipe",
+    "UserPreference",
     "WishlistItem", 
     "Referral",
     "BrandAnalyticsEvent",
@@ -1,18 +1,27 @@
-import uuid
-from sqlalchemy import Column, Text, DateTime, ForeignKey, UniqueConstraint
+import enum
+from sqlalchemy import Column, Text, DateTime, ForeignKey, UniqueConstraint, Enum, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db import Base
 from datetime import datetime
 
+class BrandMemberStatus(str, enum.Enum):
+    active = "active"
+    inactive = "inactive"
+    pending = "pending"
+
 class BrandMember(Base):
     __tablename__ = "brand_members"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     brand_id = Column(UUID(as_uuid=True), ForeignKey("brands.id", ondelete="CASCADE"))
     role = Column(Text)
-    status = Column(Text)
+    status = Column(Enum(
+        BrandMemberStatus,
+        name="brand_member_status",
+        values_callable=lambda statuses: [status.value for status in statuses]
+    ))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
     
@@ -1,10 +1,19 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, ARRAY, JSON, DateTime, Boolean, Numeric
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, ARRAY, JSON, DateTime, Boolean, Numeric, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db import Base
 from datetime import datetime
 
+# Generated columns need an immutable expression; array_to_string is only STABLE,
+# so tags go through the immutable products_tags_text() wrapper (see create_tables)
+SEARCH_TSV_EXPRESSION = (
+    "to_tsvector('english', "
+    "coalesce(name, '') || ' ' || "
+    "coalesce(description, '') || ' ' || "
+    "coalesce(products_tags_text(tags), ''))"
+)
+
 class Product(Base):
     __tablename__ = "products"
     
@@ -28,6 +37,13 @@ class Product(Base):
     combined_vector = Column(ARRAY(Float), nullable=True, comment='Combined image+text vector')
     vector_metadata = Column(Text, nullable=True, comment='JSON metadata about vectors')
     
+    # Full-text search document, maintained by Postgres and GIN indexed
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(SEARCH_TSV_EXPRESSION, persisted=True),
+        comment='Generated full-text search vector'
+    ))
+    
     # Relationships
     brand = relationship("Brand", back_populates="products")
     swipes = relationship("Swipe", back_populates="product")
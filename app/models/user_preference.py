@@ -0,0 +1,17 @@
+from sqlalchemy import Column, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.db import Base
+from datetime import datetime
+
+class UserPreference(Base):
+    """Per-user swipe counts by category, brand and tag, maintained on swipe"""
+    __tablename__ = "user_preferences"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # {category: count}, {brand_id: count}, {tag: count}
+    liked_categories = Column(JSONB, nullable=False, default=dict)
+    disliked_categories = Column(JSONB, nullable=False, default=dict)
+    liked_brands = Column(JSONB, nullable=False, default=dict)
+    disliked_brands = Column(JSONB, nullable=False, default=dict)
+    liked_tags = Column(JSONB, nullable=False, default=dict)
+    updated_at = Column(DateTime, default=datetime.utcnow)
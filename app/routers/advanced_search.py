@@ -6,6 +6,8 @@ from app.db import get_db
 from app.models import Product
 from app.schemas import Product as ProductSchema
 from app.services.search_service import SearchService
+from app.services.random_products import random_products
+from app.services.query_helpers import not_swiped_by
 
 router = APIRouter()
 
@@ -187,7 +189,7 @@ def get_discovery_products(
     
     if not user_swipes:
         # If no swipes, return random products
-        return db.query(Product).order_by(func.random()).limit(limit).all()
+        return random_products(db.query(Product), limit)
     
     # Extract preferences
     preferred_categories = set()
@@ -199,15 +201,12 @@ def get_discovery_products(
         if swipe.product.brand_id:
             preferred_brands.add(swipe.product.brand_id)
     
-    # Get swiped product IDs
-    swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(Swipe.user_id == user_id).all())
-    
-    # Find products outside preferences
-    discovery_query = db.query(Product).filter(~Product.id.in_(swiped_ids))
+    # Find unswiped products outside preferences (anti-join, no id list round-trip)
+    discovery_query = db.query(Product).filter(not_swiped_by(user_id))
     
     if preferred_categories:
         discovery_query = discovery_query.filter(~Product.category.in_(preferred_categories))
     if preferred_brands:
         discovery_query = discovery_query.filter(~Product.brand_id.in_(preferred_brands))
     
-    return discovery_query.order_by(func.random()).limit(limit).all() 
\ No newline at end of file
+    return random_products(discovery_query, limit) 
\ No newline at end of file
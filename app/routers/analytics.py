@@ -1,184 +1,300 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract, case, text
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, lambda_stmt, exists, literal, bindparam, any_, func, and_, case, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime, timedelta
 import time
+import orjson
+from collections import defaultdict
 from functools import lru_cache
-from app.db import get_db
+from threading import RLock
+from cachetools import TTLCache
+from app.db import get_async_db, AsyncSessionLocal
 from app.models import BrandAnalyticsEvent, Brand, Product, User, Swipe
 from app.schemas import BrandAnalyticsEvent as AnalyticsEventSchema, BrandAnalyticsEventCreate
 from app.services.advanced_analytics import AdvancedAnalytics
+from app.services.analytics_ingest import event_buffer, build_event_record
+from app.services import analytics_rollups
+from app.services.analytics_rollups import brand_daily_swipe_stats as daily_stats, brand_day_uu
 
 router = APIRouter()
 
 # Simple in-memory cache for expensive calculations (in production, use Redis)
-_analytics_cache = {}
 CACHE_TTL = 300  # 5 minutes
+_analytics_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL)
+_brand_cache_keys: Dict[str, set] = defaultdict(set)  # brand_id -> cache keys
+_cache_lock = RLock()
+# Brands recently confirmed to exist; lets track_event skip the validation round-trip
+_confirmed_brands = TTLCache(maxsize=4096, ttl=60)
+UUID_ARRAY = ARRAY(PG_UUID(as_uuid=True))
+BRAND_EVENT_TYPES = ['view_brand', 'view_product', 'swipe_right', 'swipe_left', 'wishlist_save', 'click_link']
+PRODUCT_EVENT_TYPES = ['view_product', 'swipe_right', 'swipe_left', 'wishlist_save', 'click_link']
+MAX_BATCH_EVENTS = 1000  # events accepted per /batch request
+EXPORT_BATCH_SIZE = 1000  # rows fetched per round-trip when streaming exports
+# Timestamps are stored as naive UTC; orjson encodes UUIDs natively
+EXPORT_JSON_OPTIONS = orjson.OPT_SERIALIZE_UUID | orjson.OPT_NAIVE_UTC
+
+_CACHE_TTL_NS = CACHE_TTL * 1_000_000_000
+
+@lru_cache(maxsize=4096)
+def _format_cache_key(brand_id: str, days: int, endpoint: str, bucket: int) -> str:
+    return f"{endpoint}:{brand_id}:{days}:{bucket}"
+
+# Weekly activity zero-filled in Sun..Sat order (json, not jsonb, keeps key order)
+# and the top 5 products by swipes, in the response's final shape.
+DASHBOARD_SHAPE_SQL = text("""
+    SELECT
+        (
+            SELECT json_object_agg(d.name, COALESCE(w.swipes, 0) ORDER BY d.dow)
+            FROM (VALUES (0, 'Sun'), (1, 'Mon'), (2, 'Tue'), (3, 'Wed'),
+                         (4, 'Thu'), (5, 'Fri'), (6, 'Sat')) AS d(dow, name)
+            LEFT JOIN (
+                SELECT extract(dow FROM day)::int AS dow, sum(swipes)::bigint AS swipes
+                FROM brand_daily_swipe_stats
+                WHERE brand_id = :brand_id AND day >= :start_day
+                GROUP BY 1
+            ) w ON w.dow = d.dow
+        ) AS weekly_activity,
+        (
+            SELECT COALESCE(json_agg(json_build_object(
+                       'product', t.name,
+                       'swipes', t.total_swipes,
+                       'likes', t.likes,
+                       'rate', COALESCE(round(100.0 * t.likes / NULLIF(t.total_swipes, 0), 1), 0)
+                   ) ORDER BY t.total_swipes DESC), '[]'::json)
+            FROM (
+                SELECT p.name,
+                       count(s.id) AS total_swipes,
+                       count(*) FILTER (WHERE s.action = 'like') AS likes
+                FROM products p
+                JOIN swipes s ON s.product_id = p.id
+                WHERE p.brand_id = :brand_id AND s.created_at >= :start_date
+                GROUP BY p.id, p.name
+                ORDER BY count(s.id) DESC
+                LIMIT 5
+            ) t
+        ) AS top_performing_products
+""")
 
 def get_cache_key(brand_id: UUID, days: int, endpoint: str) -> str:
     """Generate cache key for analytics data"""
-    return f"{endpoint}:{brand_id}:{days}:{int(time.time() // CACHE_TTL)}"
+    return _format_cache_key(str(brand_id), days, endpoint, time.monotonic_ns() // _CACHE_TTL_NS)
 
 def get_cached_data(cache_key: str) -> Optional[Dict]:
     """Get data from cache if available and not expired"""
-    if cache_key in _analytics_cache:
-        cached_time, data = _analytics_cache[cache_key]
-        if time.time() - cached_time < CACHE_TTL:
-            return data
-        else:
-            del _analytics_cache[cache_key]
-    return None
+    with _cache_lock:
+        return _analytics_cache.get(cache_key)
 
-def set_cached_data(cache_key: str, data: Dict):
-    """Store data in cache with timestamp"""
-    _analytics_cache[cache_key] = (time.time(), data)
-    # Keep cache size manageable (max 100 entries)
-    if len(_analytics_cache) > 100:
-        oldest_key = min(_analytics_cache.keys(), key=lambda k: _analytics_cache[k][0])
-        del _analytics_cache[oldest_key]
+def set_cached_data(cache_key: str, data: Dict, brand_id: UUID):
+    """Store data in cache and remember which brand it belongs to"""
+    with _cache_lock:
+        _analytics_cache[cache_key] = data
+        # Drop keys that have expired or been evicted so the index stays small
+        brand_keys = {k for k in _brand_cache_keys[str(brand_id)] if k in _analytics_cache}
+        brand_keys.add(cache_key)
+        _brand_cache_keys[str(brand_id)] = brand_keys
 
-@router.post("/", response_model=AnalyticsEventSchema, status_code=status.HTTP_201_CREATED)
-def track_event(event: BrandAnalyticsEventCreate, request: Request, db: Session = Depends(get_db)):
-    """Track a brand analytics event."""
-    # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == event.brand_id).first()
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
-    
-    # Validate product exists if product_id is provided
-    if event.product_id:
-        product = db.query(Product).filter(Product.id == event.product_id).first()
-        if not product:
+def _clear_brand_cache(brand_ids):
+    """Drop cached analytics for the given brands so new events show up."""
+    with _cache_lock:
+        for brand_id in brand_ids:
+            for key in _brand_cache_keys.pop(str(brand_id), ()):
+                _analytics_cache.pop(key, None)
+
+# Cached analytics are dropped once new events are actually written, not when
+# they are queued (a read in between would re-cache the old numbers)
+event_buffer.add_flush_listener(_clear_brand_cache)
+
+def _event_data(event: BrandAnalyticsEventCreate, client_ip: Optional[str]) -> Dict[str, Any]:
+    """Column values for an event, defaulting ip_address to the caller's address."""
+    event_data = event.dict(exclude={"event_metadata"})
+    if not event_data.get("ip_address") and client_ip:
+        event_data["ip_address"] = client_ip
+    return event_data
+
+@router.post("/", response_model=AnalyticsEventSchema, status_code=status.HTTP_202_ACCEPTED)
+async def track_event(event: BrandAnalyticsEventCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Track a brand analytics event (written asynchronously in batches)."""
+    # Validate brand, product and user in a single round-trip
+    # (skipped entirely for recently confirmed brands with no product/user)
+    brand_known = event.brand_id in _confirmed_brands
+    if not (brand_known and not event.product_id and not event.user_id):
+        refs = (await db.execute(
+            select(
+                (literal(True) if brand_known
+                 else exists().where(Brand.id == event.brand_id)).label('brand'),
+                (exists().where(Product.id == event.product_id) if event.product_id
+                 else literal(True)).label('product'),
+                (exists().where(User.id == event.user_id) if event.user_id
+                 else literal(True)).label('user')
+            )
+        )).one()
+        
+        if not refs.brand:
+            raise HTTPException(status_code=404, detail="Brand not found")
+        if not refs.product:
             raise HTTPException(status_code=404, detail="Product not found")
-    
-    # Validate user exists if user_id is provided
-    if event.user_id:
-        user = db.query(User).filter(User.id == event.user_id).first()
-        if not user:
+        if not refs.user:
             raise HTTPException(status_code=404, detail="User not found")
+        _confirmed_brands[event.brand_id] = True
     
     # Extract IP address from request
     client_ip = request.client.host if request.client else None
     
-    # Create analytics event
-    event_data = event.dict()
-    if not event_data.get("ip_address") and client_ip:
-        event_data["ip_address"] = client_ip
+    # Queue analytics event; id and timestamp are assigned here
+    event_data = _event_data(event, client_ip)
+    await event_buffer.enqueue([build_event_record(event_data)])
     
-    db_event = BrandAnalyticsEvent(**event_data)
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    return event_data
+
+@router.post("/batch", response_model=List[AnalyticsEventSchema], status_code=status.HTTP_202_ACCEPTED)
+async def track_events_batch(
+    events: List[BrandAnalyticsEventCreate],
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Track many brand analytics events in one request."""
+    if not events:
+        return []
+    if len(events) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=400, detail=f"Too many events. Maximum {MAX_BATCH_EVENTS} per batch.")
+    
+    # A single bad reference would fail the whole bulk write, so validate up front
+    for model, ids, label in (
+        (Brand, {e.brand_id for e in events}, "Brand"),
+        (Product, {e.product_id for e in events if e.product_id}, "Product"),
+        (User, {e.user_id for e in events if e.user_id}, "User"),
+    ):
+        if model is Brand:
+            ids = {i for i in ids if i not in _confirmed_brands}
+        if not ids:
+            continue
+        found = set((await db.execute(
+            select(model.id).where(model.id == any_(bindparam('ids', type_=UUID_ARRAY))),
+            {'ids': list(ids)}
+        )).scalars().all())
+        missing = ids - found
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"{label} not found: {', '.join(str(i) for i in missing)}"
+            )
+    
+    client_ip = request.client.host if request.client else None
+    
+    for event in events:
+        _confirmed_brands[event.brand_id] = True
     
-    # Clear cache for this brand to ensure fresh data
-    cache_keys_to_clear = [k for k in _analytics_cache.keys() if str(event.brand_id) in k]
-    for key in cache_keys_to_clear:
-        del _analytics_cache[key]
+    event_rows = [_event_data(event, client_ip) for event in events]
+    await event_buffer.enqueue([build_event_record(row) for row in event_rows])
     
-    return db_event
+    return event_rows
 
 @router.get("/brand/{brand_id}", response_model=List[AnalyticsEventSchema])
-def get_brand_events(
+async def get_brand_events(
     brand_id: UUID,
     event_type: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get analytics events for a specific brand."""
     # Limit maximum results to prevent performance issues
     limit = min(limit, 1000)
     
-    query = db.query(BrandAnalyticsEvent).filter(BrandAnalyticsEvent.brand_id == brand_id)
+    query = lambda_stmt(
+        lambda: select(*BrandAnalyticsEvent.__table__.c).where(BrandAnalyticsEvent.brand_id == brand_id)
+    )
     
     if event_type:
-        query = query.filter(BrandAnalyticsEvent.event_type == event_type)
+        query += lambda q: q.where(BrandAnalyticsEvent.event_type == event_type)
     
-    events = query.order_by(BrandAnalyticsEvent.timestamp.desc()).offset(skip).limit(limit).all()
-    return events
+    query += lambda q: q.order_by(BrandAnalyticsEvent.timestamp.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.mappings().all()
 
 @router.get("/product/{product_id}", response_model=List[AnalyticsEventSchema])
-def get_product_events(
+async def get_product_events(
     product_id: UUID,
     event_type: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get analytics events for a specific product."""
     # Limit maximum results to prevent performance issues
     limit = min(limit, 1000)
     
-    query = db.query(BrandAnalyticsEvent).filter(BrandAnalyticsEvent.product_id == product_id)
+    query = lambda_stmt(
+        lambda: select(*BrandAnalyticsEvent.__table__.c).where(BrandAnalyticsEvent.product_id == product_id)
+    )
     
     if event_type:
-        query = query.filter(BrandAnalyticsEvent.event_type == event_type)
+        query += lambda q: q.where(BrandAnalyticsEvent.event_type == event_type)
     
-    events = query.order_by(BrandAnalyticsEvent.timestamp.desc()).offset(skip).limit(limit).all()
-    return events
+    query += lambda q: q.order_by(BrandAnalyticsEvent.timestamp.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return result.mappings().all()
+
+def _event_type_counts(event_types: List[str]) -> List:
+    """One count(*) FILTER (WHERE event_type = ...) column per event type."""
+    return [
+        func.count().filter(BrandAnalyticsEvent.event_type == event_type).label(event_type)
+        for event_type in event_types
+    ]
+
+BRAND_STAT_COLUMNS = _event_type_counts(BRAND_EVENT_TYPES)
+PRODUCT_STAT_COLUMNS = _event_type_counts(PRODUCT_EVENT_TYPES)
 
 @router.get("/stats/brand/{brand_id}")
-def get_brand_stats(brand_id: UUID, db: Session = Depends(get_db)):
+async def get_brand_stats(brand_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get analytics statistics for a brand."""
-    # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
-    if not brand:
+    # Existence check and all counts in a single row
+    row = (await db.execute(lambda_stmt(
+        lambda: select(
+            exists().where(Brand.id == brand_id).label('found'),
+            *BRAND_STAT_COLUMNS
+        ).where(
+            BrandAnalyticsEvent.brand_id == brand_id
+        )
+    ))).one()
+    
+    if not row.found:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Use a single optimized query instead of multiple queries
-    event_counts = db.query(
-        BrandAnalyticsEvent.event_type,
-        func.count(BrandAnalyticsEvent.id).label('count')
-    ).filter(
-        BrandAnalyticsEvent.brand_id == brand_id
-    ).group_by(
-        BrandAnalyticsEvent.event_type
-    ).all()
-    
-    # Convert to dictionary format
-    result = {event_type: 0 for event_type in ['view_brand', 'view_product', 'swipe_right', 'swipe_left', 'wishlist_save', 'click_link']}
-    for event_type, count in event_counts:
-        result[event_type] = count
-    
-    return result
+    return {event_type: row._mapping[event_type] for event_type in BRAND_EVENT_TYPES}
 
 @router.get("/stats/product/{product_id}")
-def get_product_stats(product_id: UUID, db: Session = Depends(get_db)):
+async def get_product_stats(product_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get analytics statistics for a product."""
-    # Validate product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    # Existence check and all counts in a single row
+    row = (await db.execute(lambda_stmt(
+        lambda: select(
+            exists().where(Product.id == product_id).label('found'),
+            *PRODUCT_STAT_COLUMNS
+        ).where(
+            BrandAnalyticsEvent.product_id == product_id
+        )
+    ))).one()
+    
+    if not row.found:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Use a single optimized query
-    event_counts = db.query(
-        BrandAnalyticsEvent.event_type,
-        func.count(BrandAnalyticsEvent.id).label('count')
-    ).filter(
-        BrandAnalyticsEvent.product_id == product_id
-    ).group_by(
-        BrandAnalyticsEvent.event_type
-    ).all()
-    
-    # Convert to dictionary format
-    result = {event_type: 0 for event_type in ['view_product', 'swipe_right', 'swipe_left', 'wishlist_save', 'click_link']}
-    for event_type, count in event_counts:
-        result[event_type] = count
-    
-    return result
+    return {event_type: row._mapping[event_type] for event_type in PRODUCT_EVENT_TYPES}
 
 @router.get("/dashboard/{brand_id}/overview")
-def get_dashboard_overview(
+async def get_dashboard_overview(
     brand_id: UUID,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get comprehensive dashboard analytics for the last N days."""
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
@@ -197,36 +313,54 @@ def get_dashboard_overview(
         start_date = end_date - timedelta(days=days)
         previous_start_date = start_date - timedelta(days=days)
         
-        # Single optimized query for all swipe statistics
-        swipe_stats = db.query(
-            func.count(Swipe.id).label('total_swipes'),
-            func.count(case((Swipe.action == 'like', 1))).label('total_likes'),
-            func.count(case((Swipe.action == 'dislike', 1))).label('total_dislikes'),
-            func.count(func.distinct(Swipe.user_id)).label('unique_users')
-        ).join(Product).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= start_date
+        # The rollup view is bucketed per day
+        start_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        previous_start_day = start_day - timedelta(days=days)
+        
+        # Current and previous period totals from the pre-aggregated daily rollup
+        # (lambda_stmt: the statement is built and compiled once, then only re-bound)
+        swipe_stats = (await db.execute(lambda_stmt(
+            lambda: select(
+                func.coalesce(func.sum(daily_stats.c.swipes).filter(daily_stats.c.day >= start_day), 0).label('total_swipes'),
+                func.coalesce(func.sum(daily_stats.c.likes).filter(daily_stats.c.day >= start_day), 0).label('total_likes'),
+                func.coalesce(func.sum(daily_stats.c.dislikes).filter(daily_stats.c.day >= start_day), 0).label('total_dislikes'),
+                func.coalesce(func.sum(daily_stats.c.swipes).filter(daily_stats.c.day < start_day), 0).label('prev_total_swipes'),
+                func.coalesce(func.sum(daily_stats.c.likes).filter(daily_stats.c.day < start_day), 0).label('prev_total_likes')
+            ).where(
+                and_(
+                    daily_stats.c.brand_id == brand_id,
+                    daily_stats.c.day >= previous_start_day
+                )
             )
-        ).first()
-        
-        # Previous period stats
-        prev_swipe_stats = db.query(
-            func.count(Swipe.id).label('total_swipes'),
-            func.count(case((Swipe.action == 'like', 1))).label('total_likes')
-        ).join(Product).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= previous_start_date,
-                Swipe.created_at < start_date
-            )
-        ).first()
+        ))).first()
+        
+        # Distinct users can't be summed across days: merge the per-day HLL
+        # sketches when available, otherwise count on the base table
+        if analytics_rollups.HLL_ENABLED:
+            unique_users = (await db.execute(
+                select(func.hll_cardinality(func.hll_union_agg(brand_day_uu.c.uu))).where(
+                    and_(
+                        brand_day_uu.c.brand_id == brand_id,
+                        brand_day_uu.c.day >= start_day.date()
+                    )
+                )
+            )).scalar()
+            unique_users = int(round(unique_users or 0))
+        else:
+            unique_users = (await db.execute(
+                select(func.count(func.distinct(Swipe.user_id))).join(Product).where(
+                    and_(
+                        Product.brand_id == brand_id,
+                        Swipe.created_at >= start_date
+                    )
+                )
+            )).scalar()
         
         # Calculate metrics
-        total_swipes_current = swipe_stats.total_swipes or 0
-        total_swipes_previous = prev_swipe_stats.total_swipes or 0
-        total_likes = swipe_stats.total_likes or 0
-        total_dislikes = swipe_stats.total_dislikes or 0
+        total_swipes_current = int(swipe_stats.total_swipes)
+        total_swipes_previous = int(swipe_stats.prev_total_swipes)
+        total_likes = int(swipe_stats.total_likes)
+        total_dislikes = int(swipe_stats.total_dislikes)
         
         # Calculate percentage change
         swipe_change_percent = 0
@@ -240,74 +374,33 @@ def get_dashboard_overview(
         
         # Previous conversion rate
         prev_conversion_rate = 0
-        if prev_swipe_stats.total_swipes > 0:
-            prev_conversion_rate = (prev_swipe_stats.total_likes / prev_swipe_stats.total_swipes) * 100
+        if total_swipes_previous > 0:
+            prev_conversion_rate = (int(swipe_stats.prev_total_likes) / total_swipes_previous) * 100
         
         conversion_change = conversion_rate - prev_conversion_rate
         
-        # Weekly Activity - optimized query
-        weekly_data = db.query(
-            extract('dow', Swipe.created_at).label('day_of_week'),
-            func.count(Swipe.id).label('count')
-        ).join(Product).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= start_date
-            )
-        ).group_by(
-            extract('dow', Swipe.created_at)
-        ).all()
-        
-        days_of_week = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
-        weekly_activity = {day: 0 for day in days_of_week}
-        
-        for day_data in weekly_data:
-            day_name = days_of_week[int(day_data.day_of_week)]
-            weekly_activity[day_name] = day_data.count
-        
-        # Top Performing Products - optimized with limit
-        top_products = db.query(
-            Product.id,
-            Product.name,
-            func.count(Swipe.id).label('total_swipes'),
-            func.count(case((Swipe.action == 'like', 1))).label('likes')
-        ).join(Swipe).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= start_date
-            )
-        ).group_by(
-            Product.id,
-            Product.name
-        ).order_by(
-            func.count(Swipe.id).desc()
-        ).limit(5).all()
-        
-        top_performing_products = []
-        for product in top_products:
-            like_rate = 0
-            if product.total_swipes > 0:
-                like_rate = (product.likes / product.total_swipes) * 100
-            
-            top_performing_products.append({
-                "product": product.name,
-                "swipes": product.total_swipes,
-                "likes": product.likes,
-                "rate": round(like_rate, 1)
-            })
+        # Weekly activity and top products, already shaped as JSON by Postgres
+        dashboard_shape = (await db.execute(
+            DASHBOARD_SHAPE_SQL,
+            {"brand_id": brand_id, "start_date": start_date, "start_day": start_day}
+        )).one()
+        weekly_activity = dashboard_shape.weekly_activity
+        top_performing_products = dashboard_shape.top_performing_products
         
         # Quick Stats - optimized queries
-        total_views = db.query(func.count(BrandAnalyticsEvent.id)).filter(
-            and_(
-                BrandAnalyticsEvent.brand_id == brand_id,
-                BrandAnalyticsEvent.timestamp >= start_date,
-                BrandAnalyticsEvent.event_type == 'view_product'
+        total_views = (await db.execute(
+            select(func.count(BrandAnalyticsEvent.id)).where(
+                and_(
+                    BrandAnalyticsEvent.brand_id == brand_id,
+                    BrandAnalyticsEvent.timestamp >= start_date,
+                    BrandAnalyticsEvent.event_type == 'view_product'
+                )
             )
-        ).scalar() or 0
+        )).scalar() or 0
         
         # Engagement Rate
-        total_users = db.query(func.count(User.id)).scalar() or 1
-        active_users = swipe_stats.unique_users or 0
+        total_users = (await db.execute(select(func.count(User.id)))).scalar() or 1
+        active_users = unique_users or 0
         engagement_rate = (active_users / total_users) * 100
         
         # Prepare response
@@ -349,7 +442,7 @@ def get_dashboard_overview(
         }
         
         # Cache the result
-        set_cached_data(cache_key, response_data)
+        set_cached_data(cache_key, response_data, brand_id)
         
         return response_data
         
@@ -359,130 +452,138 @@ def get_dashboard_overview(
             detail=f"Error generating dashboard overview: {str(e)}"
         )
 
+async def _stream_export(brand_id: UUID, start: datetime, end: datetime,
+                         start_date: str, end_date: str, limit: int):
+    """Yield the export document as JSON chunks using server-side cursors."""
+    # Plain column tuples: no ORM identity map or instrumentation per row
+    swipes_stmt = select(
+        Swipe.id, Swipe.user_id, Swipe.product_id, Swipe.action, Swipe.created_at
+    ).join(Product).where(
+        and_(
+            Product.brand_id == brand_id,
+            Swipe.created_at >= start,
+            Swipe.created_at <= end
+        )
+    ).limit(limit).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    events_stmt = select(
+        BrandAnalyticsEvent.id,
+        BrandAnalyticsEvent.event_type,
+        BrandAnalyticsEvent.user_id,
+        BrandAnalyticsEvent.product_id,
+        BrandAnalyticsEvent.brand_id,
+        BrandAnalyticsEvent.timestamp
+    ).where(
+        and_(
+            BrandAnalyticsEvent.brand_id == brand_id,
+            BrandAnalyticsEvent.timestamp >= start,
+            BrandAnalyticsEvent.timestamp <= end
+        )
+    ).limit(limit).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    # Use a dedicated session: the request-scoped one may already be closed
+    # by the time the response body is being sent.
+    async with AsyncSessionLocal() as session:
+        yield b'{"date_range":' + orjson.dumps({"start": start_date, "end": end_date})
+        
+        swipe_count = 0
+        yield b',"swipes":['
+        async for swipe in (await session.stream(swipes_stmt)).mappings():
+            row = orjson.dumps(dict(swipe), option=EXPORT_JSON_OPTIONS)
+            yield row if swipe_count == 0 else b',' + row
+            swipe_count += 1
+        
+        event_count = 0
+        yield b'],"analytics_events":['
+        async for event in (await session.stream(events_stmt)).mappings():
+            row = orjson.dumps(dict(event), option=EXPORT_JSON_OPTIONS)
+            yield row if event_count == 0 else b',' + row
+            event_count += 1
+        
+        yield b'],"record_count":' + orjson.dumps({
+            "swipes": swipe_count,
+            "analytics_events": event_count
+        }) + b'}'
+
 @router.get("/dashboard/{brand_id}/export")
-def export_analytics_data(
+async def export_analytics_data(
     brand_id: UUID,
     start_date: str,
     end_date: str,
     format: str = "json",
     limit: int = 10000,  # Add limit parameter
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Export analytics data for a specific brand and date range."""
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
+    # Parse dates
     try:
-        # Parse dates
-        try:
-            start = datetime.fromisoformat(start_date)
-            end = datetime.fromisoformat(end_date)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DD)")
-        
-        # Limit date range to prevent performance issues
-        max_days = 90  # Max 3 months
-        if (end - start).days > max_days:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Date range too large. Maximum {max_days} days allowed."
-            )
-        
-        # Limit results to prevent memory issues
-        limit = min(limit, 50000)  # Max 50k records
-        
-        # Get swipes with limit and pagination
-        swipes = db.query(Swipe).join(Product).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= start,
-                Swipe.created_at <= end
-            )
-        ).limit(limit).all()
-        
-        # Get analytics events with limit
-        events = db.query(BrandAnalyticsEvent).filter(
-            and_(
-                BrandAnalyticsEvent.brand_id == brand_id,
-                BrandAnalyticsEvent.timestamp >= start,
-                BrandAnalyticsEvent.timestamp <= end
-            )
-        ).limit(limit).all()
-        
-        export_data = {
-            "date_range": {
-                "start": start_date,
-                "end": end_date
-            },
-            "record_count": {
-                "swipes": len(swipes),
-                "analytics_events": len(events)
-            },
-            "swipes": [
-                {
-                    "id": str(swipe.id),
-                    "user_id": str(swipe.user_id),
-                    "product_id": str(swipe.product_id),
-                    "action": swipe.action,
-                    "created_at": swipe.created_at.isoformat()
-                }
-                for swipe in swipes
-            ],
-            "analytics_events": [
-                {
-                    "id": str(event.id),
-                    "event_type": event.event_type,
-                    "user_id": str(event.user_id) if event.user_id else None,
-                    "product_id": str(event.product_id) if event.product_id else None,
-                    "brand_id": str(event.brand_id) if event.brand_id else None,
-                    "timestamp": event.timestamp.isoformat()
-                }
-                for event in events
-            ]
-        }
-        
-        return export_data
-    except HTTPException:
-        raise
-    except Exception as e:
+        start = datetime.fromisoformat(start_date)
+        end = datetime.fromisoformat(end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DD)")
+    
+    # Limit date range to prevent performance issues
+    max_days = 90  # Max 3 months
+    if (end - start).days > max_days:
         raise HTTPException(
-            status_code=500, 
-            detail=f"Error exporting analytics data: {str(e)}"
+            status_code=400, 
+            detail=f"Date range too large. Maximum {max_days} days allowed."
         )
+    
+    # Limit results to prevent memory issues
+    limit = min(limit, 50000)  # Max 50k records
+    
+    return StreamingResponse(
+        _stream_export(brand_id, start, end, start_date, end_date, limit),
+        media_type="application/json"
+    )
+
+@lru_cache(maxsize=2)
+def _day_bounds(minute_bucket: int):
+    """UTC date and [start, end) bounds of the day containing the given minute."""
+    today = datetime.utcfromtimestamp(minute_bucket * 60).date()
+    today_start = datetime(today.year, today.month, today.day)
+    return today, today_start, today_start + timedelta(days=1)
 
 @router.get("/dashboard/{brand_id}/real-time")
-def get_real_time_stats(brand_id: UUID, db: Session = Depends(get_db)):
+async def get_real_time_stats(brand_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get real-time analytics for the current day."""
-    # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
+    # Requests within the same minute share one cache entry
+    minute_bucket = int(time.time() // 60)
     
-    # Check cache first
-    cache_key = get_cache_key(brand_id, 1, "real_time")
+    # Check cache first (only valid brands are ever cached)
+    cache_key = get_cache_key(brand_id, 1, f"real_time:{minute_bucket}")
     cached_data = get_cached_data(cache_key)
     if cached_data:
         return cached_data
     
+    # Validate brand exists
+    brand = await db.get(Brand, brand_id)
+    if not brand:
+        raise HTTPException(status_code=404, detail="Brand not found")
+    
     try:
-        today = datetime.utcnow().date()
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
+        today, today_start, today_end = _day_bounds(minute_bucket)
         
         # Single optimized query for all today's stats
-        today_stats = db.query(
-            func.count(Swipe.id).label('total_swipes'),
-            func.count(case((Swipe.action == 'like', 1))).label('total_likes'),
-            func.count(func.distinct(Swipe.user_id)).label('active_users')
-        ).join(Product).filter(
-            and_(
-                Product.brand_id == brand_id,
-                Swipe.created_at >= today_start,
-                Swipe.created_at <= today_end
+        today_stats = (await db.execute(
+            select(
+                func.count(Swipe.id).label('total_swipes'),
+                func.count(case((Swipe.action == 'like', 1))).label('total_likes'),
+                func.count(func.distinct(Swipe.user_id)).label('active_users')
+            ).join(Product).where(
+                and_(
+                    Product.brand_id == brand_id,
+                    Swipe.created_at >= today_start,
+                    Swipe.created_at < today_end
+                )
             )
-        ).first()
+        )).first()
         
         today_swipes = today_stats.total_swipes or 0
         today_likes = today_stats.total_likes or 0
@@ -499,7 +600,7 @@ def get_real_time_stats(brand_id: UUID, db: Session = Depends(get_db)):
         }
         
         # Cache for 1 minute (real-time data)
-        set_cached_data(cache_key, response_data)
+        set_cached_data(cache_key, response_data, brand_id)
         
         return response_data
     except Exception as e:
@@ -509,29 +610,36 @@ def get_real_time_stats(brand_id: UUID, db: Session = Depends(get_db)):
         )
 
 @router.get("/debug")
-def debug_analytics(db: Session = Depends(get_db)):
+async def debug_analytics(db: AsyncSession = Depends(get_async_db)):
     """Debug endpoint to test database connectivity and basic queries."""
     try:
-        # Test basic counts with limits to prevent performance issues
-        swipe_count = db.query(func.count(Swipe.id)).scalar()
-        user_count = db.query(func.count(User.id)).scalar()
-        product_count = db.query(func.count(Product.id)).scalar()
-        event_count = db.query(func.count(BrandAnalyticsEvent.id)).scalar()
+        # Planner estimates (updated by ANALYZE) instead of full-table COUNT(*) scans
+        estimates = dict((await db.execute(
+            text("""
+                SELECT relname, reltuples::bigint
+                FROM pg_class
+                WHERE relkind = 'r' AND relname = ANY(:tables)
+            """),
+            {"tables": ["swipes", "users", "products", "brand_analytics_events"]}
+        )).all())
         
         # Test a simple date query
         today = datetime.utcnow().date()
         today_start = datetime.combine(today, datetime.min.time())
-        today_swipes = db.query(func.count(Swipe.id)).filter(Swipe.created_at >= today_start).scalar()
+        today_swipes = (await db.execute(
+            select(func.count(Swipe.id)).where(Swipe.created_at >= today_start)
+        )).scalar()
         
         return {
             "status": "success",
             "counts": {
-                "swipes": swipe_count,
-                "users": user_count,
-                "products": product_count,
-                "analytics_events": event_count,
+                "swipes": estimates.get("swipes"),
+                "users": estimates.get("users"),
+                "products": estimates.get("products"),
+                "analytics_events": estimates.get("brand_analytics_events"),
                 "today_swipes": today_swipes
             },
+            "counts_are_estimates": True,
             "database_connected": True,
             "cache_size": len(_analytics_cache)
         }
@@ -544,10 +652,10 @@ def debug_analytics(db: Session = Depends(get_db)):
         } 
 
 @router.get("/brand/{brand_id}/retention")
-def get_user_retention_analysis(
+async def get_user_retention_analysis(
     brand_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze user retention patterns to identify what keeps users coming back
@@ -560,18 +668,20 @@ def get_user_retention_analysis(
     """
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    analytics = AdvancedAnalytics(db)
-    return analytics.analyze_user_retention(brand_id, days)
+    # AdvancedAnalytics is written against the sync Session API
+    return await db.run_sync(
+        lambda session: AdvancedAnalytics(session).analyze_user_retention(brand_id, days)
+    )
 
 @router.get("/brand/{brand_id}/funnel")
-def get_conversion_funnel_analysis(
+async def get_conversion_funnel_analysis(
     brand_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze conversion funnel to identify where users drop off
@@ -584,18 +694,19 @@ def get_conversion_funnel_analysis(
     """
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    analytics = AdvancedAnalytics(db)
-    return analytics.analyze_conversion_funnel(brand_id, days)
+    return await db.run_sync(
+        lambda session: AdvancedAnalytics(session).analyze_conversion_funnel(brand_id, days)
+    )
 
 @router.get("/brand/{brand_id}/categories")
-def get_category_performance_analysis(
+async def get_category_performance_analysis(
     brand_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze product category performance to identify which categories drive revenue
@@ -608,18 +719,19 @@ def get_category_performance_analysis(
     """
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    analytics = AdvancedAnalytics(db)
-    return analytics.analyze_category_performance(brand_id, days)
+    return await db.run_sync(
+        lambda session: AdvancedAnalytics(session).analyze_category_performance(brand_id, days)
+    )
 
 @router.get("/brand/{brand_id}/comprehensive")
-def get_comprehensive_analytics_report(
+async def get_comprehensive_analytics_report(
     brand_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate a comprehensive analytics report combining all three analyses
@@ -632,18 +744,19 @@ def get_comprehensive_analytics_report(
     """
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    analytics = AdvancedAnalytics(db)
-    return analytics.generate_combined_analytics_report(brand_id, days)
+    return await db.run_sync(
+        lambda session: AdvancedAnalytics(session).generate_combined_analytics_report(brand_id, days)
+    )
 
 @router.get("/brand/{brand_id}/insights")
-def get_key_insights(
+async def get_key_insights(
     brand_id: UUID,
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get key business insights and recommendations
@@ -655,12 +768,13 @@ def get_key_insights(
     """
     
     # Validate brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
+    brand = await db.get(Brand, brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    analytics = AdvancedAnalytics(db)
-    comprehensive_report = analytics.generate_combined_analytics_report(brand_id, days)
+    comprehensive_report = await db.run_sync(
+        lambda session: AdvancedAnalytics(session).generate_combined_analytics_report(brand_id, days)
+    )
     
     return {
         'brand_id': str(brand_id),
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, Cookie, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import timedelta
 
-from app.db import get_db
+from app.db import get_async_db
 from app.auth import (
-    brand_login, 
+    async_brand_login, 
     create_access_token, 
     decode_token, 
-    get_user_from_cookie,
+    get_user_from_cookie_cached,
+    clear_session_cache,
     BrandLoginRequest,
     BrandLoginResponse
 )
@@ -17,10 +18,10 @@ from app.auth import (
 router = APIRouter()
 
 @router.post("/brand-login", response_model=BrandLoginResponse)
-def login_brand(
+async def login_brand(
     login_data: BrandLoginRequest,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Brand login endpoint.
@@ -30,7 +31,7 @@ def login_brand(
     """
     try:
         # Authenticate user and get brand info
-        auth_result = brand_login(login_data.email, login_data.password, db)
+        auth_result = await async_brand_login(login_data.email, login_data.password, db)
         
         # Create JWT token
         token_data = {
@@ -75,36 +76,30 @@ def login_brand(
         )
 
 @router.post("/logout")
-def logout_brand(response: Response):
+async def logout_brand(response: Response, session_token: Optional[str] = Cookie(None)):
     """
     Logout endpoint - clears the session cookie.
     """
+    await clear_session_cache(session_token)
     response.delete_cookie(key="session_token")
     return {"success": True, "message": "Logged out successfully"}
 
 @router.get("/me")
-def get_current_session_user(current_user = Depends(get_user_from_cookie)):
+async def get_current_session_user(current_user: Optional[dict] = Depends(get_user_from_cookie_cached)):
     """
     Get current user from session cookie.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    return {
-        "user": {
-            "id": current_user.id,
-            "email": current_user.email,
-            "name": current_user.name,
-            "avatar": current_user.avatar
-        }
-    }
+    return {"user": current_user}
 
 @router.get("/verify-session")
-def verify_session(current_user = Depends(get_user_from_cookie)):
+async def verify_session(current_user: Optional[dict] = Depends(get_user_from_cookie_cached)):
     """
     Verify if current session is valid.
     """
     if not current_user:
         return {"valid": False, "message": "No valid session"}
     
-    return {"valid": True, "user_id": str(current_user.id)} 
\ No newline at end of file
+    return {"valid": True, "user_id": current_user["id"]} 
\ No newline at end of file
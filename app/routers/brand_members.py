@@ -1,41 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
-import uuid
 from datetime import datetime
 from pydantic import BaseModel
-import bcrypt
 
-from app.db import get_db
+from app.db import get_db, get_async_db
 from app.models import BrandMember, User, Brand
 from app.schemas import BrandMember as BrandMemberSchema, BrandMemberCreate, BrandMemberUpdate
+from app.schemas.brand_member import MemberStatus
 from app.auth import get_current_user
+from app.utils.auth import hash_password_async, hash_passwords_async
 
 router = APIRouter()
 
 # New schema for creating user and brand member together
 class UserAndBrandMemberCreate(BaseModel):
-    user_id: Optional[UUID] = None  # If not provided, will generate one
+    user_id: Optional[UUID] = None  # If not provided, the database generates one
     email: str
     name: str
     password: str  # Add password field
     avatar: Optional[str] = None
     brand_id: UUID
     role: Optional[str] = None
-    status: Optional[str] = None
+    status: Optional[MemberStatus] = None
 
 class UserAndBrandMemberResponse(BaseModel):
     user: dict
     brand_member: BrandMemberSchema
 
+class UserAndBrandMemberBatchResponse(BaseModel):
+    created: List[UserAndBrandMemberResponse]
+    skipped_emails: List[str]  # Email already registered or membership already present
+
+# Upper bound on /with-user/batch size (each entry costs one Argon2 hash)
+MAX_BATCH_MEMBERS = 500
+
 # New schema for brand members with user info
 class BrandMemberWithUser(BaseModel):
     id: UUID
     user_id: UUID
     brand_id: UUID
     role: Optional[str]
-    status: Optional[str]
+    status: Optional[MemberStatus]
     created_at: datetime
     updated_at: Optional[datetime]  # Make this optional
     # User information
@@ -43,100 +55,193 @@ class BrandMemberWithUser(BaseModel):
     user_email: str
     user_avatar: Optional[str]
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+USER_RESPONSE_COLUMNS = (
+    User.__table__.c.id,
+    User.__table__.c.email,
+    User.__table__.c.name,
+    User.__table__.c.avatar,
+    User.__table__.c.created_at,
+)
+
+def _insert_brand_member(values):
+    """INSERT one or more memberships, skipping (user_id, brand_id) pairs that exist."""
+    return (
+        pg_insert(BrandMember.__table__)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=["user_id", "brand_id"])
+        .returning(*BrandMember.__table__.c)
+    )
 
 @router.post("/with-user", response_model=UserAndBrandMemberResponse)
-def create_user_and_brand_member(
+async def create_user_and_brand_member(
     data: UserAndBrandMemberCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Create a new user and brand member in one request."""
     # Check if brand exists
-    brand = db.query(Brand).filter(Brand.id == data.brand_id).first()
+    brand = await db.get(Brand, data.brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Generate user ID if not provided
-    user_id = data.user_id or uuid.uuid4()
-    
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.email == data.email).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User with this email already exists")
-    
-    # Hash the password
-    password_hash = hash_password(data.password)
-    
-    # Create new user
-    new_user = User(
-        id=user_id,
-        email=data.email,
-        name=data.name,
-        avatar=data.avatar,
-        password_hash=password_hash,
-        created_at=datetime.utcnow()
+    # Hash the password (Argon2id, off the event loop)
+    password_hash = await hash_password_async(data.password)
+    
+    # Insert user and membership in one transaction. ON CONFLICT ... RETURNING
+    # replaces the existence checks: an empty RETURNING means a duplicate.
+    try:
+        new_user = (await db.execute(
+            pg_insert(User.__table__)
+            .values(
+                # Without a caller-supplied id the database assigns one (gen_random_uuid)
+                **({"id": data.user_id} if data.user_id else {}),
+                email=data.email,
+                name=data.name,
+                avatar=data.avatar,
+                password_hash=password_hash,
+                created_at=datetime.utcnow()
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(*USER_RESPONSE_COLUMNS)
+        )).mappings().first()
+        if new_user is None:
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+        
+        new_brand_member = (await db.execute(
+            _insert_brand_member({
+                "user_id": new_user["id"],
+                "brand_id": data.brand_id,
+                "role": data.role,
+                "status": data.status
+            })
+        )).mappings().first()
+        if new_brand_member is None:
+            raise HTTPException(status_code=400, detail="Brand member already exists")
+        
+        await db.commit()
+    except IntegrityError:
+        # e.g. a caller-supplied user_id that is already taken
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="User or brand member already exists")
+    
+    print(f"✅ Created user and brand member: User {new_user['id']} -> Brand {data.brand_id}")
+    
+    return UserAndBrandMemberResponse(
+        user=dict(new_user),
+        brand_member=BrandMemberSchema.model_validate(dict(new_brand_member))
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+
+@router.post("/with-user/batch", response_model=UserAndBrandMemberBatchResponse)
+async def create_users_and_brand_members_batch(
+    data: List[UserAndBrandMemberCreate],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """Create many users and brand members in one request (imports, seeding)."""
+    if len(data) > MAX_BATCH_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_MEMBERS} entries per batch")
+    if not data:
+        return UserAndBrandMemberBatchResponse(created=[], skipped_emails=[])
     
-    # Check if brand member already exists
-    existing_member = db.query(BrandMember).filter(
-        BrandMember.user_id == user_id,
-        BrandMember.brand_id == data.brand_id
-    ).first()
+    # Check all referenced brands in one query
+    brand_ids = {item.brand_id for item in data}
+    found_brands = set((await db.execute(
+        select(Brand.id).where(Brand.id.in_(brand_ids))
+    )).scalars())
+    missing_brands = brand_ids - found_brands
+    if missing_brands:
+        raise HTTPException(status_code=404, detail=f"Brand not found: {', '.join(map(str, missing_brands))}")
     
-    if existing_member:
-        raise HTTPException(status_code=400, detail="Brand member already exists")
+    # Hash every password in parallel on the hashing pool
+    password_hashes = await hash_passwords_async([item.password for item in data])
     
-    # Create brand member
-    brand_member_data = {
-        "user_id": user_id,
-        "brand_id": data.brand_id,
-        "role": data.role,
-        "status": data.status
-    }
+    created_at = datetime.utcnow()
+    try:
+        # One multi-row INSERT for the users; duplicates come back missing from RETURNING
+        new_users = (await db.execute(
+            pg_insert(User.__table__)
+            .values([
+                {
+                    "id": item.user_id or func.gen_random_uuid(),
+                    "email": item.email,
+                    "name": item.name,
+                    "avatar": item.avatar,
+                    "password_hash": password_hash,
+                    "created_at": created_at
+                }
+                for item, password_hash in zip(data, password_hashes)
+            ])
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(*USER_RESPONSE_COLUMNS)
+        )).mappings().all()
+        users_by_email = {user["email"]: user for user in new_users}
+        
+        # Each email maps to the first entry that used it; later entries with
+        # the same email are skipped
+        selected_entries = {}  # email -> index of the entry in data
+        members_to_create = {}
+        for index, item in enumerate(data):
+            user = users_by_email.get(item.email)
+            if user is not None and item.email not in members_to_create:
+                selected_entries[item.email] = index
+                members_to_create[item.email] = {
+                    "user_id": user["id"],
+                    "brand_id": item.brand_id,
+                    "role": item.role,
+                    "status": item.status
+                }
+        
+        new_members = []
+        if members_to_create:
+            new_members = (await db.execute(
+                _insert_brand_member(list(members_to_create.values()))
+            )).mappings().all()
+        
+        await db.commit()
+    except IntegrityError:
+        # e.g. a caller-supplied user_id that is already taken
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Batch conflicts with existing users")
     
-    new_brand_member = BrandMember(**brand_member_data)
-    db.add(new_brand_member)
-    db.commit()
-    db.refresh(new_brand_member)
+    members_by_user = {member["user_id"]: member for member in new_members}
+    created = [
+        UserAndBrandMemberResponse(
+            user=dict(user),
+            brand_member=BrandMemberSchema.model_validate(dict(members_by_user[user["id"]]))
+        )
+        for user in new_users
+        if user["id"] in members_by_user
+    ]
+    created_emails = {entry.user["email"] for entry in created}
+    # Per entry: existing users, repeated emails and members that weren't inserted
+    skipped_emails = [
+        item.email for index, item in enumerate(data)
+        if selected_entries.get(item.email) != index or item.email not in created_emails
+    ]
     
-    print(f"✅ Created user and brand member: User {new_user.id} -> Brand {data.brand_id}")
+    print(f"✅ Batch created {len(created)} users and brand members ({len(skipped_emails)} skipped)")
     
-    return UserAndBrandMemberResponse(
-        user={
-            "id": new_user.id,
-            "email": new_user.email,
-            "name": new_user.name,
-            "avatar": new_user.avatar,
-            "created_at": new_user.created_at
-        },
-        brand_member=new_brand_member
-    )
+    return UserAndBrandMemberBatchResponse(created=created, skipped_emails=skipped_emails)
 
 @router.post("/", response_model=BrandMemberSchema)
-def create_brand_member(
+async def create_brand_member(
     brand_member: BrandMemberCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Create a new brand member. If user doesn't exist, create them automatically."""
     # Check if brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_member.brand_id).first()
+    brand = await db.get(Brand, brand_member.brand_id)
     if not brand:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Check if user exists, if not create them
-    user = db.query(User).filter(User.id == brand_member.user_id).first()
+    # Check if user exists, if not create them. This check stays: it is much
+    # cheaper than hashing a default password we would then throw away.
+    user = await db.get(User, brand_member.user_id)
     if not user:
         # Create a new user automatically with a default password
         default_password = "changeme123"  # User should change this later
-        password_hash = hash_password(default_password)
+        password_hash = await hash_password_async(default_password)
         
         user = User(
             id=brand_member.user_id,
@@ -146,27 +251,23 @@ def create_brand_member(
             created_at=datetime.utcnow()
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.flush()
         print(f"✅ Created new user automatically: {user.id} (default password: {default_password})")
     
-    # Check if brand member already exists
-    existing_member = db.query(BrandMember).filter(
-        BrandMember.user_id == brand_member.user_id,
-        BrandMember.brand_id == brand_member.brand_id
-    ).first()
-    
-    if existing_member:
+    # Create the brand member (commits the auto-created user with it)
+    try:
+        db_brand_member = (await db.execute(
+            _insert_brand_member(brand_member.dict())
+        )).mappings().first()
+        if db_brand_member is None:
+            raise HTTPException(status_code=400, detail="Brand member already exists")
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Brand member already exists")
     
-    # Create the brand member
-    db_brand_member = BrandMember(**brand_member.dict())
-    db.add(db_brand_member)
-    db.commit()
-    db.refresh(db_brand_member)
-    
-    print(f"✅ Created brand member: {db_brand_member.id} for user: {brand_member.user_id} in brand: {brand_member.brand_id}")
-    return db_brand_member
+    print(f"✅ Created brand member: {db_brand_member['id']} for user: {brand_member.user_id} in brand: {brand_member.brand_id}")
+    return BrandMemberSchema.model_validate(dict(db_brand_member))
 
 @router.get("/", response_model=List[BrandMemberWithUser])
 def get_brand_members(
@@ -176,34 +277,30 @@ def get_brand_members(
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Get brand members with optional filtering and user information."""
-    # Build base query with JOIN
-    query = db.query(BrandMember, User).join(User, BrandMember.user_id == User.id)
+    # Select just the serialized columns - no ORM entities for either table
+    query = select(
+        BrandMember.id,
+        BrandMember.user_id,
+        BrandMember.brand_id,
+        BrandMember.role,
+        BrandMember.status,
+        BrandMember.created_at,
+        BrandMember.updated_at,
+        User.name.label("user_name"),
+        User.email.label("user_email"),
+        User.avatar.label("user_avatar")
+    ).join(User, BrandMember.user_id == User.id)
     
     if brand_id:
-        query = query.filter(BrandMember.brand_id == brand_id)
+        query = query.where(BrandMember.brand_id == brand_id)
     
     if user_id:
-        query = query.filter(BrandMember.user_id == user_id)
-    
-    # Execute query and format results
-    results = query.all()
-    brand_members = []
-    
-    for member, user in results:
-        brand_members.append(BrandMemberWithUser(
-            id=member.id,
-            user_id=member.user_id,
-            brand_id=member.brand_id,
-            role=member.role,
-            status=member.status,
-            created_at=member.created_at,
-            updated_at=member.updated_at,
-            user_name=user.name,
-            user_email=user.email,
-            user_avatar=user.avatar
-        ))
-    
-    return brand_members
+        query = query.where(BrandMember.user_id == user_id)
+    
+    # Column types come from the DB schema: hand the rows straight to orjson
+    # (UUIDs, datetimes and the status enum are native) and skip the
+    # response_model pass entirely. response_model stays for the OpenAPI schema.
+    return ORJSONResponse([dict(row) for row in db.execute(query).mappings()])
 
 @router.get("/{brand_member_id}", response_model=BrandMemberSchema)
 def get_brand_member(
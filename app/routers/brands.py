@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select, exists, bindparam
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from typing import List, Optional, TypedDict
 from uuid import UUID
 from pydantic import BaseModel
 
-from app.db import get_db
-from app.models import Brand, Product, Swipe, BrandMember
+from app.db import get_db, get_async_db
+from app.models import Brand, Product
 from app.schemas import Brand as BrandSchema, BrandCreate, BrandUpdate, Product as ProductSchema
+from app.routers.products import stream_products, PRODUCT_LIST_COLUMNS
+from app.utils.response_cache import (
+    cache, endpoint_key_builder, clear_namespace_sync, BRANDS_NAMESPACE, LISTING_CACHE_TTL
+)
 
 router = APIRouter()
 
@@ -21,11 +28,53 @@ class BrandStats(BaseModel):
     total_members: int
     active_members: int
 
+class BrandStatsDict(TypedDict):
+    brand_id: UUID
+    total_products: int
+    total_swipes: int
+    total_likes: int
+    total_dislikes: int
+    total_members: int
+    active_members: int
+
+# One scan of swipes and one of brand_members, counted with FILTER clauses;
+# the brand existence check rides along in the same statement.
+# Built once at import; brand_id is typed up front so binds skip inference.
+BRAND_STATS_SQL = text("""
+    WITH sw AS (
+        SELECT
+            COUNT(*) AS total_swipes,
+            COUNT(*) FILTER (WHERE s.action = 'right') AS total_likes,
+            COUNT(*) FILTER (WHERE s.action = 'left') AS total_dislikes
+        FROM swipes s
+        JOIN products p ON s.product_id = p.id
+        WHERE p.brand_id = :brand_id
+    ),
+    bm AS (
+        SELECT
+            COUNT(*) AS total_members,
+            COUNT(*) FILTER (WHERE status = 'active') AS active_members
+        FROM brand_members
+        WHERE brand_id = :brand_id
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM brands WHERE id = :brand_id) AS brand_exists,
+        (SELECT COUNT(*) FROM products WHERE brand_id = :brand_id) AS total_products,
+        sw.total_swipes,
+        sw.total_likes,
+        sw.total_dislikes,
+        bm.total_members,
+        bm.active_members
+    FROM sw, bm
+""").bindparams(bindparam("brand_id", type_=PG_UUID(as_uuid=True)))
+
 @router.get("/", response_model=List[BrandSchema])
+@cache(expire=LISTING_CACHE_TTL, namespace=BRANDS_NAMESPACE, key_builder=endpoint_key_builder)
 def get_brands(db: Session = Depends(get_db)):
-    """Get all brands."""
+    """Get all brands (cached, invalidated on brand writes)."""
     brands = db.query(Brand).all()
-    return brands
+    # Serialise here so the cache stores plain data rather than ORM objects
+    return [BrandSchema.model_validate(brand) for brand in brands]
 
 @router.get("/{brand_id}", response_model=BrandSchema)
 def get_brand(brand_id: UUID, db: Session = Depends(get_db)):
@@ -36,130 +85,57 @@ def get_brand(brand_id: UUID, db: Session = Depends(get_db)):
     return brand
 
 @router.get("/{brand_id}/products", response_model=List[ProductSchema])
-def get_brand_products(brand_id: UUID, db: Session = Depends(get_db)):
-    """Get all products for a specific brand."""
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
-    if not brand:
+async def get_brand_products(brand_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """Get all products for a specific brand (streamed)."""
+    # Existence probe on the key only; no Brand row to hydrate and no lazy load
+    if not (await db.execute(select(exists().where(Brand.id == brand_id)))).scalar():
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    return brand.products
+    # Unbounded per brand, so rows go out as they come off a server-side cursor
+    query = (
+        select(*PRODUCT_LIST_COLUMNS)
+        .where(Product.brand_id == brand_id)
+        .order_by(Product.created_at.desc(), Product.id.desc())
+    )
+    return StreamingResponse(stream_products(query, {}), media_type="application/json")
 
 @router.get("/{brand_id}/stats", response_model=BrandStats)
 def get_brand_stats(brand_id: UUID, db: Session = Depends(get_db)):
     """Get comprehensive statistics for a brand using efficient COUNT queries."""
-    
-    # Check if brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
-    
     try:
-        # Use raw SQL for maximum efficiency
-        query = text("""
-        SELECT 
-            :brand_id as brand_id,
-            COALESCE(products.count, 0) as total_products,
-            COALESCE(swipes.count, 0) as total_swipes,
-            COALESCE(likes.count, 0) as total_likes,
-            COALESCE(dislikes.count, 0) as total_dislikes,
-            COALESCE(members.count, 0) as total_members,
-            COALESCE(active_members.count, 0) as active_members
-        FROM (SELECT 1) as dummy
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM products 
-            WHERE brand_id = :brand_id
-        ) as products ON true
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM swipes s
-            JOIN products p ON s.product_id = p.id
-            WHERE p.brand_id = :brand_id
-        ) as swipes ON true
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM swipes s
-            JOIN products p ON s.product_id = p.id
-            WHERE p.brand_id = :brand_id AND s.action = 'right'
-        ) as likes ON true
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM swipes s
-            JOIN products p ON s.product_id = p.id
-            WHERE p.brand_id = :brand_id AND s.action = 'left'
-        ) as dislikes ON true
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM brand_members 
-            WHERE brand_id = :brand_id
-        ) as members ON true
-        LEFT JOIN (
-            SELECT COUNT(*) as count 
-            FROM brand_members 
-            WHERE brand_id = :brand_id AND status IN ('active', 'ACTIVE', 'Active')
-        ) as active_members ON true
-        """)
-        
-        result = db.execute(query, {"brand_id": brand_id}).first()
-        
-        return BrandStats(
-            brand_id=brand_id,
-            total_products=result.total_products,
-            total_swipes=result.total_swipes,
-            total_likes=result.total_likes,
-            total_dislikes=result.total_dislikes,
-            total_members=result.total_members,
-            active_members=result.active_members
-        )
-        
+        result = db.execute(BRAND_STATS_SQL, {"brand_id": brand_id}).first()
     except Exception as e:
         print(f"Error getting brand stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get brand statistics")
-
-@router.get("/{brand_id}/stats/simple")
-def get_brand_stats_simple(brand_id: UUID, db: Session = Depends(get_db)):
-    """Get simple brand statistics using SQLAlchemy ORM."""
     
-    # Check if brand exists
-    brand = db.query(Brand).filter(Brand.id == brand_id).first()
-    if not brand:
+    if not result.brand_exists:
         raise HTTPException(status_code=404, detail="Brand not found")
     
-    # Count products
-    total_products = db.query(func.count(Product.id)).filter(Product.brand_id == brand_id).scalar()
-    
-    # Count swipes (through products)
-    total_swipes = db.query(func.count(Swipe.id)).join(Product).filter(Product.brand_id == brand_id).scalar()
-    
-    # Count likes
-    total_likes = db.query(func.count(Swipe.id)).join(Product).filter(
-        Product.brand_id == brand_id,
-        Swipe.action == "right"
-    ).scalar()
-    
-    # Count dislikes
-    total_dislikes = db.query(func.count(Swipe.id)).join(Product).filter(
-        Product.brand_id == brand_id,
-        Swipe.action == "left"
-    ).scalar()
-    
-    # Count members
-    total_members = db.query(func.count(BrandMember.id)).filter(BrandMember.brand_id == brand_id).scalar()
-    
-    # Count active members
-    active_members = db.query(func.count(BrandMember.id)).filter(
-        BrandMember.brand_id == brand_id,
-        BrandMember.status.in_(["active", "ACTIVE", "Active"])
-    ).scalar()
+    return BrandStats(
+        brand_id=brand_id,
+        total_products=result.total_products,
+        total_swipes=result.total_swipes,
+        total_likes=result.total_likes,
+        total_dislikes=result.total_dislikes,
+        total_members=result.total_members,
+        active_members=result.active_members
+    )
+
+@router.get("/{brand_id}/stats/simple", response_model=None)
+def get_brand_stats_simple(brand_id: UUID, db: Session = Depends(get_db)) -> BrandStatsDict:
+    """Get simple brand statistics as a plain dict (no response model validation)."""
+    result = db.execute(BRAND_STATS_SQL, {"brand_id": brand_id}).mappings().first()
+    if not result["brand_exists"]:
+        raise HTTPException(status_code=404, detail="Brand not found")
     
     return {
         "brand_id": brand_id,
-        "total_products": total_products,
-        "total_swipes": total_swipes,
-        "total_likes": total_likes,
-        "total_dislikes": total_dislikes,
-        "total_members": total_members,
-        "active_members": active_members
+        "total_products": result["total_products"],
+        "total_swipes": result["total_swipes"],
+        "total_likes": result["total_likes"],
+        "total_dislikes": result["total_dislikes"],
+        "total_members": result["total_members"],
+        "active_members": result["active_members"]
     }
 
 @router.post("/", response_model=BrandSchema, status_code=status.HTTP_201_CREATED)
@@ -169,6 +145,7 @@ def create_brand(brand: BrandCreate, db: Session = Depends(get_db)):
     db.add(db_brand)
     db.commit()
     db.refresh(db_brand)
+    clear_namespace_sync(BRANDS_NAMESPACE)
     return db_brand
 
 @router.put("/{brand_id}", response_model=BrandSchema)
@@ -184,6 +161,7 @@ def update_brand(brand_id: UUID, brand_update: BrandUpdate, db: Session = Depend
     
     db.commit()
     db.refresh(db_brand)
+    clear_namespace_sync(BRANDS_NAMESPACE)
     return db_brand
 
 @router.delete("/{brand_id}")
@@ -195,4 +173,5 @@ def delete_brand(brand_id: UUID, db: Session = Depends(get_db)):
     
     db.delete(db_brand)
     db.commit()
+    clear_namespace_sync(BRANDS_NAMESPACE)
     return {"message": "Brand deleted successfully"} 
\ No newline at end of file
@@ -1,19 +1,143 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, text
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, text, select, insert, update, bindparam, cast, tuple_, event, Integer, Text
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY
+from typing import List, Optional, Union
 from uuid import UUID
-from app.db import get_db
+import orjson
+from threading import RLock
+from cachetools import TTLCache
+from app.db import get_db, get_async_db, AsyncSessionLocal
 from app.models import Product
-from app.schemas import Product as ProductSchema, ProductCreate, ProductUpdate
-from app.services.vector_service import VectorService
+from app.schemas import Product as ProductSchema, ProductCreate, ProductUpdate, ProductListItem
+from app.services.vector_service import VectorService, VECTORIZATION_STATUS_SQL, build_vectorization_status, PRODUCTS_BY_IDS
+from app.services.search_index import (
+    index_product, remove_product, search_product_ids, product_document, SEARCHABLE_ATTRIBUTES
+)
+from app.services.vector_queue import vector_queue
+from app.services.vector_matrix import invalidate_vector_matrix
+from app.services.term_index import invalidate_term_index
+from app.utils.response_cache import (
+    cache, endpoint_key_builder, clear_namespaces, clear_namespace_sync, LISTING_CACHE_TTL, VECTORIZATION_CACHE_TTL,
+    CATEGORIES_NAMESPACE, TAGS_NAMESPACE, VECTORIZATION_NAMESPACE, PRODUCT_LISTING_NAMESPACES
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ProductSchema])
-def list_products(
+# Per-process cache of get_product responses (plain dicts, never ORM instances).
+# Dropped on ORM updates/deletes via mapper events and explicitly by the
+# bulk UPDATE in update_product; the TTL bounds staleness across workers.
+PRODUCT_CACHE_TTL = 30  # seconds
+_product_cache = TTLCache(maxsize=10_000, ttl=PRODUCT_CACHE_TTL)
+_product_cache_lock = RLock()
+
+def _evict_product(product_id: UUID):
+    with _product_cache_lock:
+        _product_cache.pop(product_id, None)
+
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _evict_product_on_write(mapper, connection, target):
+    _evict_product(target.id)
+
+# Loose index scan: one index probe per distinct category instead of
+# reading every product row (few categories, many products)
+DISTINCT_CATEGORIES_SQL = text("""
+    WITH RECURSIVE c AS (
+        SELECT MIN(category) AS category FROM products WHERE category IS NOT NULL
+        UNION ALL
+        SELECT (SELECT MIN(category) FROM products WHERE category > c.category)
+        FROM c
+        WHERE c.category IS NOT NULL
+    )
+    SELECT category FROM c WHERE category IS NOT NULL
+""")
+
+DISTINCT_TAGS_SQL = text("""
+    SELECT DISTINCT unnest(tags) AS tag
+    FROM products
+    WHERE tags IS NOT NULL
+    ORDER BY tag
+""")
+
+# Exactly the fields of the Product response schema, fetched as plain rows
+PRODUCT_LIST_COLUMNS = (
+    Product.id, Product.brand_id, Product.name, Product.description, Product.price,
+    Product.image, Product.category, Product.color, Product.tags, Product.status,
+    Product.flagged, Product.created_at, Product.updated_at,
+)
+# Fields of ProductListItem, for list pages that only render cards
+PRODUCT_LIST_ITEM_COLUMNS = (
+    Product.id, Product.name, Product.price, Product.image, Product.created_at,
+)
+# Full-text match on the generated, GIN-indexed search_tsv column. Built once
+# with a named bind parameter ("q") so every statement using it shares one
+# cached compilation; callers pass the search text as an execution parameter.
+_search_tsquery = func.plainto_tsquery('english', bindparam("q", type_=Text))
+SEARCH_MATCH = Product.search_tsv.op('@@')(_search_tsquery)
+
+# Whitelisted sort_by values
+SORT_COLUMNS = {
+    "name": Product.name,
+    "price": Product.price,
+    "popularity": Product.created_at,
+    "created_at": Product.created_at,
+}
+# ORDER BY clauses per (column, descending), built once; id breaks ties so the
+# order (and therefore the keyset) is total
+SORT_ORDER_BY = {
+    (column, descending): (
+        (column.desc(), Product.id.desc()) if descending else (column.asc(), Product.id.asc())
+    )
+    for column in set(SORT_COLUMNS.values())
+    for descending in (True, False)
+}
+LIST_BATCH_SIZE = 500  # rows fetched per round-trip when streaming listings
+
+async def stream_products(stmt, params: dict):
+    """Yield a JSON array of product rows, fetched from a server-side cursor."""
+    # Own session: the request-scoped one is closed before the body is sent
+    async with AsyncSessionLocal() as session:
+        yield b'['
+        first = True
+        result = await session.stream(stmt.execution_options(yield_per=LIST_BATCH_SIZE), params)
+        async for row in result.mappings():
+            # Decimal prices as strings, same as the pydantic response model
+            chunk = orjson.dumps(dict(row), default=str)
+            yield chunk if first else b',' + chunk
+            first = False
+        yield b']'
+
+def _after_cursor(sort_column, descending: bool, cursor: UUID):
+    """Keyset predicate: rows that sort after the cursor product.
+
+    Compares (sort_column, id) against the cursor row's values, so Postgres
+    seeks straight to the page instead of scanning and discarding OFFSET rows.
+    NULL sort values follow Postgres' default placement (first when
+    descending, last when ascending).
+    """
+    cursor_value = (
+        select(sort_column).where(Product.id == cursor).correlate(None).scalar_subquery()
+    )
+    row, cursor_row = tuple_(sort_column, Product.id), tuple_(cursor_value, cursor)
+    if descending:
+        return or_(
+            row < cursor_row,
+            and_(cursor_value.is_(None), or_(sort_column.isnot(None), Product.id < cursor)),
+        )
+    return or_(
+        row > cursor_row,
+        and_(cursor_value.isnot(None), sort_column.is_(None)),
+        and_(cursor_value.is_(None), sort_column.is_(None), Product.id > cursor),
+    )
+
+@router.get("/", response_model=Union[List[ProductSchema], List[ProductListItem]])
+async def list_products(
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[UUID] = Query(None, description="Keyset pagination: id of the last product of the previous page (replaces skip)"),
     category: Optional[str] = None,
     gender: Optional[str] = None,
     color: Optional[str] = None,
@@ -24,10 +148,10 @@ def list_products(
     max_price: Optional[float] = None,
     sort_by: Optional[str] = Query("created_at", description="Sort by: name, price, created_at, popularity"),
     sort_order: Optional[str] = Query("desc", description="Sort order: asc, desc"),
-    db: Session = Depends(get_db)
+    compact: bool = Query(False, description="Return only id, name, price, image and created_at"),
 ):
-    """List products with advanced filtering and search."""
-    query = db.query(Product)
+    """List products with advanced filtering and search (streamed)."""
+    query = select(*(PRODUCT_LIST_ITEM_COLUMNS if compact else PRODUCT_LIST_COLUMNS))
     
     # Basic filters
     if category:
@@ -39,8 +163,8 @@ def list_products(
     if brand_id:
         query = query.filter(Product.brand_id == brand_id)
     if tags:
-        for tag in tags:
-            query = query.filter(Product.tags.any(tag))
+        # Single array-contains predicate, served by the products_tags_gin index
+        query = query.filter(Product.tags.op('@>')(cast(tags, PG_ARRAY(Text))))
     
     # Price range filter
     if min_price is not None:
@@ -48,111 +172,89 @@ def list_products(
     if max_price is not None:
         query = query.filter(Product.price <= max_price)
     
-    # Full-text search
+    # Full-text search (search text bound at execution)
+    params = {}
     if search:
-        # Create search vector from name, description, and tags
-        search_query = text("""
-            to_tsvector('english', 
-                COALESCE(name, '') || ' ' || 
-                COALESCE(description, '') || ' ' || 
-                COALESCE(array_to_string(tags, ' '), '')
-            ) @@ plainto_tsquery('english', :search_term)
-        """)
-        query = query.filter(search_query.bindparams(search_term=search))
-    
-    # Sorting
-    if sort_by == "name":
-        query = query.order_by(Product.name.asc() if sort_order == "asc" else Product.name.desc())
-    elif sort_by == "price":
-        query = query.order_by(
-            Product.price.asc() if sort_order == "asc" 
-            else Product.price.desc()
-        )
-    elif sort_by == "popularity":
-        # Note: swipe_right_count field doesn't exist in current model
-        query = query.order_by(Product.created_at.desc())
-    else:  # default: created_at
-        query = query.order_by(
-            Product.created_at.asc() if sort_order == "asc" 
-            else Product.created_at.desc()
-        )
+        query = query.filter(SEARCH_MATCH)
+        params["q"] = search
+    
+    # Sorting (unknown sort_by falls back to created_at)
+    sort_column = SORT_COLUMNS.get(sort_by, Product.created_at)
+    # Note: swipe_right_count field doesn't exist in current model, so
+    # popularity is newest-first regardless of sort_order
+    descending = sort_by == "popularity" or sort_order != "asc"
+    query = query.order_by(*SORT_ORDER_BY[sort_column, descending])
+    
+    if cursor:
+        query = query.filter(_after_cursor(sort_column, descending, cursor))
+    elif skip:
+        query = query.offset(skip)
     
-    products = query.offset(skip).limit(limit).all()
-    return products
+    return StreamingResponse(
+        stream_products(query.limit(limit), params),
+        media_type="application/json"
+    )
 
-@router.get("/search/", response_model=List[ProductSchema])
-def search_products(
+# Built once at import; each request only binds the query text and limit
+SEARCH_PRODUCTS_STMT = (
+    select(Product)
+    .where(SEARCH_MATCH)
+    .order_by(func.ts_rank(Product.search_tsv, _search_tsquery).desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+
+@router.get("/search/", response_model=List[ProductSchema], response_model_exclude_none=True)
+async def search_products(
     q: str = Query(..., description="Search query"),
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Advanced product search with ranking."""
-    # Use PostgreSQL full-text search with ranking
-    search_query = text("""
-        SELECT *, 
-               ts_rank(
-                   to_tsvector('english', 
-                       COALESCE(name, '') || ' ' || 
-                       COALESCE(description, '') || ' ' || 
-                       COALESCE(array_to_string(tags, ' '), '')
-                   ), 
-                   plainto_tsquery('english', :search_term)
-               ) as rank
-        FROM products 
-        WHERE to_tsvector('english', 
-            COALESCE(name, '') || ' ' || 
-            COALESCE(description, '') || ' ' || 
-            COALESCE(array_to_string(tags, ' '), '')
-        ) @@ plainto_tsquery('english', :search_term)
-        ORDER BY rank DESC
-        LIMIT :limit
-    """)
-    
-    result = db.execute(search_query, {"search_term": q, "limit": limit})
-    products = []
-    for row in result:
-        product_dict = dict(row)
-        product_dict.pop('rank', None)
-        products.append(Product(**product_dict))
-    
-    return products
-
-async def generate_vectors_background(product_id: UUID, db: Session):
-    """Background task to generate vectors for a product."""
-    try:
-        vector_service = VectorService(db)
-        result = vector_service.generate_vectors_for_product(product_id)
-        if not result['success']:
-            print(f"Failed to generate vectors for product {product_id}: {result['error']}")
-    except Exception as e:
-        print(f"Error in background vector generation for product {product_id}: {e}")
+    # Meilisearch ranks and returns ids; rows are hydrated from Postgres in its order
+    ids = await search_product_ids(q, limit)
+    if ids is not None:
+        if not ids:
+            return []
+        products = (await db.execute(PRODUCTS_BY_IDS, {"ids": ids})).scalars().all()
+        position = {product_id: i for i, product_id in enumerate(ids)}
+        return sorted(products, key=lambda product: position[product.id])
+    
+    # Fallback when the search index is unavailable.
+    # Runs on asyncpg, whose per-connection prepared statement cache skips
+    # re-planning this query after its first execution on a connection
+    result = await db.execute(SEARCH_PRODUCTS_STMT, {"q": q, "limit": limit})
+    return result.scalars().all()
 
 @router.post("/", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product: ProductCreate, 
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new product with automatic vector generation."""
-    db_product = Product(**product.dict())
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    # INSERT ... RETURNING: the row comes back with its defaults in one round-trip
+    result = await db.execute(insert(Product).values(**product.dict()).returning(Product))
+    db_product = result.scalar_one()
+    await db.commit()
+    await clear_namespaces(*PRODUCT_LISTING_NAMESPACES)
+    invalidate_term_index()
+    background_tasks.add_task(index_product, product_document(db_product))
     
-    # Generate vectors in background
-    background_tasks.add_task(generate_vectors_background, db_product.id, db)
+    # Generate vectors in background (batched by the vector queue)
+    await vector_queue.enqueue(db_product.id)
     
     return db_product
 
 @router.get("/vectorization-status")
-def get_vectorization_status(db: Session = Depends(get_db)):
+@cache(expire=VECTORIZATION_CACHE_TTL, namespace=VECTORIZATION_NAMESPACE, key_builder=endpoint_key_builder)
+async def get_vectorization_status(db: AsyncSession = Depends(get_async_db)):
     """Get vectorization status across all products."""
-    vector_service = VectorService(db)
-    status = vector_service.get_vectorization_status()
-    return status
+    # One aggregate query; no VectorService (FAISS index load) on this path
+    row = (await db.execute(VECTORIZATION_STATUS_SQL)).mappings().one()
+    return build_vectorization_status(row)
 
 @router.post("/generate-vectors-batch")
-async def generate_vectors_batch(
+def generate_vectors_batch(
     product_ids: List[UUID],
     force_regenerate: bool = False,
     db: Session = Depends(get_db)
@@ -160,81 +262,107 @@ async def generate_vectors_batch(
     """Generate vectors for multiple products in batches."""
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_batch(product_ids, force_regenerate=force_regenerate)
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     return result
 
 @router.post("/generate-vectors-missing")
-async def generate_vectors_for_missing_products(
+def generate_vectors_for_missing_products(
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """Generate vectors for products that don't have them."""
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_for_missing()
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     return result
 
 @router.get("/{product_id}", response_model=ProductSchema)
-def get_product(product_id: UUID, db: Session = Depends(get_db)):
+async def get_product(product_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get a specific product by ID."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    with _product_cache_lock:
+        cached = _product_cache.get(product_id)
+    if cached is not None:
+        return cached
+    
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    
+    data = ProductSchema.model_validate(product).model_dump()
+    with _product_cache_lock:
+        _product_cache[product_id] = data
+    return data
 
 @router.put("/{product_id}", response_model=ProductSchema)
 async def update_product(
     product_id: UUID, 
     product_update: ProductUpdate, 
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a product and regenerate vectors if needed."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    update_data = product_update.dict(exclude_unset=True)
+    if update_data:
+        # UPDATE ... RETURNING: no SELECT before the write or refresh after it
+        result = await db.execute(
+            update(Product).where(Product.id == product_id).values(**update_data).returning(Product)
+        )
+        product = result.scalar_one_or_none()
+    else:
+        product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Update fields
-    update_data = product_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(product, field, value)
-    
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    # UPDATE ... RETURNING doesn't go through the flush, so no mapper event fires
+    _evict_product(product_id)
+    if 'category' in update_data or 'tags' in update_data:
+        await clear_namespaces(CATEGORIES_NAMESPACE, TAGS_NAMESPACE)
+    if 'category' in update_data or 'brand_id' in update_data:
+        invalidate_vector_matrix()
+    if update_data.keys() & (set(SEARCHABLE_ATTRIBUTES) | {'brand_id'}):
+        invalidate_term_index()
+    if update_data.keys() & set(SEARCHABLE_ATTRIBUTES):
+        background_tasks.add_task(index_product, product_document(product))
     
     # Regenerate vectors in background if image or text changed
     if 'image' in update_data or 'name' in update_data or 'description' in update_data:
-        background_tasks.add_task(generate_vectors_background, product_id, db)
+        await vector_queue.enqueue(product_id, force_regenerate=True)
     
     return product
 
 @router.delete("/{product_id}")
-def delete_product(product_id: UUID, db: Session = Depends(get_db)):
+async def delete_product(
+    product_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Delete a product."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    db.delete(product)
-    db.commit()
+    await db.delete(product)
+    await db.commit()
+    await clear_namespaces(*PRODUCT_LISTING_NAMESPACES)
+    background_tasks.add_task(remove_product, product_id)
     return {"message": "Product deleted successfully"}
 
 @router.get("/categories/", response_model=List[str])
-def get_categories(db: Session = Depends(get_db)):
+@cache(expire=LISTING_CACHE_TTL, namespace=CATEGORIES_NAMESPACE, key_builder=endpoint_key_builder)
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """Get all unique product categories."""
-    categories = db.query(Product.category).distinct().filter(Product.category.isnot(None)).all()
-    return [cat[0] for cat in categories]
+    return (await db.execute(DISTINCT_CATEGORIES_SQL)).scalars().all()
 
 @router.get("/tags/", response_model=List[str])
-def get_tags(db: Session = Depends(get_db)):
+@cache(expire=LISTING_CACHE_TTL, namespace=TAGS_NAMESPACE, key_builder=endpoint_key_builder)
+async def get_tags(db: AsyncSession = Depends(get_async_db)):
     """Get all unique product tags."""
-    products_with_tags = db.query(Product.tags).filter(Product.tags.isnot(None)).all()
-    all_tags = set()
-    for product_tags in products_with_tags:
-        if product_tags[0]:
-            all_tags.update(product_tags[0])
-    return list(all_tags)
+    # Deduplicate in Postgres so only the distinct tags cross the wire
+    return (await db.execute(DISTINCT_TAGS_SQL)).scalars().all()
 
 @router.post("/{product_id}/generate-vectors")
-async def generate_vectors_for_product(
+def generate_vectors_for_product(
     product_id: UUID,
     force_regenerate: bool = False,
     db: Session = Depends(get_db)
@@ -242,6 +370,7 @@ async def generate_vectors_for_product(
     """Generate vectors for a specific product."""
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_for_product(product_id, force_regenerate)
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     
     if not result['success']:
         raise HTTPException(status_code=400, detail=result['error'])
@@ -1,102 +1,278 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case
-from typing import List, Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, case, select, cast, Text, exists, bindparam, Integer, text, tuple_, any_, all_
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, TSQUERY, UUID as PG_UUID
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
-from app.db import get_db
-from app.models import Swipe, Product, User
+from app.db import get_db, get_async_db
+from app.models import Swipe, Product, User, UserPreference
 from app.schemas import Product as ProductSchema
 from app.services.recommendations import RecommendationsService
-from app.services.vector_service import VectorService
+from app.services.vector_service import (
+    VectorService, PRODUCTS_BY_IDS, PRODUCT_IDS_TYPE, exclude_product_ids,
+    VECTORIZATION_STATUS_SQL, build_vectorization_status
+)
+from app.services.vector_matrix import get_vector_matrix
+from app.services.query_helpers import not_swiped_by
+from app.services.random_products import random_products_async
+from app.services.recommendation_cache import (
+    redis_client, CACHE_ENABLED, get_cached_recommendations, set_cached_recommendations,
+    get_last_swipe_marker, clear_local_recommendations
+)
+from app.utils.response_cache import (
+    cache, endpoint_key_builder, clear_namespace_sync, get_cached_int, set_cached_int,
+    VECTORIZATION_CACHE_TTL, VECTORIZATION_NAMESPACE, CATALOGUE_NAMESPACE, PRODUCTS_COUNT_TTL
+)
 from sqlalchemy.sql.expression import func as sql_func
+import asyncio
 import logging
 import time
 from datetime import datetime
-from functools import lru_cache
-import redis
-import json
+from collections import Counter
+from itertools import chain
+import orjson
 
 # Set up logging for API endpoints
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Redis cache for recommendations (optional - remove if not using Redis)
-try:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-    CACHE_ENABLED = True
-except:
-    redis_client = None
-    CACHE_ENABLED = False
+# Most-liked products, identical for every user, so cached once for all of them
+POPULAR_POOL_KEY = "popular:product_ids"
+POPULAR_POOL_SIZE = 1000
+POPULAR_POOL_TTL = 60  # seconds
 
-# In-memory cache for frequently accessed data
-@lru_cache(maxsize=1000)
-def get_user_swipe_count(user_id: str) -> int:
-    """Cache user swipe counts to avoid repeated DB queries"""
-    # This would need to be implemented with proper DB session handling
-    pass
+POPULAR_PRODUCT_IDS = (
+    select(Swipe.product_id)
+    .where(Swipe.action == "right")
+    .group_by(Swipe.product_id)
+    .order_by(func.count().desc())
+    .limit(POPULAR_POOL_SIZE)
+)
 
-def get_cached_recommendations(user_id: str, cache_key: str, ttl: int = 300) -> Optional[List[Dict]]:
-    """Get recommendations from cache if available"""
-    if not CACHE_ENABLED:
-        return None
-    
-    try:
-        cached = redis_client.get(f"rec:{user_id}:{cache_key}")
-        if cached:
-            return json.loads(cached)
-    except Exception as e:
-        logger.warning(f"Cache error: {e}")
+def _cached_popular_ids() -> Optional[List[UUID]]:
+    """The popular pool from Redis, or None on a miss."""
+    if CACHE_ENABLED:
+        try:
+            cached = redis_client.get(POPULAR_POOL_KEY)
+            if cached:
+                return [UUID(product_id) for product_id in orjson.loads(cached)]
+        except Exception as e:
+            logger.warning(f"Cache error: {e}")
     return None
 
-def set_cached_recommendations(user_id: str, cache_key: str, recommendations: List[Dict], ttl: int = 300):
-    """Cache recommendations with TTL"""
+def _store_popular_ids(product_ids: List[UUID]):
+    """Cache the popular pool for POPULAR_POOL_TTL."""
+    if CACHE_ENABLED:
+        try:
+            redis_client.setex(POPULAR_POOL_KEY, POPULAR_POOL_TTL, orjson.dumps(product_ids))
+        except Exception as e:
+            logger.warning(f"Cache error: {e}")
+
+def _popular_page(product_ids: List[UUID], swiped_ids: set, offset: int, limit: int) -> Optional[List[UUID]]:
+    """One page of unswiped ids from the pool, or None if the pool can't fill it."""
+    unswiped = [p for p in product_ids if p not in swiped_ids]
+    page_ids = unswiped[offset:offset + limit]
+    return page_ids if len(page_ids) == limit else None
+
+def _cold_start_split(pool_ids: List[UUID], offset: int, limit: int) -> Tuple[List[UUID], int]:
+    """Pool ids for the page at offset, and the catalogue offset for the rest of it.
+
+    Cold-start pages run through the pool, then through the catalogue (pool
+    excluded), so a page crossing the boundary is filled from both.
+    """
+    return pool_ids[offset:offset + limit], max(0, offset - len(pool_ids))
+
+def _in_order(products, page_ids: List[UUID]) -> List[Product]:
+    """Products hydrated by id, back in page order."""
+    by_id = {p.id: p for p in products}
+    return [by_id[p] for p in page_ids if p in by_id]
+
+async def _popular_pool_ids(db: AsyncSession) -> List[UUID]:
+    """The popular pool from Redis (in a worker thread), else the database."""
+    product_ids = await asyncio.to_thread(_cached_popular_ids)
+    if product_ids is None:
+        product_ids = list((await db.execute(POPULAR_PRODUCT_IDS)).scalars())
+        await asyncio.to_thread(_store_popular_ids, product_ids)
+    return product_ids
+
+async def _popular_products_async(db: AsyncSession, swiped_ids: set, offset: int,
+                                  limit: int) -> Optional[List[Product]]:
+    """A page of popular unswiped products, or None if the pool can't fill it."""
+    page_ids = _popular_page(await _popular_pool_ids(db), swiped_ids, offset, limit)
+    if page_ids is None:
+        return None
+    return _in_order((await db.execute(PRODUCTS_BY_IDS, {"ids": page_ids})).scalars(), page_ids)
+
+# Performance monitoring: counters in a Redis hash, incremented atomically, so
+# every worker and thread adds to the same totals
+PERF_STATS_KEY = "perf:recommendations"
+
+def update_performance_stats(response_time: float, cache_hit: bool = False):
+    """Count a request, its response time and whether it was a cache hit."""
     if not CACHE_ENABLED:
         return
-    
     try:
-        redis_client.setex(
-            f"rec:{user_id}:{cache_key}",
-            ttl,
-            json.dumps(recommendations, default=str)
-        )
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hincrby(PERF_STATS_KEY, 'total_requests', 1)
+        pipe.hincrbyfloat(PERF_STATS_KEY, 'total_response_time', response_time)
+        pipe.hincrby(PERF_STATS_KEY, 'cache_hits' if cache_hit else 'cache_misses', 1)
+        pipe.execute()
     except Exception as e:
         logger.warning(f"Cache error: {e}")
 
-# Performance monitoring
-performance_stats = {
-    'total_requests': 0,
-    'avg_response_time': 0,
-    'cache_hits': 0,
-    'cache_misses': 0
-}
+def get_performance_stats() -> Dict[str, Any]:
+    """Totals across all workers, with the average computed on read."""
+    stats = {}
+    if CACHE_ENABLED:
+        try:
+            stats = redis_client.hgetall(PERF_STATS_KEY)
+        except Exception as e:
+            logger.warning(f"Cache error: {e}")
+    total_requests = int(stats.get('total_requests', 0))
+    total_response_time = float(stats.get('total_response_time', 0))
+    return {
+        'total_requests': total_requests,
+        'avg_response_time': total_response_time / total_requests if total_requests else 0,
+        'cache_hits': int(stats.get('cache_hits', 0)),
+        'cache_misses': int(stats.get('cache_misses', 0))
+    }
 
-def update_performance_stats(response_time: float, cache_hit: bool = False):
-    """Update performance statistics"""
-    performance_stats['total_requests'] += 1
-    performance_stats['avg_response_time'] = (
-        (performance_stats['avg_response_time'] * (performance_stats['total_requests'] - 1) + response_time) 
-        / performance_stats['total_requests']
+async def _swipe_history(db: AsyncSession, user_id: UUID):
+    """The user's swipes with the product columns preference scoring needs, in one query."""
+    result = await db.execute(
+        select(
+            Swipe.product_id,
+            Swipe.action,
+            Product.category,
+            Product.brand_id,
+            Product.tags
+        ).join(
+            Product, Swipe.product_id == Product.id
+        ).where(
+            Swipe.user_id == user_id
+        )
     )
-    if cache_hit:
-        performance_stats['cache_hits'] += 1
-    else:
-        performance_stats['cache_misses'] += 1
+    return result.all()
+
+# Most frequent liked tags used for tag matching
+PREFERRED_TAGS_LIMIT = 5
+
+def _preferred_tags(history) -> List[str]:
+    """The user's most frequent liked tags, minus tags they dislike at least as often."""
+    liked = Counter(chain.from_iterable(s.tags or () for s in history if s.action == "right"))
+    liked.subtract(chain.from_iterable(s.tags or () for s in history if s.action == "left"))
+    return [tag for tag, count in liked.most_common(PREFERRED_TAGS_LIMIT) if count > 0]
+
+def _tags_overlap(tags: List[str]):
+    """tags && :tags, one predicate for all tags (uses products_tags_gin)."""
+    return Product.tags.op('&&')(cast(tags, PG_ARRAY(Text)))
+
+def _preference_tier(categories, brands, tags=()):
+    """1 for a liked category, 2 for a liked brand, 3 for a shared tag, 4 otherwise; ranked by Postgres."""
+    whens = [
+        (Product.category.in_(categories), 1),
+        (Product.brand_id.in_(brands), 2),
+    ]
+    if tags:
+        whens.append((_tags_overlap(list(tags)), 3))
+    return case(*whens, else_=4)
+
+def _after_recommendation(score, cursor):
+    """Keyset predicate for recommend: rows that rank after the cursor product.
+
+    Compares (score, id) against the cursor row's score, so deep pages seek
+    instead of scanning and discarding OFFSET rows.
+    """
+    cursor_score = select(score).where(Product.id == cursor).correlate(None).scalar_subquery()
+    return tuple_(score, Product.id) < tuple_(cursor_score, cursor)
+
+# recommend's preference ranking, built once. Preference lists bind as arrays,
+# so the SQL text (and asyncpg's prepared statement) is the same for every
+# user however many categories and brands they have
+_liked_categories = bindparam("liked_categories", type_=PG_ARRAY(Text))
+_disliked_categories = bindparam("disliked_categories", type_=PG_ARRAY(Text))
+_liked_brands = bindparam("liked_brands", type_=PRODUCT_IDS_TYPE)
+_disliked_brands = bindparam("disliked_brands", type_=PRODUCT_IDS_TYPE)
+RECOMMEND_SCORE = case(
+    (Product.category == any_(_liked_categories), 3),
+    (Product.brand_id == any_(_liked_brands), 2),
+    else_=1
+)
+# Ties break on id so the order is stable across pages
+RECOMMEND_STMT = (
+    select(Product, RECOMMEND_SCORE.label('score'))
+    .where(
+        not_swiped_by(bindparam("user_id", type_=PG_UUID(as_uuid=True))),
+        Product.category != all_(_disliked_categories),
+        Product.brand_id != all_(_disliked_brands)
+    )
+    .order_by(RECOMMEND_SCORE.desc(), Product.id.desc())
+    .offset(bindparam("offset", type_=Integer))
+    .limit(bindparam("limit", type_=Integer))
+)
+# The same ranking continued past a cursor product
+RECOMMEND_AFTER_CURSOR_STMT = RECOMMEND_STMT.where(
+    _after_recommendation(RECOMMEND_SCORE, bindparam("cursor", type_=PG_UUID(as_uuid=True)))
+)
+
+# Natural-language product match for semantic_recommendations: any query term
+# (plainto_tsquery with its ANDs turned into ORs) against search_tsv, or a fuzzy
+# trigram match on the name; ranked 0.7 full-text / 0.3 name similarity
+_semantic_q = bindparam("q", type_=Text)
+_semantic_tsquery = cast(func.replace(cast(func.plainto_tsquery('english', _semantic_q), Text), '&', '|'), TSQUERY)
+SEMANTIC_RECOMMENDATIONS_STMT = (
+    select(Product)
+    .where(
+        or_(Product.search_tsv.op('@@')(_semantic_tsquery), Product.name.op('%')(_semantic_q)),
+        ~exists().where(
+            Swipe.user_id == bindparam("user_id", type_=PG_UUID(as_uuid=True)),
+            Swipe.product_id == Product.id
+        )
+    )
+    .order_by((
+        func.ts_rank(Product.search_tsv, _semantic_tsquery) * 0.7
+        + func.similarity(func.coalesce(Product.name, ''), _semantic_q) * 0.3
+    ).desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+
+# A user's swipe counts in one scan of their swipes
+SWIPE_STATUS_SQL = text("""
+    SELECT
+        COUNT(*) AS total_swipes,
+        COUNT(*) FILTER (WHERE action = 'right') AS right_swipes,
+        COUNT(*) FILTER (WHERE action = 'left') AS left_swipes
+    FROM swipes
+    WHERE user_id = :user_id
+""").bindparams(bindparam("user_id", type_=PG_UUID(as_uuid=True)))
+
+# Catalogue size, cached until a product is created or deleted
+PRODUCTS_COUNT = select(func.count()).select_from(Product)
+
+async def _products_count(db: AsyncSession) -> int:
+    """Number of products (response cache, then DB)."""
+    count = await get_cached_int(CATALOGUE_NAMESPACE, "products_count")
+    if count is None:
+        count = (await db.execute(PRODUCTS_COUNT)).scalar_one()
+        await set_cached_int(CATALOGUE_NAMESPACE, "products_count", count, PRODUCTS_COUNT_TTL)
+    return count
 
 # Non-user-specific endpoints (must come before user_id patterns)
 @router.get("/vectorization-status")
-def get_vectorization_status(db: Session = Depends(get_db)):
-    """Get overall vectorization status across all products."""
-    
-    vector_service = VectorService(db)
-    status = vector_service.get_vectorization_status()
-    
-    return status
+@cache(expire=VECTORIZATION_CACHE_TTL, namespace=VECTORIZATION_NAMESPACE, key_builder=endpoint_key_builder)
+async def get_vectorization_status(db: AsyncSession = Depends(get_async_db)):
+    """Get overall vectorization status across all products (cached, dropped on vector writes)."""
+    # One aggregate query; no VectorService (FAISS index load) on this path
+    row = (await db.execute(VECTORIZATION_STATUS_SQL)).mappings().one()
+    return build_vectorization_status(row)
 
 @router.get("/vector-performance-stats")
 def get_vector_performance_stats():
     """Get performance statistics for vector operations."""
-    return performance_stats
+    return get_performance_stats()
 
 @router.delete("/vector-cache/clear")
 def clear_vector_cache():
@@ -105,6 +281,7 @@ def clear_vector_cache():
         # Clear in-memory caches
         # vector_cache.clear() # This line was removed as per the edit hint
         # preference_cache.clear() # This line was removed as per the edit hint
+        clear_local_recommendations()
         
         # Clear Redis cache if available
         try:
@@ -124,114 +301,148 @@ def generate_vectors_for_missing(db: Session = Depends(get_db)):
     
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_for_missing()
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     
     return result
 
+# Keyset cursors for recommend. The cursor of the next page is returned in a
+# header; cold-start cursors taken inside the popular pool carry POOL_CURSOR_PREFIX,
+# a bare id continues the catalogue (or the preference ranking) after that id.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+POOL_CURSOR_PREFIX = "pool:"
+
+def _parse_cursor(cursor: Optional[str]) -> Tuple[Optional[UUID], bool]:
+    """The cursor's product id and whether it was taken inside the popular pool."""
+    if not cursor:
+        return None, False
+    in_pool = cursor.startswith(POOL_CURSOR_PREFIX)
+    try:
+        return UUID(cursor[len(POOL_CURSOR_PREFIX):] if in_pool else cursor), in_pool
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 # User-specific endpoints
 @router.get("/{user_id}", response_model=List[ProductSchema])
-def recommend(
+async def recommend(
     user_id: UUID, 
+    response: Response,
     limit: int = Query(default=5, ge=1, le=20, description="Number of recommendations (1-20)"), 
     page: int = Query(default=1, ge=1, description="Page number for pagination"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description=f"Keyset pagination: the {NEXT_CURSOR_HEADER} header of the previous page (replaces page)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get product recommendations for a user based on their swipe history with pagination."""
+    start_time = time.time()
+    cursor_id, cursor_in_pool = _parse_cursor(cursor)
+    
+    # The last-swipe marker (Redis) and the preference counts (Postgres, kept up
+    # to date on swipe) are independent, so both are fetched at once
+    marker, user_preferences = await asyncio.gather(
+        asyncio.to_thread(get_last_swipe_marker, user_id),
+        db.get(UserPreference, user_id)
+    )
     
-    # Check cache first
-    cache_key = f"basic:{limit}:{page}"
-    cached = get_cached_recommendations(str(user_id), cache_key)
+    # Check cache
+    cache_key = f"recommend:{marker}:{limit}:{cursor or page}" if marker is not None else None
+    cached = await asyncio.to_thread(get_cached_recommendations, str(user_id), cache_key)
     if cached:
         logger.info(f"Cache hit for user {user_id}")
-        return cached
-    
-    # Optimized query to get total products and user swipes in one go
-    total_products, user_swipes_count = db.query(
-        func.count(Product.id),
-        func.count(Swipe.id)
-    ).outerjoin(
-        Swipe, and_(Swipe.user_id == user_id, Swipe.product_id == Product.id)
-    ).first()
-    
-    # If user has swiped on all products, return empty
-    if user_swipes_count >= total_products and total_products > 0:
-        return []
-    
-    # Get user's preferences efficiently
-    user_preferences = db.query(
-        Swipe.action,
-        Product.category,
-        Product.brand_id
-    ).join(
-        Product, Swipe.product_id == Product.id
-    ).filter(
-        Swipe.user_id == user_id
-    ).all()
+        if cached["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = cached["next_cursor"]
+        await asyncio.to_thread(update_performance_stats, time.time() - start_time, True)
+        return cached["recommendations"]
     
-    # Extract preferences
-    liked_categories = [p.category for p in user_preferences if p.action == "right" and p.category]
-    disliked_categories = [p.category for p in user_preferences if p.action == "left" and p.category]
-    liked_brands = [p.brand_id for p in user_preferences if p.action == "right" and p.brand_id]
-    disliked_brands = [p.brand_id for p in user_preferences if p.action == "left" and p.brand_id]
-    
-    # Get swiped product IDs efficiently
-    swiped_ids = db.query(Swipe.product_id).filter(Swipe.user_id == user_id).subquery()
+    # Swiped products are excluded server-side (NOT EXISTS). A user who has swiped
+    # everything needs no separate count: the recommendation query returns no rows.
     
-    # Build optimized recommendation query with pagination
-    offset = (page - 1) * limit
+    # Build optimized recommendation query with pagination; a cursor seeks
+    # past the previous page, page falls back to OFFSET
+    offset = 0 if cursor else (page - 1) * limit
+    pool_count = 0
     
     if not user_preferences:
-        # Random recommendations for new users
-        recommendations = db.query(Product).filter(
-            ~Product.id.in_(swiped_ids)
-        ).order_by(func.random()).offset(offset).limit(limit).all()
+        # Popular products for new users, then the rest of the catalogue (in id
+        # order, pool excluded) once the pool runs out
+        pool_ids = await _popular_pool_ids(db)
+        catalogue_after = None
+        if cursor_id is not None:
+            # A bare id from inside the pool is an older client's cursor: still the pool
+            if cursor_in_pool or cursor_id in pool_ids:
+                offset = pool_ids.index(cursor_id) + 1 if cursor_id in pool_ids else len(pool_ids)
+            else:
+                offset, catalogue_after = len(pool_ids), cursor_id
+        pool_page, catalogue_offset = _cold_start_split(pool_ids, offset, limit)
+        
+        recommendations = []
+        if pool_page:
+            recommendations = _in_order(
+                (await db.execute(PRODUCTS_BY_IDS, {"ids": pool_page})).scalars(), pool_page
+            )
+        pool_count = len(recommendations)
+        if len(pool_page) < limit:
+            query = select(Product).where(not_swiped_by(user_id), exclude_product_ids(pool_ids))
+            if catalogue_after is not None:
+                query = query.where(Product.id < catalogue_after)
+            result = await db.execute(
+                query.order_by(Product.id.desc()).offset(catalogue_offset).limit(limit - len(pool_page))
+            )
+            recommendations += result.scalars().all()
     else:
-        # Preference-based recommendations with scoring
-        recommendations = db.query(Product).filter(
-            ~Product.id.in_(swiped_ids)
-        ).add_columns(
-            case(
-                (Product.category.in_(liked_categories), 3),
-                (Product.brand_id.in_(liked_brands), 2),
-                else_=1
-            ).label('score')
-        ).filter(
-            ~Product.category.in_(disliked_categories) if disliked_categories else True,
-            ~Product.brand_id.in_(disliked_brands) if disliked_brands else True
-        ).order_by(
-            case(
-                (Product.category.in_(liked_categories), 3),
-                (Product.brand_id.in_(liked_brands), 2),
-                else_=1
-            ).desc(),
-            func.random()
-        ).offset(offset).limit(limit).all()
+        # Preference-based recommendations with scoring: one statement that
+        # excludes swiped products in a subquery
+        # Both statements are built at import; a request only binds parameters
+        result = await db.execute(RECOMMEND_AFTER_CURSOR_STMT if cursor_id else RECOMMEND_STMT, {
+            "user_id": user_id,
+            "cursor": cursor_id,
+            "offset": offset,
+            "limit": limit,
+            "liked_categories": list(user_preferences.liked_categories),
+            "disliked_categories": list(user_preferences.disliked_categories),
+            "liked_brands": [UUID(b) for b in user_preferences.liked_brands],
+            "disliked_brands": [UUID(b) for b in user_preferences.disliked_brands],
+        })
         
         # Extract just the Product objects
-        recommendations = [r[0] for r in recommendations]
+        recommendations = result.scalars().all()
+    
+    next_cursor = None
+    if recommendations:
+        last_id = str(recommendations[-1].id)
+        next_cursor = POOL_CURSOR_PREFIX + last_id if len(recommendations) == pool_count else last_id
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     # Cache the results
-    set_cached_recommendations(str(user_id), cache_key, [p.__dict__ for p in recommendations])
+    await asyncio.to_thread(
+        set_cached_recommendations, str(user_id), cache_key,
+        {"recommendations": [p.__dict__ for p in recommendations], "next_cursor": next_cursor}
+    )
+    await asyncio.to_thread(update_performance_stats, time.time() - start_time)
     
     return recommendations
 
 @router.get("/{user_id}/simple")
-def simple_recommendations(user_id: UUID, limit: int = 5, db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def simple_recommendations(user_id: UUID, limit: int = 5, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get simple recommendations based on user preferences."""
     
-    # Get user's liked products
-    liked_swipes = db.query(Swipe).filter(
-        Swipe.user_id == user_id,
-        Swipe.action == "right"
-    ).all()
-    
-    # Get swiped product IDs to exclude
-    swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(Swipe.user_id == user_id).all())
-    
-    if not liked_swipes:
-        # Return random products if no likes
-        random_products = db.query(Product).filter(
-            ~Product.id.in_(swiped_ids)
-        ).order_by(func.random()).limit(limit).all()
+    # Swiped ids and liked product details from one query
+    history = await _swipe_history(db, user_id)
+    swiped_ids = {s.product_id for s in history}
+    liked_products = [s for s in history if s.action == "right"]
+    
+    if not liked_products:
+        # Return popular products if no likes
+        popular_products = await _popular_products_async(db, swiped_ids, 0, limit)
+        if popular_products is not None:
+            return {
+                "recommendations": popular_products,
+                "method": "popular",
+                "reason": "No previous likes to base recommendations on"
+            }
+        
+        # Return random products if there aren't enough popular ones
+        random_products = await random_products_async(
+            db, select(Product).where(not_swiped_by(user_id)), limit
+        )
         
         return {
             "recommendations": random_products,
@@ -239,50 +450,46 @@ def simple_recommendations(user_id: UUID, limit: int = 5, db: Session = Depends(
             "reason": "No previous likes to base recommendations on"
         }
     
-    # Get liked product details
-    liked_products = db.query(Product).filter(
-        Product.id.in_([s.product_id for s in liked_swipes])
-    ).all()
-    
     # Extract preferences
-    categories = [p.category for p in liked_products if p.category]
-    brands = [p.brand_id for p in liked_products if p.brand_id]
-    
-    # Find similar products
-    similar_products = db.query(Product).filter(
-        ~Product.id.in_(swiped_ids),
-        or_(
-            Product.category.in_(categories) if categories else False,
-            Product.brand_id.in_(brands) if brands else False
-        )
-    ).limit(limit).all()
+    categories = list({p.category for p in liked_products if p.category})
+    brands = list({p.brand_id for p in liked_products if p.brand_id})
+    tags = _preferred_tags(history)
+    
+    # Find similar products, ranked category > brand > tag, top-K in the database
+    result = await db.execute(
+        select(Product).where(
+            not_swiped_by(user_id),
+            or_(
+                Product.category.in_(categories) if categories else False,
+                Product.brand_id.in_(brands) if brands else False,
+                _tags_overlap(tags) if tags else False
+            )
+        ).order_by(
+            _preference_tier(categories, brands, tags)
+        ).limit(limit)
+    )
+    similar_products = result.scalars().all()
     
     return {
         "recommendations": similar_products,
         "method": "preference_based",
         "preferences": {
-            "categories": list(set(categories)),
-            "brands": list(set(brands))
+            "categories": categories,
+            "brands": brands,
+            "tags": tags
         }
     }
 
 @router.get("/{user_id}/status")
-def get_swipe_status(user_id: UUID, db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_swipe_status(user_id: UUID, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get user's swipe status and recommendation readiness."""
     
-    # Get user's swipe counts
-    total_swipes = db.query(Swipe).filter(Swipe.user_id == user_id).count()
-    right_swipes = db.query(Swipe).filter(
-        Swipe.user_id == user_id,
-        Swipe.action == "right"
-    ).count()
-    left_swipes = db.query(Swipe).filter(
-        Swipe.user_id == user_id,
-        Swipe.action == "left"
-    ).count()
-    
-    # Get total products
-    total_products = db.query(Product).count()
+    # The user's swipe counts (one scan) and the cached catalogue size
+    counts = (await db.execute(SWIPE_STATUS_SQL, {"user_id": user_id})).one()
+    total_products = await _products_count(db)
+    total_swipes = counts.total_swipes
+    right_swipes = counts.right_swipes
+    left_swipes = counts.left_swipes
     
     # Calculate percentages
     swipe_percentage = (total_swipes / total_products * 100) if total_products > 0 else 0
@@ -301,119 +508,78 @@ def get_swipe_status(user_id: UUID, db: Session = Depends(get_db)) -> Dict[str,
     }
 
 @router.get("/{user_id}/hybrid", response_model=List[ProductSchema])
-def hybrid_recommendations(
+async def hybrid_recommendations(
     user_id: UUID, 
     limit: int = 10, 
     search_query: Optional[str] = None,
     category: Optional[str] = None,
     brand_id: Optional[UUID] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get hybrid recommendations combining user preferences with search filters."""
     
-    # Get user's liked products
-    liked_swipes = db.query(Swipe).filter(
-        Swipe.user_id == user_id,
-        Swipe.action == "right"
-    ).all()
-    
-    # Get swiped product IDs
-    swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(Swipe.user_id == user_id).all())
+    # Liked product details from one query
+    history = await _swipe_history(db, user_id)
+    liked_products = [s for s in history if s.action == "right"]
     
     # Build base query
-    query = db.query(Product).filter(~Product.id.in_(swiped_ids))
+    query = select(Product).where(not_swiped_by(user_id))
     
     # Apply filters
     if category:
-        query = query.filter(Product.category == category)
+        query = query.where(Product.category == category)
     if brand_id:
-        query = query.filter(Product.brand_id == brand_id)
+        query = query.where(Product.brand_id == brand_id)
     if search_query:
-        query = query.filter(
-            or_(
-                Product.name.ilike(f"%{search_query}%"),
-                Product.description.ilike(f"%{search_query}%")
-            )
+        # Indexed full-text match instead of unanchored ILIKE scans
+        query = query.where(
+            Product.search_tsv.op('@@')(func.plainto_tsquery('english', search_query))
         )
     
     # If user has likes, prioritize similar products
-    if liked_swipes:
-        liked_products = db.query(Product).filter(
-            Product.id.in_([s.product_id for s in liked_swipes])
-        ).all()
-        
-        liked_categories = [p.category for p in liked_products if p.category]
-        liked_brands = [p.brand_id for p in liked_products if p.brand_id]
+    if liked_products:
+        liked_categories = list({p.category for p in liked_products if p.category})
+        liked_brands = list({p.brand_id for p in liked_products if p.brand_id})
         
         # Order by preference similarity
         query = query.order_by(
-            func.case(
-                (Product.category.in_(liked_categories), 1),
-                (Product.brand_id.in_(liked_brands), 2),
-                else_=3
-            )
+            _preference_tier(liked_categories, liked_brands, _preferred_tags(history))
         )
     
-    return query.limit(limit).all()
+    return (await db.execute(query.limit(limit))).scalars().all()
 
 @router.get("/{user_id}/semantic", response_model=List[ProductSchema])
-def semantic_recommendations(
+async def semantic_recommendations(
     user_id: UUID,
     query_text: str = Query(..., description="Natural language query"),
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get semantic recommendations based on natural language query."""
-    
-    # Get swiped product IDs to exclude
-    swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(Swipe.user_id == user_id).all())
-    
-    # Simple semantic search implementation
-    query_terms = query_text.lower().split()
-    
-    # Get all unswiped products
-    products = db.query(Product).filter(~Product.id.in_(swiped_ids)).all()
-    
-    # Score products based on query terms
-    scored_products = []
-    for product in products:
-        score = 0
-        
-        # Name relevance
-        if product.name:
-            name_terms = product.name.lower().split()
-            name_matches = sum(1 for term in query_terms if any(term in name_term for name_term in name_terms))
-            score += name_matches * 0.3
-        
-        # Description relevance
-        if product.description:
-            desc_terms = product.description.lower().split()
-            desc_matches = sum(1 for term in query_terms if any(term in desc_term for desc_term in desc_terms))
-            score += desc_matches * 0.2
-        
-        # Category relevance
-        if product.category and any(term in product.category.lower() for term in query_terms):
-            score += 0.2
-        
-        # Tag relevance
-        if product.tags:
-            tag_matches = sum(1 for term in query_terms if any(term in tag.lower() for tag in product.tags))
-            score += tag_matches * 0.1
-        
-        # Color relevance
-        if product.color and any(term in product.color.lower() for term in query_terms):
-            score += 0.1
-        
-        # Brand relevance
-        if product.brand and any(term in product.brand.name.lower() for term in query_terms):
-            score += 0.1
-        
-        if score > 0:
-            scored_products.append((product, score))
-    
-    # Sort by score and return top results
-    scored_products.sort(key=lambda x: x[1], reverse=True)
-    return [product for product, score in scored_products[:limit]]
+    # Matched, scored and ranked in Postgres against the GIN indexes
+    result = await db.execute(
+        SEMANTIC_RECOMMENDATIONS_STMT,
+        {"q": query_text, "user_id": user_id, "limit": limit}
+    )
+    return result.scalars().all()
+
+def _vector_recommendation_item(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """One vector recommendation as a response item (price as float: orjson has no Decimal)."""
+    product = rec['product']
+    return {
+        'id': product.id,
+        'name': product.name,
+        'description': product.description,
+        'image': product.image,
+        'category': product.category,
+        'color': product.color,
+        'tags': product.tags,
+        'price': float(product.price) if product.price else None,
+        'brand_id': product.brand_id,
+        'similarity_score': rec['score'],
+        'recommendation_reason': rec['reason'],
+        'vector_metadata': rec['vector_metadata']
+    }
 
 # New vector-based endpoints
 @router.get("/{user_id}/vector", response_model=List[Dict[str, Any]])
@@ -479,27 +645,12 @@ def get_vector_recommendations(
             score = rec['score']
             logger.info(f"🏆 [{request_id}] Top {i+1}: {product.name} (score: {score:.4f})")
         
-        # Format response
-        response = []
-        for rec in recommendations:
-            product = rec['product']
-            response.append({
-                'id': str(product.id),
-                'name': product.name,
-                'description': product.description,
-                'image': product.image,
-                'category': product.category,
-                'color': product.color,
-                'tags': product.tags,
-                'price': float(product.price) if product.price else None,
-                'brand_id': str(product.brand_id) if product.brand_id else None,
-                'similarity_score': rec['score'],
-                'recommendation_reason': rec['reason'],
-                'vector_metadata': rec['vector_metadata']
-            })
+        # Format response; returned as ORJSONResponse so the items skip response_model
+        # validation and go straight to orjson (UUIDs included)
+        response = [_vector_recommendation_item(rec) for rec in recommendations]
         
         logger.info(f"🎯 [{request_id}] API RESPONSE: Returning {len(response)} recommendations")
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         processing_time = time.time() - start_time
@@ -557,27 +708,12 @@ def get_similar_products(
             score = rec['score']
             logger.info(f"🏆 [{request_id}] Top {i+1}: {product.name} (score: {score:.4f})")
         
-        # Format response
-        response = []
-        for rec in recommendations:
-            product = rec['product']
-            response.append({
-                'id': str(product.id),
-                'name': product.name,
-                'description': product.description,
-                'image': product.image,
-                'category': product.category,
-                'color': product.color,
-                'tags': product.tags,
-                'price': float(product.price) if product.price else None,
-                'brand_id': str(product.brand_id) if product.brand_id else None,
-                'similarity_score': rec['score'],
-                'recommendation_reason': rec['reason'],
-                'vector_metadata': rec['vector_metadata']
-            })
+        # Format response; returned as ORJSONResponse so the items skip response_model
+        # validation and go straight to orjson (UUIDs included)
+        response = [_vector_recommendation_item(rec) for rec in recommendations]
         
         logger.info(f"🎯 [{request_id}] API RESPONSE: Returning {len(response)} similar products")
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         processing_time = time.time() - start_time
@@ -627,27 +763,12 @@ def search_products_by_text(
             score = rec['score']
             logger.info(f"🏆 [{request_id}] Top {i+1}: {product.name} (score: {score:.4f})")
         
-        # Format response
-        response = []
-        for rec in recommendations:
-            product = rec['product']
-            response.append({
-                'id': str(product.id),
-                'name': product.name,
-                'description': product.description,
-                'image': product.image,
-                'category': product.category,
-                'color': product.color,
-                'tags': product.tags,
-                'price': float(product.price) if product.price else None,
-                'brand_id': str(product.brand_id) if product.brand_id else None,
-                'similarity_score': rec['score'],
-                'recommendation_reason': rec['reason'],
-                'vector_metadata': rec['vector_metadata']
-            })
+        # Format response; returned as ORJSONResponse so the items skip response_model
+        # validation and go straight to orjson (UUIDs included)
+        response = [_vector_recommendation_item(rec) for rec in recommendations]
         
         logger.info(f"🎯 [{request_id}] API RESPONSE: Returning {len(response)} search results")
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         processing_time = time.time() - start_time
@@ -703,6 +824,7 @@ def generate_product_vectors(
     
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_for_product(product_id, force_regenerate)
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     
     if not result['success']:
         raise HTTPException(status_code=400, detail=result['error'])
@@ -719,6 +841,7 @@ def generate_vectors_batch(
     
     vector_service = VectorService(db)
     result = vector_service.generate_vectors_batch(product_ids, batch_size)
+    clear_namespace_sync(VECTORIZATION_NAMESPACE)
     
     return result
 
@@ -727,7 +850,7 @@ def generate_vectors_batch(
 
 
 @router.get("/{user_id}/hybrid-improved", response_model=List[Dict[str, Any]])
-async def get_hybrid_recommendations_improved(
+def get_hybrid_recommendations_improved(
     user_id: UUID,
     limit: int = Query(10, ge=1, le=20, description="Number of recommendations to return"),
     page: int = Query(1, ge=1, description="Page number for pagination"),
@@ -740,6 +863,7 @@ async def get_hybrid_recommendations_improved(
     db: Session = Depends(get_db)
 ):
     """Get improved hybrid recommendations combining vector, collaborative, and content-based approaches"""
+    start_time = time.time()
     try:
         # Validate weights sum to 1.0
         total_weight = vector_weight + collaborative_weight + content_weight
@@ -750,9 +874,11 @@ async def get_hybrid_recommendations_improved(
             )
         
         # Get cached recommendations if available
-        cache_key = f"hybrid_improved_{user_id}_{limit}_{page}_{category_filter}_{brand_filter}_{vector_weight}_{collaborative_weight}_{content_weight}_{use_time_weighting}"
+        marker = get_last_swipe_marker(user_id)
+        cache_key = f"hybrid_improved_{marker}_{user_id}_{limit}_{page}_{category_filter}_{brand_filter}_{vector_weight}_{collaborative_weight}_{content_weight}_{use_time_weighting}" if marker is not None else None
         cached_result = get_cached_recommendations(str(user_id), cache_key)
         if cached_result:
+            update_performance_stats(time.time() - start_time, cache_hit=True)
             logger.info(f"📦 Returning cached hybrid recommendations for user {user_id}")
             return cached_result
         
@@ -793,6 +919,7 @@ async def get_hybrid_recommendations_improved(
         
         # Cache the result
         set_cached_recommendations(str(user_id), cache_key, response)
+        update_performance_stats(time.time() - start_time)
         
         return response
         
@@ -803,7 +930,7 @@ async def get_hybrid_recommendations_improved(
         raise HTTPException(status_code=500, detail="Failed to get recommendations")
 
 @router.get("/{user_id}/hybrid-time-weighted", response_model=List[Dict[str, Any]])
-async def get_time_weighted_hybrid_recommendations(
+def get_time_weighted_hybrid_recommendations(
     user_id: UUID,
     limit: int = Query(10, ge=1, le=20, description="Number of recommendations to return"),
     page: int = Query(1, ge=1, description="Page number for pagination"),
@@ -816,6 +943,7 @@ async def get_time_weighted_hybrid_recommendations(
     db: Session = Depends(get_db)
 ):
     """Get time-weighted hybrid recommendations with configurable time decay"""
+    start_time = time.time()
     try:
         # Validate weights sum to 1.0
         total_weight = vector_weight + collaborative_weight + content_weight
@@ -826,9 +954,11 @@ async def get_time_weighted_hybrid_recommendations(
             )
         
         # Get cached recommendations if available
-        cache_key = f"hybrid_time_weighted_{user_id}_{limit}_{page}_{category_filter}_{brand_filter}_{time_decay_days}_{vector_weight}_{collaborative_weight}_{content_weight}"
+        marker = get_last_swipe_marker(user_id)
+        cache_key = f"hybrid_time_weighted_{marker}_{user_id}_{limit}_{page}_{category_filter}_{brand_filter}_{time_decay_days}_{vector_weight}_{collaborative_weight}_{content_weight}" if marker is not None else None
         cached_result = get_cached_recommendations(str(user_id), cache_key)
         if cached_result:
+            update_performance_stats(time.time() - start_time, cache_hit=True)
             logger.info(f"📦 Returning cached time-weighted hybrid recommendations for user {user_id}")
             return cached_result
         
@@ -878,6 +1008,7 @@ async def get_time_weighted_hybrid_recommendations(
         
         # Cache the result
         set_cached_recommendations(str(user_id), cache_key, response)
+        update_performance_stats(time.time() - start_time)
         
         return response
         
@@ -943,27 +1074,12 @@ def collaborative_recommendations(
             score = rec['score']
             logger.info(f"🏆 [{request_id}] Top {i+1}: {product.name} (score: {score:.4f})")
         
-        # Format response
-        response = []
-        for rec in recommendations:
-            product = rec['product']
-            response.append({
-                'id': str(product.id),
-                'name': product.name,
-                'description': product.description,
-                'image': product.image,
-                'category': product.category,
-                'color': product.color,
-                'tags': product.tags,
-                'price': float(product.price) if product.price else None,
-                'brand_id': str(product.brand_id) if product.brand_id else None,
-                'similarity_score': rec['score'],
-                'recommendation_reason': rec['reason'],
-                'vector_metadata': rec['vector_metadata']
-            })
+        # Format response; returned as ORJSONResponse so the items skip response_model
+        # validation and go straight to orjson (UUIDs included)
+        response = [_vector_recommendation_item(rec) for rec in recommendations]
         
         logger.info(f"🎯 [{request_id}] API RESPONSE: Returning {len(response)} collaborative recommendations")
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         processing_time = time.time() - start_time
@@ -1293,10 +1409,7 @@ def get_vector_recommendations_optimized(
                     query = query.filter(Product.brand_id == brand_id)
                 
                 # Exclude swiped products
-                swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(
-                    Swipe.user_id == user_id
-                ).all())
-                query = query.filter(~Product.id.in_(swiped_ids))
+                query = query.filter(not_swiped_by(user_id))
                 
                 products = query.all()
                 
@@ -1333,27 +1446,12 @@ def get_vector_recommendations_optimized(
             score = rec['score']
             logger.info(f"🏆 [{request_id}] Top {i+1}: {product.name} (score: {score:.4f})")
         
-        # Format response
-        response = []
-        for rec in recommendations:
-            product = rec['product']
-            response.append({
-                'id': str(product.id),
-                'name': product.name,
-                'description': product.description,
-                'image': product.image,
-                'category': product.category,
-                'color': product.color,
-                'tags': product.tags,
-                'price': float(product.price) if product.price else None,
-                'brand_id': str(product.brand_id) if product.brand_id else None,
-                'similarity_score': rec['score'],
-                'recommendation_reason': rec['reason'],
-                'vector_metadata': rec['vector_metadata']
-            })
+        # Format response; returned as ORJSONResponse so the items skip response_model
+        # validation and go straight to orjson (UUIDs included)
+        response = [_vector_recommendation_item(rec) for rec in recommendations]
         
         logger.info(f"🎯 [{request_id}] API RESPONSE: Returning {len(response)} optimized recommendations")
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         processing_time = time.time() - start_time
@@ -1439,6 +1537,7 @@ def clear_vector_cache(
     
     vector_service = VectorService(db)
     vector_service.clear_cache(pattern)
+    clear_local_recommendations()
     
     return {
         'success': True,
@@ -1447,7 +1546,7 @@ def clear_vector_cache(
     }
 
 @router.get("/{user_id}/balanced", response_model=List[Dict[str, Any]])
-async def get_balanced_recommendations(
+def get_balanced_recommendations(
     user_id: UUID,
     limit: int = Query(10, ge=1, le=20, description="Number of recommendations to return"),
     category_filter: Optional[str] = Query(None, description="Filter by product category"),
@@ -1457,11 +1556,14 @@ async def get_balanced_recommendations(
     db: Session = Depends(get_db)
 ):
     """Get balanced recommendations considering both likes and dislikes with diversity and variety"""
+    start_time = time.time()
     try:
         # Get cached recommendations if available
-        cache_key = f"balanced_{user_id}_{limit}_{category_filter}_{brand_filter}_{diversity_boost}_{randomness_factor}"
+        marker = get_last_swipe_marker(user_id)
+        cache_key = f"balanced_{marker}_{user_id}_{limit}_{category_filter}_{brand_filter}_{diversity_boost}_{randomness_factor}" if marker is not None else None
         cached_result = get_cached_recommendations(str(user_id), cache_key)
         if cached_result:
+            update_performance_stats(time.time() - start_time, cache_hit=True)
             logger.info(f"📦 Returning cached balanced recommendations for user {user_id}")
             return cached_result
         
@@ -1475,44 +1577,21 @@ async def get_balanced_recommendations(
             logger.warning(f"⚠️ No balanced preference vectors available for user {user_id}, falling back to basic recommendations")
             return service._get_basic_recommendations(user_id, limit, category_filter, brand_filter)
         
-        # Get candidate products
-        query = db.query(Product).filter(Product.combined_vector.isnot(None))
-        
-        # Apply filters
-        if category_filter:
-            query = query.filter(Product.category == category_filter)
-        if brand_filter:
-            query = query.filter(Product.brand_id == brand_filter)
-        
-        # Exclude swiped products
+        # Score every product against the preference vectors in one pass over
+        # the cached, pre-normalized vector matrix; filters are row masks
+        matrix = get_vector_matrix(db)
         swiped_ids = set(r[0] for r in db.query(Swipe.product_id).filter(Swipe.user_id == user_id).all())
-        query = query.filter(~Product.id.in_(swiped_ids))
+        scores = matrix.score(preference_vectors, {'image_similarity': 0.6, 'text_similarity': 0.4})
+        top = matrix.top_k(scores, limit * 3, exclude_ids=swiped_ids,
+                           category=category_filter, brand_id=brand_filter)
         
-        candidate_products = query.all()
-        
-        if not candidate_products:
+        if not top:
             logger.warning("❌ No candidate products found")
             return []
         
-        # Prepare product vectors
-        product_vectors = []
-        for product in candidate_products:
-            product_vec = {'product': product}
-            if product.image_vector:
-                product_vec['image_vector'] = product.image_vector
-            if product.text_vector:
-                product_vec['text_vector'] = product.text_vector
-            if product.combined_vector:
-                product_vec['combined_vector'] = product.combined_vector
-            product_vectors.append(product_vec)
-        
-        # Find similar products using balanced preference vectors
-        similar_products = service.vector_service.vectorizer.find_similar_products(
-            query_vectors=preference_vectors,
-            product_vectors=product_vectors,
-            limit=min(limit * 3, len(product_vectors)),
-            weights={'image_similarity': 0.6, 'text_similarity': 0.4}
-        )
+        # Hydrate only the shortlisted products
+        products = {p.id: p for p in db.execute(PRODUCTS_BY_IDS, {'ids': [pid for pid, _ in top]}).scalars()}
+        similar_products = [(products[pid], score) for pid, score in top if pid in products]
         
         # Apply diversity and variety improvements
         final_recommendations = service._apply_diversity_and_variety(
@@ -1551,6 +1630,7 @@ async def get_balanced_recommendations(
         
         # Cache the result
         set_cached_recommendations(str(user_id), cache_key, response)
+        update_performance_stats(time.time() - start_time)
         
         return response
         
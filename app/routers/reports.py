@@ -6,10 +6,11 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 import json
+import logging
 import os
 from pathlib import Path
 
-from app.db import get_db
+from app.db import get_db, SessionLocal
 from app.models import Report, ReportTemplate, Brand, User, Product, Swipe, BrandAnalyticsEvent
 from app.schemas import (
     ReportCreate, ReportResponse, ReportUpdate, ReportListResponse,
@@ -18,6 +19,8 @@ from app.schemas import (
 )
 from app.services.pdf_service import generate_pdf_report
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Create reports directory if it doesn't exist
@@ -204,8 +207,16 @@ def generate_report_data(brand_id: UUID, report_type: str, start_date: datetime,
             }
         }
 
-def generate_report_file(report_id: UUID, brand_id: UUID, report_type: str, start_date: datetime, end_date: datetime, db: Session):
-    """Background task to generate report files"""
+def generate_report_file(report_id: UUID, brand_id: UUID, report_type: str, start_date: datetime, end_date: datetime, db: Optional[Session] = None):
+    """Background task to generate report files.
+    
+    Without a session (background tasks) it opens its own: the request's
+    session is closed by the time the task runs.
+    """
+    if db is None:
+        with SessionLocal() as task_db:
+            return generate_report_file(report_id, brand_id, report_type, start_date, end_date, task_db)
+    
     try:
         # Generate report data
         report_data = generate_report_data(brand_id, report_type, start_date, end_date, db)
@@ -234,6 +245,8 @@ def generate_report_file(report_id: UUID, brand_id: UUID, report_type: str, star
             db.commit()
             
     except Exception as e:
+        logger.exception(f"❌ Failed to generate report {report_id}")
+        db.rollback()
         # Update report with error
         report = db.query(Report).filter(Report.id == report_id).first()
         if report:
@@ -358,8 +371,7 @@ def create_report(
         report.brand_id,
         report.report_type,
         start_date,
-        end_date,
-        db
+        end_date
     )
     
     return db_report
@@ -427,8 +439,7 @@ def generate_report(
         request.brand_id,
         report_type,
         start_date,
-        end_date,
-        db
+        end_date
     )
     
     return db_report
@@ -5,6 +5,8 @@ from uuid import UUID
 from app.db import get_db
 from app.models import Swipe, Product
 from app.schemas import Swipe as SwipeSchema, SwipeCreate
+from app.services.recommendation_cache import mark_user_swiped
+from app.services.user_preferences import record_swipe, clear_user_preferences
 
 router = APIRouter()
 
@@ -44,8 +46,10 @@ def create_swipe(swipe: SwipeCreate, db: Session = Depends(get_db)):
     print(f"✅ Creating swipe with data: {swipe_data}")
     db_swipe = Swipe(**swipe_data)
     db.add(db_swipe)
+    record_swipe(db, swipe.user_id, swipe.product_id, swipe.action)
     db.commit()
     db.refresh(db_swipe)
+    mark_user_swiped(swipe.user_id)
     
     print(f"✅ Swipe created successfully: {db_swipe.id}")
     return db_swipe
@@ -104,5 +108,7 @@ def get_product_swipe_stats(product_id: UUID, db: Session = Depends(get_db)):
 def reset_user_swipes(user_id: UUID, db: Session = Depends(get_db)):
     """Delete all swipes for a user."""
     deleted = db.query(Swipe).filter(Swipe.user_id == user_id).delete()
+    clear_user_preferences(db, user_id)
     db.commit()
+    mark_user_swiped(user_id)
     return {"message": f"Deleted {deleted} swipes for user {user_id}"}
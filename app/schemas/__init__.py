@@ -2,7 +2,7 @@ from .user import User, UserCreate, UserUpdate, UserInDB
 from .role import Role, RoleCreate, RoleUpdate
 from .brand import Brand, BrandCreate, BrandUpdate
 from .brand_member import BrandMember, BrandMemberCreate, BrandMemberUpdate
-from .product import Product, ProductCreate, ProductUpdate
+from .product import Product, ProductCreate, ProductUpdate, ProductListItem
 from .swipe import Swipe, SwipeCreate
 from .wishlist_item import WishlistItem, WishlistItemCreate, WishlistItemUpdate
 from .analytics import BrandAnalyticsEvent, BrandAnalyticsEventCreate
@@ -17,7 +17,7 @@ __all__ = [
     "Role", "RoleCreate", "RoleUpdate",
     "Brand", "BrandCreate", "BrandUpdate",
     "BrandMember", "BrandMemberCreate", "BrandMemberUpdate",
-    "Product", "ProductCreate", "ProductUpdate",
+    "Product", "ProductCreate", "ProductUpdate", "ProductListItem",
     "Swipe", "SwipeCreate",
     "WishlistItem", "WishlistItemCreate", "WishlistItemUpdate",
     "BrandAnalyticsEvent", "BrandAnalyticsEventCreate",
@@ -1,20 +1,28 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Annotated
+from pydantic import BeforeValidator
+from app.models.brand_member import BrandMemberStatus
+
+def _normalize_status(value):
+    """Accept any casing of the status name ("Active", "ACTIVE", ...)."""
+    return value.lower() if isinstance(value, str) else value
+
+MemberStatus = Annotated[BrandMemberStatus, BeforeValidator(_normalize_status)]
 
 class BrandMemberBase(BaseModel):
     user_id: UUID
     brand_id: UUID
     role: Optional[str] = None
-    status: Optional[str] = None
+    status: Optional[MemberStatus] = None
 
 class BrandMemberCreate(BrandMemberBase):
     pass
 
 class BrandMemberUpdate(BaseModel):
     role: Optional[str] = None
-    status: Optional[str] = None
+    status: Optional[MemberStatus] = None
 
 class BrandMember(BrandMemberBase):
     id: UUID
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -31,10 +31,19 @@ class ProductUpdate(BaseModel):
     status: Optional[str] = None
     flagged: Optional[bool] = None
 
+class ProductListItem(BaseModel):
+    """Slim product for list pages; the detail endpoint returns the full Product."""
+    id: UUID
+    name: str
+    price: Optional[Decimal] = None
+    image: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 class Product(ProductBase):
     id: UUID
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
@@ -8,6 +8,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
 import json
+from collections import defaultdict
 
 from app.models import User, Product, Swipe, WishlistItem
 
@@ -59,6 +60,11 @@ class AdvancedAnalytics:
             func.date(func.date_trunc('day', Swipe.created_at))
         ).all()
         
+        # Index activity rows by user once instead of scanning the full list per cohort user
+        activity_by_user = defaultdict(list)
+        for ua in user_activity:
+            activity_by_user[ua.id].append(ua)
+        
         # Calculate retention metrics
         retention_data = {}
         cohort_sizes = {}
@@ -81,7 +87,7 @@ class AdvancedAnalytics:
             retention_data[cohort_date]['total_users'] += 1
             
             # Find user's activity
-            user_activities = [ua for ua in user_activity if ua.id == user_id]
+            user_activities = activity_by_user.get(user_id, [])
             
             if user_activities:
                 total_swipes = sum(ua.swipe_count for ua in user_activities)
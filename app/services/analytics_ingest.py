@@ -0,0 +1,169 @@
+"""
+Analytics Ingest Service
+Buffers tracked analytics events in memory and writes them to PostgreSQL in batches
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.db import async_engine
+from app.models import BrandAnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+# Batches of at least this many rows are written with COPY, smaller ones with executemany
+COPY_THRESHOLD = 100
+# Maximum time an event waits in the buffer before being flushed
+FLUSH_INTERVAL = 0.5  # seconds
+# Back-pressure: producers wait once this many events are pending
+MAX_PENDING_EVENTS = 10000
+
+EVENT_COLUMNS = [
+    "id", "brand_id", "product_id", "user_id", "event_type",
+    "ip_address", "country", "city", "timestamp"
+]
+BRAND_ID_INDEX = EVENT_COLUMNS.index("brand_id")
+
+# Queued by stop(): the flush task writes everything ahead of it, then exits
+_STOP = object()
+
+def build_event_record(event_data: Dict[str, Any]) -> Tuple:
+    """Turn validated event data into a row tuple ordered like EVENT_COLUMNS.
+
+    Server-side defaults (id, timestamp) are filled in here so the caller can
+    return them before the row has actually been written.
+    """
+    event_data.setdefault("id", uuid.uuid4())
+    event_data.setdefault("timestamp", datetime.utcnow())
+    return tuple(event_data.get(column) for column in EVENT_COLUMNS)
+
+class AnalyticsEventBuffer:
+    """In-process queue drained by a background task that bulk-inserts events"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_listeners: List[Callable[[Iterable], None]] = []
+
+    def add_flush_listener(self, listener: Callable[[Iterable], None]):
+        """Call listener(brand_ids) after events for those brands have been written."""
+        self._flush_listeners.append(listener)
+
+    async def start(self):
+        """Start the background flush task (call from app startup)."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Analytics event buffer started")
+
+    async def stop(self):
+        """Stop the flush task and write out anything still buffered."""
+        if self._task is None:
+            return
+        # No cancel(): a batch being flushed is already off the queue, and its
+        # events were accepted (202) with their ids, so let the task finish it
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        # Events queued behind the sentinel; later enqueues write through
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        self._queue = None
+        if remaining:
+            await self._flush(remaining)
+        logger.info(f"🛑 Analytics event buffer stopped ({len(remaining)} events flushed on shutdown)")
+
+    async def enqueue(self, records: List[Tuple]):
+        """Queue event records for the next flush."""
+        if self._queue is None:
+            # Buffer not running (e.g. scripts without the app lifecycle): write through
+            await self._flush(list(records))
+            return
+        for record in records:
+            await self._queue.put(record)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect_batch(self) -> Tuple[List[Tuple], bool]:
+        """Wait for the first event, then gather more until full or FLUSH_INTERVAL elapses.
+
+        Returns the batch and whether stop() has been requested.
+        """
+        loop = asyncio.get_running_loop()
+        record = await self._queue.get()
+        if record is _STOP:
+            return [], True
+        batch = [record]
+        deadline = loop.time() + FLUSH_INTERVAL
+
+        while len(batch) < COPY_THRESHOLD:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                record = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if record is _STOP:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    async def _flush(self, batch: List[Tuple]):
+        try:
+            await self._write(batch)
+            written = batch
+            logger.debug(f"💾 Flushed {len(batch)} analytics events")
+        except Exception as e:
+            # One bad row fails the whole COPY/executemany; retry row by row
+            # so only the rows that really can't be written are dropped
+            logger.warning(f"⚠️ Batch flush of {len(batch)} analytics events failed, retrying row by row: {e}")
+            written = []
+            for record in batch:
+                try:
+                    await self._insert([record])
+                    written.append(record)
+                except Exception as row_error:
+                    logger.error(f"❌ Dropped analytics event {record[0]}: {row_error}")
+        if written:
+            self._notify({record[BRAND_ID_INDEX] for record in written})
+
+    async def _write(self, batch: List[Tuple]):
+        if len(batch) >= COPY_THRESHOLD:
+            async with async_engine.connect() as conn:
+                raw_conn = await conn.get_raw_connection()
+                await raw_conn.driver_connection.copy_records_to_table(
+                    BrandAnalyticsEvent.__tablename__,
+                    records=batch,
+                    columns=EVENT_COLUMNS
+                )
+        else:
+            await self._insert(batch)
+
+    async def _insert(self, batch: List[Tuple]):
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                insert(BrandAnalyticsEvent.__table__),
+                [dict(zip(EVENT_COLUMNS, record)) for record in batch]
+            )
+
+    def _notify(self, brand_ids: set):
+        for listener in self._flush_listeners:
+            try:
+                listener(brand_ids)
+            except Exception as e:
+                logger.error(f"❌ Analytics flush listener failed: {e}")
+
+event_buffer = AnalyticsEventBuffer()
@@ -0,0 +1,157 @@
+"""
+Analytics Rollups
+Materialized views with pre-aggregated swipe statistics for the brand dashboard
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import text, table, column
+
+from app.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+# How often the rollups are refreshed
+REFRESH_INTERVAL = 300  # seconds
+
+BRAND_DAILY_SWIPE_STATS_DDL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS brand_daily_swipe_stats AS
+    SELECT p.brand_id,
+           date_trunc('day', s.created_at) AS day,
+           count(*) AS swipes,
+           count(*) FILTER (WHERE s.action = 'like') AS likes,
+           count(*) FILTER (WHERE s.action = 'dislike') AS dislikes,
+           count(DISTINCT s.user_id) AS uu
+    FROM swipes s
+    JOIN products p ON p.id = s.product_id
+    GROUP BY 1, 2
+"""
+
+# Unique index is required for REFRESH ... CONCURRENTLY
+BRAND_DAILY_SWIPE_STATS_INDEX = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_brand_daily_swipe_stats
+    ON brand_daily_swipe_stats (brand_id, day)
+"""
+
+brand_daily_swipe_stats = table(
+    "brand_daily_swipe_stats",
+    column("brand_id"),
+    column("day"),
+    column("swipes"),
+    column("likes"),
+    column("dislikes"),
+    column("uu"),
+)
+
+# Distinct swipers per brand and day as HyperLogLog sketches (postgresql-hll).
+# Kept current by a trigger on swipes, so merging days is O(days) instead of
+# a COUNT(DISTINCT user_id) over every swipe in the window.
+BRAND_DAY_UU_DDL = """
+    CREATE TABLE IF NOT EXISTS brand_day_uu (
+        brand_id uuid NOT NULL,
+        day date NOT NULL,
+        uu hll NOT NULL,
+        PRIMARY KEY (brand_id, day)
+    )
+"""
+
+BRAND_DAY_UU_BACKFILL = """
+    INSERT INTO brand_day_uu (brand_id, day, uu)
+    SELECT p.brand_id, s.created_at::date, hll_add_agg(hll_hash_text(s.user_id::text))
+    FROM swipes s
+    JOIN products p ON p.id = s.product_id
+    WHERE p.brand_id IS NOT NULL AND s.created_at IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (brand_id, day) DO NOTHING
+"""
+
+BRAND_DAY_UU_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION brand_day_uu_add() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO brand_day_uu (brand_id, day, uu)
+        SELECT p.brand_id,
+               COALESCE(NEW.created_at, now())::date,
+               hll_add(hll_empty(), hll_hash_text(NEW.user_id::text))
+        FROM products p
+        WHERE p.id = NEW.product_id AND p.brand_id IS NOT NULL
+        ON CONFLICT (brand_id, day)
+        DO UPDATE SET uu = hll_add(brand_day_uu.uu, hll_hash_text(NEW.user_id::text));
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+BRAND_DAY_UU_TRIGGER = """
+    CREATE TRIGGER trg_swipes_brand_day_uu
+    AFTER INSERT ON swipes
+    FOR EACH ROW EXECUTE FUNCTION brand_day_uu_add()
+"""
+
+brand_day_uu = table(
+    "brand_day_uu",
+    column("brand_id"),
+    column("day"),
+    column("uu"),
+)
+
+# Set by create_rollup_views once the hll extension and sketch table are in place
+HLL_ENABLED = False
+
+_refresh_task: Optional[asyncio.Task] = None
+
+def create_rollup_views(conn):
+    """Create the rollup views and their indexes (sync connection, caller commits)."""
+    conn.execute(text(BRAND_DAILY_SWIPE_STATS_DDL))
+    conn.execute(text(BRAND_DAILY_SWIPE_STATS_INDEX))
+    _create_brand_day_uu(conn)
+
+def _create_brand_day_uu(conn):
+    """Create the HLL sketch table; skipped if the hll extension isn't available."""
+    global HLL_ENABLED
+    try:
+        # Savepoint so a missing extension doesn't abort the caller's transaction
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS hll"))
+            is_new = conn.execute(text("SELECT to_regclass('brand_day_uu') IS NULL")).scalar()
+            conn.execute(text(BRAND_DAY_UU_DDL))
+            conn.execute(text(BRAND_DAY_UU_TRIGGER_FUNCTION))
+            if is_new:
+                conn.execute(text(BRAND_DAY_UU_BACKFILL))
+                conn.execute(text(BRAND_DAY_UU_TRIGGER))
+        HLL_ENABLED = True
+    except Exception as e:
+        HLL_ENABLED = False
+        logger.warning(f"⚠️ hll extension not available, distinct users use COUNT(DISTINCT): {e}")
+
+async def refresh_rollups():
+    """Refresh all rollup views without blocking readers."""
+    async with async_engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY brand_daily_swipe_stats"))
+
+async def _refresh_loop():
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL)
+        try:
+            await refresh_rollups()
+            logger.debug("🔄 Refreshed analytics rollups")
+        except Exception as e:
+            logger.error(f"❌ Failed to refresh analytics rollups: {e}")
+
+def start_rollup_refresh():
+    """Start the periodic refresh task (call from app startup)."""
+    global _refresh_task
+    if _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop())
+        logger.info(f"✅ Analytics rollup refresh scheduled every {REFRESH_INTERVAL}s")
+
+async def stop_rollup_refresh():
+    """Cancel the periodic refresh task."""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
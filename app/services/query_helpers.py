@@ -0,0 +1,14 @@
+"""
+Query Helpers
+SQL predicates shared by the search, recommendation and vector services
+"""
+from typing import Any
+
+from sqlalchemy import exists
+
+from app.models import Product, Swipe
+
+def not_swiped_by(user_id) -> Any:
+    """NOT EXISTS (a swipe by the user on the product): an anti-join on swipes'
+    (user_id, product_id) unique index, without fetching the swiped ids first."""
+    return ~exists().where(Swipe.user_id == user_id, Swipe.product_id == Product.id)
@@ -0,0 +1,54 @@
+"""
+Random Products
+Random picks that seek the primary key index instead of sorting by random()
+"""
+import uuid
+from typing import List
+
+from sqlalchemy import select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Product
+
+# Product ids are uuid4, so they are uniformly random and uncorrelated with any
+# product attribute. Each pick reads the id index onwards from its own random
+# uuid and takes the first row, so a page is limit independent picks rather
+# than a run of neighbouring ids. All seeks go out as one UNION ALL statement;
+# ORDER BY random() would generate a value for and sort every candidate row.
+#
+# Trade-offs: a product is picked with probability proportional to the id gap
+# in front of it, which is uneven (but still unrelated to what the product
+# is); each seek walks past rows the query's filters reject, so a selective
+# filter costs up to limit times a single scan; and two pivots can land in the
+# same gap, in which case the page is topped up from the start of the id range.
+
+def _pivots(limit: int) -> List[uuid.UUID]:
+    return [uuid.uuid4() for _ in range(limit)]
+
+def _unique(products) -> List[Product]:
+    return list({product.id: product for product in products}.values())
+
+def random_products(query, limit: int) -> List[Product]:
+    """limit random products from an ORM query, one index seek per product."""
+    seeks = [query.filter(Product.id >= pivot).order_by(Product.id).limit(1) for pivot in _pivots(limit)]
+    products = _unique(seeks[0].union_all(*seeks[1:]).all()) if seeks else []
+    if len(products) < limit:
+        # Pivots that shared a gap or fell past the last id (or a small result set)
+        picked = [product.id for product in products]
+        rest = query.filter(Product.id.notin_(picked)) if picked else query
+        products += rest.order_by(Product.id).limit(limit - len(products)).all()
+    return products
+
+async def random_products_async(db: AsyncSession, stmt, limit: int) -> List[Product]:
+    """random_products for a select() of Product on an async session."""
+    seeks = [stmt.where(Product.id >= pivot).order_by(Product.id).limit(1) for pivot in _pivots(limit)]
+    products = []
+    if seeks:
+        result = await db.execute(select(Product).from_statement(union_all(*seeks)))
+        products = _unique(result.scalars())
+    if len(products) < limit:
+        picked = [product.id for product in products]
+        rest = stmt.where(Product.id.notin_(picked)) if picked else stmt
+        result = await db.execute(rest.order_by(Product.id).limit(limit - len(products)))
+        products += result.scalars()
+    return products
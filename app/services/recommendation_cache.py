@@ -0,0 +1,114 @@
+"""
+Recommendation Cache
+Cached recommendation lists (process cache in front of Redis) and the per-user
+last-swipe marker that invalidates them
+"""
+import logging
+import time
+from threading import RLock
+from typing import Any, Optional
+
+import orjson
+import redis
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Redis cache for recommendations (optional - remove if not using Redis)
+try:
+    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+    CACHE_ENABLED = True
+except:
+    redis_client = None
+    CACHE_ENABLED = False
+
+# Per-process cache of decoded recommendation lists in front of Redis, so hot
+# users are served without a Redis round-trip or a decode. Keys embed the
+# last-swipe marker, so a swipe moves the user onto fresh keys here as well.
+# Entries are (expires_at, recommendations) so a caller's shorter ttl is honoured.
+LOCAL_RECOMMENDATIONS_TTL = 30  # seconds
+_local_recommendations = TTLCache(maxsize=4096, ttl=LOCAL_RECOMMENDATIONS_TTL)
+_local_recommendations_lock = RLock()
+
+# Numpy scores serialize as numbers; anything else unknown falls back to str
+CACHE_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _get_local(key: str) -> Optional[Any]:
+    with _local_recommendations_lock:
+        entry = _local_recommendations.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _set_local(key: str, recommendations: Any, ttl: int):
+    expires_at = time.monotonic() + min(ttl, LOCAL_RECOMMENDATIONS_TTL)
+    with _local_recommendations_lock:
+        _local_recommendations[key] = (expires_at, recommendations)
+
+def get_cached_recommendations(user_id: str, cache_key: Optional[str], ttl: int = 300) -> Optional[Any]:
+    """Get recommendations from cache if available (process cache, then Redis).
+
+    A cache_key of None (no last-swipe marker) is always a miss.
+    """
+    if cache_key is None or not CACHE_ENABLED:
+        return None
+    key = f"rec:{user_id}:{cache_key}"
+    cached = _get_local(key)
+    if cached is not None:
+        return cached
+    
+    try:
+        payload = redis_client.get(key)
+        if payload:
+            cached = orjson.loads(payload)
+            _set_local(key, cached, ttl)
+            return cached
+    except Exception as e:
+        logger.warning(f"Cache error: {e}")
+    return None
+
+def set_cached_recommendations(user_id: str, cache_key: Optional[str], recommendations: Any, ttl: int = 300):
+    """Cache recommendations with TTL (Redis, and this process's cache); no-op for a None cache_key"""
+    if cache_key is None or not CACHE_ENABLED:
+        return
+    key = f"rec:{user_id}:{cache_key}"
+    try:
+        payload = orjson.dumps(recommendations, default=str, option=CACHE_JSON_OPTIONS)
+        redis_client.setex(key, ttl, payload)
+    except Exception as e:
+        logger.warning(f"Cache error: {e}")
+        return
+    # Keep the decoded form, exactly what a Redis hit would return
+    _set_local(key, orjson.loads(payload), ttl)
+
+def clear_local_recommendations():
+    """Drop this process's cached recommendation lists."""
+    with _local_recommendations_lock:
+        _local_recommendations.clear()
+
+# Per-user marker of the last swipe. It is part of every recommendation cache key,
+# so a swipe makes that user's cached results unreachable without scanning keys.
+LAST_SWIPE_KEY = "rec:last_swipe:{}"
+LAST_SWIPE_TTL = 86400  # seconds; outlives any cached result keyed on it
+
+def get_last_swipe_marker(user_id) -> Optional[str]:
+    """The user's last-swipe marker ("0" if they haven't swiped recently).
+
+    None when Redis can't be read: swipes can't be marked either then, so
+    callers must not cache (or serve cached) results without a marker.
+    """
+    if CACHE_ENABLED:
+        try:
+            return redis_client.get(LAST_SWIPE_KEY.format(user_id)) or "0"
+        except Exception as e:
+            logger.warning(f"Cache error: {e}")
+    return None
+
+def mark_user_swiped(user_id):
+    """Invalidate the user's cached recommendations (call after their swipes change)."""
+    if not CACHE_ENABLED:
+        return
+    try:
+        redis_client.setex(LAST_SWIPE_KEY.format(user_id), LAST_SWIPE_TTL, repr(time.time()))
+    except Exception as e:
+        logger.warning(f"Cache error: {e}")
@@ -6,16 +6,45 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, text, bindparam
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 import numpy as np
-from collections import defaultdict
+from collections import defaultdict, Counter
 from sqlalchemy import case
 
 from app.models import Product, Swipe, User
-from app.services.vector_service import VectorService
+from app.services.vector_service import VectorService, exclude_product_ids, PRODUCT_IDS_TYPE
+from app.services.query_helpers import not_swiped_by
+from app.services.random_products import random_products
 
 logger = logging.getLogger(__name__)
 
+# Users whose likes overlap the given likes, with Jaccard similarity computed
+# from counts (|A ∪ B| = |A| + |B| - |A ∩ B|). Users sharing no like can never
+# reach min_similarity, so they are never read.
+SIMILAR_USERS_SQL = text("""
+    SELECT user_id, common_likes,
+           common_likes::float / (:like_count + total_likes - common_likes) AS similarity
+    FROM (
+        SELECT s.user_id,
+               COUNT(*) FILTER (WHERE s.product_id = ANY(:likes)) AS common_likes,
+               COUNT(*) AS total_likes
+        FROM swipes s
+        WHERE s.action = 'right'
+          AND s.user_id IN (
+              SELECT user_id FROM swipes
+              WHERE action = 'right' AND product_id = ANY(:likes) AND user_id <> :user_id
+          )
+        GROUP BY s.user_id
+    ) overlap
+    WHERE common_likes::float / (:like_count + total_likes - common_likes) >= :min_similarity
+    ORDER BY similarity DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam("user_id", type_=PG_UUID(as_uuid=True)),
+    bindparam("likes", type_=PRODUCT_IDS_TYPE),
+)
+
 # Cache functions for recommendations
 def get_cached_recommendations(user_id: str, cache_key: str, ttl: int = 300) -> Optional[List[Dict]]:
     """Get recommendations from cache if available"""
@@ -192,7 +221,7 @@ class RecommendationsService:
             # OPTIMIZATION: Single query with all filters applied
             query = self.db.query(Product).filter(
                 Product.combined_vector.isnot(None),
-                ~Product.id.in_(liked_products | disliked_products)
+                exclude_product_ids(liked_products | disliked_products)
             )
             
             # Apply filters
@@ -376,12 +405,11 @@ class RecommendationsService:
     def get_recommendation_status(self, user_id: UUID) -> Dict[str, Any]:
         """Get recommendation status and quality metrics for a user"""
         try:
-            # Get user's swipe statistics
-            total_swipes = self.db.query(Swipe).filter(Swipe.user_id == user_id).count()
-            liked_swipes = self.db.query(Swipe).filter(
-                Swipe.user_id == user_id,
-                Swipe.action == "right"
-            ).count()
+            # Get user's swipe statistics in one aggregate
+            total_swipes, liked_swipes = self.db.query(
+                func.count(Swipe.id),
+                func.count(Swipe.id).filter(Swipe.action == "right")
+            ).filter(Swipe.user_id == user_id).one()
             
             # Get vectorization status
             vector_status = self.vector_service.get_vectorization_status()
@@ -421,13 +449,8 @@ class RecommendationsService:
                                  brand_filter: Optional[UUID] = None) -> List[Dict[str, Any]]:
         """Fallback to basic recommendations when vectors are not available"""
         try:
-            # Get swiped product IDs
-            swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                Swipe.user_id == user_id
-            ).all())
-            
-            # Build query
-            query = self.db.query(Product).filter(~Product.id.in_(swiped_ids))
+            # Build query, excluding swiped products with an anti-join
+            query = self.db.query(Product).filter(not_swiped_by(user_id))
             
             # Apply filters
             if category_filter:
@@ -436,7 +459,7 @@ class RecommendationsService:
                 query = query.filter(Product.brand_id == brand_filter)
             
             # Get random products
-            products = query.order_by(func.random()).limit(limit).all()
+            products = random_products(query, limit)
             
             # Format results
             recommendations = []
@@ -494,20 +517,21 @@ class RecommendationsService:
                 return []
             
             # Get products liked by similar users
-            similar_user_ids = [u['user_id'] for u in similar_users]
-            similar_user_likes = self.db.query(Swipe.product_id).filter(
-                Swipe.user_id.in_(similar_user_ids),
+            similarity_by_user = {u['user_id']: u['similarity'] for u in similar_users}
+            similar_user_likes = self.db.query(Swipe.user_id, Swipe.product_id).filter(
+                Swipe.user_id.in_(list(similarity_by_user)),
                 Swipe.action == "right"
             ).all()
             
-            # Count product popularity among similar users
+            # Count product popularity among similar users, weighted by the
+            # similarity of each user who liked it
+            swiped = user_likes | user_dislikes
             product_scores = defaultdict(float)
-            for product_id, in similar_user_likes:
-                if product_id not in user_likes and product_id not in user_dislikes:
-                    # Weight by user similarity
-                    for similar_user in similar_users:
-                        if similar_user['user_id'] in similar_user_ids:
-                            product_scores[product_id] += similar_user['similarity']
+            liked_by = Counter()
+            for liker_id, product_id in similar_user_likes:
+                if product_id not in swiped:
+                    product_scores[product_id] += similarity_by_user[liker_id]
+                    liked_by[product_id] += 1
             
             # Get top scoring products
             top_products = sorted(product_scores.items(), key=lambda x: x[1], reverse=True)[:limit*2]
@@ -522,7 +546,7 @@ class RecommendationsService:
             if brand_filter:
                 query = query.filter(Product.brand_id == brand_filter)
             
-            products = query.all()
+            products = sorted(query.all(), key=lambda p: product_scores[p.id], reverse=True)
             
             # Format results
             recommendations = []
@@ -531,7 +555,7 @@ class RecommendationsService:
                 recommendation = {
                     'product': product,
                     'score': score,
-                    'reason': f"Liked by {len([u for u in similar_users if u['user_id'] in similar_user_ids])} similar users",
+                    'reason': f"Liked by {liked_by[product.id]} similar users",
                     'vector_metadata': {
                         'has_image_vector': bool(product.image_vector),
                         'has_text_vector': bool(product.text_vector),
@@ -550,41 +574,17 @@ class RecommendationsService:
     def _find_similar_users(self, user_id: UUID, user_likes: set, min_similarity: float = 0.3) -> List[Dict[str, Any]]:
         """Find users with similar preferences using Jaccard similarity"""
         try:
-            # Get all users who have liked products
-            all_users = self.db.query(Swipe.user_id).filter(
-                Swipe.action == "right"
-            ).distinct().all()
-            
-            similar_users = []
-            for other_user_id, in all_users:
-                if other_user_id == user_id:
-                    continue
-                
-                # Get other user's likes
-                other_likes = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                    Swipe.user_id == other_user_id,
-                    Swipe.action == "right"
-                ).all())
-                
-                if not other_likes:
-                    continue
-                
-                # Calculate Jaccard similarity
-                intersection = len(user_likes & other_likes)
-                union = len(user_likes | other_likes)
-                
-                if union > 0:
-                    similarity = intersection / union
-                    if similarity >= min_similarity:
-                        similar_users.append({
-                            'user_id': other_user_id,
-                            'similarity': similarity,
-                            'common_likes': intersection
-                        })
-            
-            # Sort by similarity
-            similar_users.sort(key=lambda x: x['similarity'], reverse=True)
-            return similar_users[:10]  # Limit to top 20 similar users
+            rows = self.db.execute(SIMILAR_USERS_SQL, {
+                "user_id": user_id,
+                "likes": list(user_likes),
+                "like_count": len(user_likes),
+                "min_similarity": min_similarity,
+                "limit": 10,
+            }).all()
+            return [
+                {'user_id': row.user_id, 'similarity': row.similarity, 'common_likes': row.common_likes}
+                for row in rows
+            ]
             
         except Exception as e:
             logger.error(f"Failed to find similar users for {user_id}: {e}")
@@ -724,13 +724,8 @@ class RecommendationsService:
             liked_brands = [p.brand_id for p in user_preferences if p.action == "right" and p.brand_id]
             disliked_brands = [p.brand_id for p in user_preferences if p.action == "left" and p.brand_id]
             
-            # Get swiped product IDs
-            swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                Swipe.user_id == user_id
-            ).all())
-            
-            # Build query
-            query = self.db.query(Product).filter(~Product.id.in_(swiped_ids))
+            # Build query, excluding swiped products with an anti-join
+            query = self.db.query(Product).filter(not_swiped_by(user_id))
             
             # Apply filters
             if category_filter:
@@ -780,29 +775,23 @@ class RecommendationsService:
     
     def _apply_diversity_and_variety(self, similar_products: List[Tuple[Product, float]], 
                                    user_id: UUID, limit: int, diversity_boost: float,
-                                   randomness_factor: float, db: Session, user_swipes_with_products: List[Tuple[Swipe, Product.category, Product.brand_id]]) -> List[Tuple[Product, float]]:
+                                   randomness_factor: float, db: Session, user_swipes_with_products: Optional[List[Tuple[Swipe, Product.category, Product.brand_id]]] = None) -> List[Tuple[Product, float]]:
         """Apply diversity boosting and variety to recommendations"""
         try:
             if not similar_products:
                 return []
             
-            # Get user's recent preferences for diversity analysis
-            recent_swipes = db.query(Swipe).filter(
+            # Category/brand of the user's recent swipes, joined in one query
+            # (no per-swipe lazy load of Swipe.product)
+            recent_swipes = db.query(Product.category, Product.brand_id).join(
+                Swipe, Swipe.product_id == Product.id
+            ).filter(
                 Swipe.user_id == user_id
             ).order_by(Swipe.created_at.desc()).limit(20).all()
             
-            # Analyze user's recent preferences
-            recent_categories = [s.product.category for s in recent_swipes if s.product.category]
-            recent_brands = [s.product.brand_id for s in recent_swipes if s.product.brand_id]
-            
             # Count recent preferences
-            category_counts = {}
-            brand_counts = {}
-            for swipe in recent_swipes:
-                if swipe.product.category:
-                    category_counts[swipe.product.category] = category_counts.get(swipe.product.category, 0) + 1
-                if swipe.product.brand_id:
-                    brand_counts[swipe.product.brand_id] = brand_counts.get(swipe.product.brand_id, 0) + 1
+            category_counts = Counter(s.category for s in recent_swipes if s.category)
+            brand_counts = Counter(s.brand_id for s in recent_swipes if s.brand_id)
             
             logger.info(f"📊 Recent preferences: {len(category_counts)} categories, {len(brand_counts)} brands")
             
@@ -850,29 +839,29 @@ class RecommendationsService:
             
             # Ensure we don't have too many from the same category/brand
             final_selection = []
-            selected_categories = set()
-            selected_brands = set()
+            selected_ids = set()
+            selected_categories = Counter()
+            selected_brands = Counter()
             
             for product, score in scored_products:
                 # Check if we already have enough from this category/brand
-                category_limit_reached = (product.category in selected_categories and 
-                                        len([p for p, _ in final_selection if p.category == product.category]) >= 2)
-                brand_limit_reached = (product.brand_id in selected_brands and 
-                                     len([p for p, _ in final_selection if p.brand_id == product.brand_id]) >= 2)
+                category_limit_reached = bool(product.category) and selected_categories[product.category] >= 2
+                brand_limit_reached = bool(product.brand_id) and selected_brands[product.brand_id] >= 2
                 
                 if not category_limit_reached and not brand_limit_reached:
                     final_selection.append((product, score))
+                    selected_ids.add(product.id)
                     if product.category:
-                        selected_categories.add(product.category)
+                        selected_categories[product.category] += 1
                     if product.brand_id:
-                        selected_brands.add(product.brand_id)
+                        selected_brands[product.brand_id] += 1
                 
                 if len(final_selection) >= limit:
                     break
             
             # If we don't have enough, add remaining products
             if len(final_selection) < limit:
-                remaining = [p for p in scored_products if p not in final_selection]
+                remaining = [p for p in scored_products if p[0].id not in selected_ids]
                 final_selection.extend(remaining[:limit - len(final_selection)])
             
             logger.info(f"🎯 Final selection: {len(final_selection)} products with diversity and variety")
@@ -0,0 +1,100 @@
+"""
+Product Search Index
+Meilisearch index mirroring the searchable product fields; Postgres stays authoritative
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.models import Product
+
+logger = logging.getLogger(__name__)
+
+MEILISEARCH_URL = os.getenv("MEILISEARCH_URL", "http://localhost:7700")
+MEILISEARCH_API_KEY = os.getenv("MEILISEARCH_API_KEY")
+PRODUCTS_INDEX = "products"
+
+SEARCHABLE_ATTRIBUTES = ["name", "tags", "category", "color", "description"]
+BACKFILL_BATCH_SIZE = 1000
+
+# Set by init_search_index; None means search falls back to Postgres full-text
+_index = None
+
+def init_search_index():
+    """Connect to Meilisearch and configure the products index (call from app startup)."""
+    global _index
+    try:
+        import meilisearch
+
+        client = meilisearch.Client(MEILISEARCH_URL, MEILISEARCH_API_KEY, timeout=2)
+        client.health()
+        client.create_index(PRODUCTS_INDEX, {"primaryKey": "id"})
+        index = client.index(PRODUCTS_INDEX)
+        index.update_searchable_attributes(SEARCHABLE_ATTRIBUTES)
+        if index.get_stats().number_of_documents == 0:
+            _backfill(index)
+        _index = index
+        logger.info(f"✅ Product search using Meilisearch at {MEILISEARCH_URL}")
+    except ImportError:
+        logger.warning("⚠️ meilisearch not installed, product search uses Postgres full-text")
+    except Exception as e:
+        _index = None
+        logger.warning(f"⚠️ Meilisearch not available, product search uses Postgres full-text: {e}")
+
+def _backfill(index):
+    """Load every product into an empty index."""
+    columns = [Product.id, Product.name, Product.description, Product.category, Product.color, Product.tags]
+    total = 0
+    with SessionLocal() as db:
+        result = db.execute(select(*columns).execution_options(yield_per=BACKFILL_BATCH_SIZE))
+        for rows in result.partitions():
+            index.add_documents([product_document(row) for row in rows])
+            total += len(rows)
+    logger.info(f"📥 Queued {total} products for the search index")
+
+def product_document(product) -> Dict[str, Any]:
+    """Searchable fields of a product or row (build before the session goes away)."""
+    return {
+        "id": str(product.id),
+        "name": product.name,
+        "description": product.description,
+        "category": product.category,
+        "color": product.color,
+        "tags": product.tags or [],
+    }
+
+async def index_product(document: Dict[str, Any]):
+    """Add or replace a product document (background task)."""
+    if _index is None:
+        return
+    try:
+        await asyncio.to_thread(_index.add_documents, [document])
+    except Exception as e:
+        logger.error(f"❌ Failed to index product {document['id']}: {e}")
+
+async def remove_product(product_id: UUID):
+    """Remove a product document (background task)."""
+    if _index is None:
+        return
+    try:
+        await asyncio.to_thread(_index.delete_document, str(product_id))
+    except Exception as e:
+        logger.error(f"❌ Failed to remove product {product_id} from search index: {e}")
+
+async def search_product_ids(q: str, limit: int) -> Optional[List[UUID]]:
+    """Ranked product ids for a query, or None if the index can't be used."""
+    if _index is None:
+        return None
+    try:
+        result = await asyncio.to_thread(
+            _index.search, q, {"limit": limit, "attributesToRetrieve": ["id"]}
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Meilisearch search failed, using Postgres full-text: {e}")
+        return None
+    return [UUID(hit["id"]) for hit in result["hits"]]
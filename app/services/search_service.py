@@ -1,8 +1,22 @@
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, and_, or_
+from sqlalchemy import text, func, and_, or_, cast, Text, select, bindparam, any_
+from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, UUID as PG_UUID
 from uuid import UUID
-from app.models import Product, Swipe
+from app.models import Product
+from app.services.term_index import get_term_index
+from app.services.query_helpers import not_swiped_by
+
+MATCHING_TAGS_SQL = text("""
+    SELECT DISTINCT tag
+    FROM products, unnest(tags) AS tag
+    WHERE tags IS NOT NULL AND tag ILIKE :pattern
+    LIMIT :limit
+""")
+
+PRODUCTS_BY_IDS = select(Product).where(
+    Product.id == any_(bindparam("ids", type_=PG_ARRAY(PG_UUID(as_uuid=True))))
+)
 
 class SearchService:
     """Advanced search service with multiple search strategies."""
@@ -12,34 +26,15 @@ class SearchService:
     
     def full_text_search(self, query: str, limit: int = 20) -> List[Product]:
         """PostgreSQL full-text search with ranking."""
-        search_query = text("""
-            SELECT *, 
-                   ts_rank(
-                       to_tsvector('english', 
-                           COALESCE(name, '') || ' ' || 
-                           COALESCE(description, '') || ' ' || 
-                           COALESCE(array_to_string(tags, ' '), '')
-                       ), 
-                       plainto_tsquery('english', :search_term)
-                   ) as rank
-            FROM products 
-            WHERE to_tsvector('english', 
-                COALESCE(name, '') || ' ' || 
-                COALESCE(description, '') || ' ' || 
-                COALESCE(array_to_string(tags, ' '), '')
-            ) @@ plainto_tsquery('english', :search_term)
-            ORDER BY rank DESC
-            LIMIT :limit
-        """)
-        
-        result = self.db.execute(search_query, {"search_term": query, "limit": limit})
-        products = []
-        for row in result:
-            product_dict = dict(row)
-            product_dict.pop('rank', None)
-            products.append(Product(**product_dict))
-        
-        return products
+        # products.search_tsv is stored and GIN indexed; nothing is tokenized per row
+        ts_query = func.plainto_tsquery('english', query)
+        return (
+            self.db.query(Product)
+            .filter(Product.search_tsv.op('@@')(ts_query))
+            .order_by(func.ts_rank(Product.search_tsv, ts_query).desc())
+            .limit(limit)
+            .all()
+        )
     
     def filtered_search(self, 
                        search_query: Optional[str] = None,
@@ -65,74 +60,31 @@ class SearchService:
         if brand_id:
             query = query.filter(Product.brand_id == brand_id)
         if tags:
-            for tag in tags:
-                query = query.filter(Product.tags.any(tag))
+            # One array-contains predicate (products_tags_gin) instead of one ANY per tag
+            query = query.filter(Product.tags.op('@>')(cast(tags, PG_ARRAY(Text))))
         if min_price is not None:
             query = query.filter(Product.price >= min_price)
         if max_price is not None:
             query = query.filter(Product.price <= max_price)
         if exclude_swiped_by:
-            swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(Swipe.user_id == exclude_swiped_by).all())
-            query = query.filter(~Product.id.in_(swiped_ids))
+            query = query.filter(not_swiped_by(exclude_swiped_by))
         
         # Apply text search if provided
         if search_query:
-            search_query_sql = text("""
-                to_tsvector('english', 
-                    COALESCE(name, '') || ' ' || 
-                    COALESCE(description, '') || ' ' || 
-                    COALESCE(array_to_string(tags, ' '), '')
-                ) @@ plainto_tsquery('english', :search_term)
-            """)
-            query = query.filter(search_query_sql.bindparams(search_term=search_query))
+            query = query.filter(
+                Product.search_tsv.op('@@')(func.plainto_tsquery('english', search_query))
+            )
         
         return query.limit(limit).all()
     
     def semantic_search(self, query_text: str, limit: int = 20) -> List[Tuple[Product, float]]:
         """Semantic search using natural language processing concepts."""
-        query_terms = query_text.lower().split()
-        
-        # Get all products
-        products = self.db.query(Product).all()
-        
-        scored_products = []
-        for product in products:
-            score = 0
-            
-            # Name relevance
-            product_name_terms = product.name.lower().split()
-            name_matches = sum(1 for term in query_terms if any(term in name_term for name_term in product_name_terms))
-            score += name_matches * 0.3
-            
-            # Description relevance
-            if product.description:
-                desc_terms = product.description.lower().split()
-                desc_matches = sum(1 for term in query_terms if any(term in desc_term for desc_term in desc_terms))
-                score += desc_matches * 0.2
-            
-            # Category relevance
-            if product.category and any(term in product.category.lower() for term in query_terms):
-                score += 0.2
-            
-            # Tag relevance
-            if product.tags:
-                tag_matches = sum(1 for term in query_terms if any(term in tag.lower() for tag in product.tags))
-                score += tag_matches * 0.1
-            
-            # Color relevance
-            if product.color and any(term in product.color.lower() for term in query_terms):
-                score += 0.1
-            
-            # Brand relevance
-            if product.brand and any(term in product.brand.name.lower() for term in query_terms):
-                score += 0.1
-            
-            if score > 0:
-                scored_products.append((product, score))
-        
-        # Sort by relevance score
-        scored_products.sort(key=lambda x: x[1], reverse=True)
-        return scored_products[:limit]
+        # Terms are matched against the in-memory term index rather than every product's fields
+        ranked = get_term_index(self.db).top(query_text, limit)
+        if not ranked:
+            return []
+        products = {p.id: p for p in self.db.execute(PRODUCTS_BY_IDS, {"ids": [pid for pid, _ in ranked]}).scalars()}
+        return [(products[pid], score) for pid, score in ranked if pid in products]
     
     def get_search_suggestions(self, partial_query: str, limit: int = 10) -> List[str]:
         """Get search suggestions based on partial query."""
@@ -150,13 +102,10 @@ class SearchService:
         ).distinct().limit(limit).all()
         suggestions.update([cat[0] for cat in category_suggestions if cat[0]])
         
-        # Get suggestions from tags
-        products_with_tags = self.db.query(Product.tags).filter(
-            Product.tags.isnot(None)
-        ).all()
-        for product_tags in products_with_tags:
-            if product_tags[0]:
-                matching_tags = [tag for tag in product_tags[0] if partial_query.lower() in tag.lower()]
-                suggestions.update(matching_tags)
+        # Get suggestions from tags, matched and deduplicated in Postgres
+        tag_suggestions = self.db.execute(
+            MATCHING_TAGS_SQL, {"pattern": f"%{partial_query}%", "limit": limit}
+        ).scalars().all()
+        suggestions.update(tag_suggestions)
         
         return list(suggestions)[:limit] 
\ No newline at end of file
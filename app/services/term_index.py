@@ -0,0 +1,105 @@
+"""
+Product Term Index
+In-memory inverted index of lowercased product terms for semantic search scoring
+"""
+import logging
+from collections import defaultdict
+from threading import RLock
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models import Brand, Product
+
+logger = logging.getLogger(__name__)
+
+# Field weights. Per-term fields score once per matching query term; whole
+# fields (category, color, brand) score once if any term matches.
+TERM_FIELDS = {'name': 0.3, 'description': 0.2, 'tags': 0.1}
+WHOLE_FIELDS = {'category': 0.2, 'color': 0.1, 'brand': 0.1}
+
+class ProductTermIndex:
+    """term -> product ids, per field; a query term matches every indexed term containing it"""
+
+    def __init__(self, rows):
+        self.postings: Dict[str, Dict[str, Set[UUID]]] = {
+            field: defaultdict(set) for field in (*TERM_FIELDS, *WHOLE_FIELDS)
+        }
+        for row in rows:
+            for field, terms in self._terms(row).items():
+                for term in terms:
+                    self.postings[field][term].add(row.id)
+
+    @staticmethod
+    def _terms(row) -> Dict[str, List[str]]:
+        """Lowercased terms of one product, as the scoring compares them."""
+        return {
+            'name': row.name.lower().split() if row.name else [],
+            'description': row.description.lower().split() if row.description else [],
+            'tags': [tag.lower() for tag in row.tags or ()],
+            'category': [row.category.lower()] if row.category else [],
+            'color': [row.color.lower()] if row.color else [],
+            'brand': [row.brand_name.lower()] if row.brand_name else [],
+        }
+
+    def _matching(self, field: str, query_term: str) -> Set[UUID]:
+        """Products with a term in this field that contains the query term."""
+        matches: Set[UUID] = set()
+        for term, product_ids in self.postings[field].items():
+            if query_term in term:
+                matches |= product_ids
+        return matches
+
+    def score(self, query_text: str) -> Dict[UUID, float]:
+        """Relevance of every matching product; products matching nothing are absent."""
+        query_terms = query_text.lower().split()
+        scores: Dict[UUID, float] = defaultdict(float)
+        for field, weight in TERM_FIELDS.items():
+            for query_term in query_terms:
+                for product_id in self._matching(field, query_term):
+                    scores[product_id] += weight
+        for field, weight in WHOLE_FIELDS.items():
+            matched: Set[UUID] = set()
+            for query_term in query_terms:
+                matched |= self._matching(field, query_term)
+            for product_id in matched:
+                scores[product_id] += weight
+        return scores
+
+    def top(self, query_text: str, limit: int) -> List[Tuple[UUID, float]]:
+        """Best (product_id, score) pairs, highest first."""
+        scores = self.score(query_text)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+_index: Optional[ProductTermIndex] = None
+_index_lock = RLock()
+
+def get_term_index(db: Session) -> ProductTermIndex:
+    """The process-wide index, built on first use and after invalidation."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            rows = db.execute(
+                select(Product.id, Product.name, Product.description, Product.category,
+                       Product.color, Product.tags, Brand.name.label('brand_name'))
+                .outerjoin(Brand, Product.brand_id == Brand.id)
+            ).all()
+            _index = ProductTermIndex(rows)
+            logger.info(f"🔤 Built term index for {len(rows)} products")
+        return _index
+
+def invalidate_term_index():
+    """Drop the index; the next search rebuilds it."""
+    global _index
+    with _index_lock:
+        _index = None
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+@event.listens_for(Brand, "after_update")
+@event.listens_for(Brand, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    invalidate_term_index()
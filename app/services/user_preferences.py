@@ -0,0 +1,118 @@
+"""
+User Preferences
+Like/dislike counts per category, brand and tag, updated with each swipe so
+recommendation requests read one row instead of aggregating the swipe history
+"""
+import logging
+from uuid import UUID
+
+from sqlalchemy import text, bindparam
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.models import UserPreference
+
+logger = logging.getLogger(__name__)
+
+# Adds the swiped product's category/brand/tags to the user's counts in one
+# upsert; jsonb_add_counts is created in create_tables
+RECORD_SWIPE_SQL = text("""
+    WITH p AS (
+        SELECT category, brand_id::text AS brand, tags
+        FROM products
+        WHERE id = :product_id
+    ),
+    delta AS (
+        SELECT
+            CASE WHEN :action = 'right' AND category IS NOT NULL
+                 THEN jsonb_build_object(category, 1) ELSE '{}' END AS liked_categories,
+            CASE WHEN :action = 'left' AND category IS NOT NULL
+                 THEN jsonb_build_object(category, 1) ELSE '{}' END AS disliked_categories,
+            CASE WHEN :action = 'right' AND brand IS NOT NULL
+                 THEN jsonb_build_object(brand, 1) ELSE '{}' END AS liked_brands,
+            CASE WHEN :action = 'left' AND brand IS NOT NULL
+                 THEN jsonb_build_object(brand, 1) ELSE '{}' END AS disliked_brands,
+            CASE WHEN :action = 'right'
+                 THEN (SELECT coalesce(jsonb_object_agg(tag, 1), '{}') FROM (SELECT DISTINCT unnest(tags) AS tag) t)
+                 ELSE '{}' END AS liked_tags
+        FROM p
+    )
+    INSERT INTO user_preferences AS up
+        (user_id, liked_categories, disliked_categories, liked_brands, disliked_brands, liked_tags, updated_at)
+    SELECT :user_id, liked_categories, disliked_categories, liked_brands, disliked_brands, liked_tags,
+           timezone('utc', now())
+    FROM delta
+    ON CONFLICT (user_id) DO UPDATE SET
+        liked_categories = jsonb_add_counts(up.liked_categories, EXCLUDED.liked_categories),
+        disliked_categories = jsonb_add_counts(up.disliked_categories, EXCLUDED.disliked_categories),
+        liked_brands = jsonb_add_counts(up.liked_brands, EXCLUDED.liked_brands),
+        disliked_brands = jsonb_add_counts(up.disliked_brands, EXCLUDED.disliked_brands),
+        liked_tags = jsonb_add_counts(up.liked_tags, EXCLUDED.liked_tags),
+        updated_at = EXCLUDED.updated_at
+""").bindparams(
+    bindparam("user_id", type_=PG_UUID(as_uuid=True)),
+    bindparam("product_id", type_=PG_UUID(as_uuid=True)),
+)
+
+# Builds every user's counts from the swipe history; create_tables runs it
+# once, while user_preferences is still empty
+USER_PREFERENCES_BACKFILL_SQL = text("""
+    WITH cats AS (
+        SELECT user_id,
+               jsonb_object_agg(category, n) FILTER (WHERE action = 'right') AS liked,
+               jsonb_object_agg(category, n) FILTER (WHERE action = 'left') AS disliked
+        FROM (
+            SELECT s.user_id, s.action, p.category, COUNT(*) AS n
+            FROM swipes s JOIN products p ON p.id = s.product_id
+            WHERE p.category IS NOT NULL
+            GROUP BY 1, 2, 3
+        ) c
+        GROUP BY user_id
+    ),
+    brands AS (
+        SELECT user_id,
+               jsonb_object_agg(brand, n) FILTER (WHERE action = 'right') AS liked,
+               jsonb_object_agg(brand, n) FILTER (WHERE action = 'left') AS disliked
+        FROM (
+            SELECT s.user_id, s.action, p.brand_id::text AS brand, COUNT(*) AS n
+            FROM swipes s JOIN products p ON p.id = s.product_id
+            WHERE p.brand_id IS NOT NULL
+            GROUP BY 1, 2, 3
+        ) b
+        GROUP BY user_id
+    ),
+    tags AS (
+        SELECT user_id, jsonb_object_agg(tag, n) AS liked
+        FROM (
+            SELECT s.user_id, t.tag, COUNT(*) AS n
+            FROM swipes s
+            JOIN products p ON p.id = s.product_id
+            CROSS JOIN LATERAL (SELECT DISTINCT unnest(p.tags) AS tag) t
+            WHERE s.action = 'right'
+            GROUP BY 1, 2
+        ) t
+        GROUP BY user_id
+    )
+    INSERT INTO user_preferences
+        (user_id, liked_categories, disliked_categories, liked_brands, disliked_brands, liked_tags, updated_at)
+    SELECT u.user_id,
+           coalesce(cats.liked, '{}'), coalesce(cats.disliked, '{}'),
+           coalesce(brands.liked, '{}'), coalesce(brands.disliked, '{}'),
+           coalesce(tags.liked, '{}'),
+           timezone('utc', now())
+    FROM (SELECT DISTINCT s.user_id FROM swipes s JOIN products p ON p.id = s.product_id
+          WHERE s.user_id IS NOT NULL) u
+    LEFT JOIN cats ON cats.user_id = u.user_id
+    LEFT JOIN brands ON brands.user_id = u.user_id
+    LEFT JOIN tags ON tags.user_id = u.user_id
+    WHERE NOT EXISTS (SELECT 1 FROM user_preferences)
+    ON CONFLICT (user_id) DO NOTHING
+""")
+
+def record_swipe(db: Session, user_id: UUID, product_id: UUID, action: str):
+    """Add a swipe to the user's counts (runs in the caller's transaction)."""
+    db.execute(RECORD_SWIPE_SQL, {"user_id": user_id, "product_id": product_id, "action": action})
+
+def clear_user_preferences(db: Session, user_id: UUID):
+    """Drop the user's counts (with their swipes; runs in the caller's transaction)."""
+    db.query(UserPreference).filter(UserPreference.user_id == user_id).delete()
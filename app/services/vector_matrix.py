@@ -0,0 +1,134 @@
+"""
+Product Vector Matrix
+In-memory, L2-normalized matrices of product vectors so similarity is a single matmul
+"""
+import logging
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.models import Product
+
+logger = logging.getLogger(__name__)
+
+VECTOR_TYPES = ('image_vector', 'text_vector', 'combined_vector')
+
+def _stack(vectors: List[Optional[List[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, D) float32 matrix of unit rows plus a mask of rows that have a vector."""
+    present = np.array([bool(v) for v in vectors], dtype=bool)
+    dim = max((len(v) for v in vectors if v), default=0)
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        if vector:
+            matrix[i, :len(vector)] = vector
+    # Stored vectors are already unit length; this only matters for legacy rows
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, present
+
+class ProductVectorMatrix:
+    """Vectors of every product with a combined vector, one row per product"""
+
+    def __init__(self, rows):
+        self.ids: List[UUID] = [row.id for row in rows]
+        self.row_of: Dict[UUID, int] = {product_id: i for i, product_id in enumerate(self.ids)}
+        self.categories = np.array([row.category for row in rows], dtype=object)
+        self.brand_ids = np.array([row.brand_id for row in rows], dtype=object)
+        self.matrices: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            vector_type: _stack([getattr(row, vector_type) for row in rows])
+            for vector_type in VECTOR_TYPES
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similarities(self, query_vector: Optional[List[float]], vector_type: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Cosine similarity of every row to the query, as dot products of unit vectors."""
+        matrix, present = self.matrices[vector_type]
+        if not query_vector or matrix.shape[1] == 0:
+            return np.zeros(len(self.ids), dtype=np.float32), present
+        query = np.zeros(matrix.shape[1], dtype=np.float32)
+        length = min(len(query_vector), matrix.shape[1])
+        query[:length] = query_vector[:length]
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(self.ids), dtype=np.float32), present
+        return matrix @ (query / norm), present
+
+    def score(self, query_vectors: Dict[str, List[float]], weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Weighted image/text similarity per row, combined vector as fallback.
+
+        Same scoring as ProductVectorizer.find_similar_products; rows that get
+        no score are -inf.
+        """
+        weights = weights or {'image_similarity': 0.6, 'text_similarity': 0.4}
+        n = len(self.ids)
+        total = np.zeros(n, dtype=np.float32)
+        counts = np.zeros(n, dtype=np.float32)
+        for vector_type, weight_key in (('image_vector', 'image_similarity'), ('text_vector', 'text_similarity')):
+            weight = weights.get(weight_key, 0)
+            if vector_type not in query_vectors or weight <= 0:
+                continue
+            sims, present = self.similarities(query_vectors[vector_type], vector_type)
+            total += np.where(present, sims * weight, 0.0)
+            counts += present
+        if 'combined_vector' in query_vectors:
+            sims, present = self.similarities(query_vectors['combined_vector'], 'combined_vector')
+            use_combined = present & (counts == 0)
+            total = np.where(use_combined, sims, total)
+            counts = np.where(use_combined, 1, counts)
+        scores = np.full(n, -np.inf, dtype=np.float32)
+        np.divide(total, counts, out=scores, where=counts > 0)
+        return scores
+
+    def top_k(self, scores: np.ndarray, k: int,
+              exclude_ids=(), category: Optional[str] = None,
+              brand_id: Optional[UUID] = None) -> List[Tuple[UUID, float]]:
+        """Best k (product_id, score) pairs after filters, highest first."""
+        mask = np.isfinite(scores)
+        if category:
+            mask &= self.categories == category
+        if brand_id:
+            mask &= self.brand_ids == brand_id
+        for product_id in exclude_ids:
+            row = self.row_of.get(product_id)
+            if row is not None:
+                mask[row] = False
+        candidates = np.flatnonzero(mask)
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(self.ids[i], float(scores[i])) for i in candidates]
+
+_matrix: Optional[ProductVectorMatrix] = None
+_matrix_lock = RLock()
+
+def get_vector_matrix(db: Session) -> ProductVectorMatrix:
+    """The process-wide matrix, loaded on first use and after invalidation."""
+    global _matrix
+    with _matrix_lock:
+        if _matrix is None:
+            rows = db.execute(
+                select(Product.id, Product.category, Product.brand_id,
+                       Product.image_vector, Product.text_vector, Product.combined_vector)
+                .where(Product.combined_vector.isnot(None))
+            ).all()
+            _matrix = ProductVectorMatrix(rows)
+            logger.info(f"🧮 Loaded vector matrix for {len(_matrix)} products")
+        return _matrix
+
+def invalidate_vector_matrix():
+    """Drop the matrix; the next request reloads it."""
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _invalidate_on_product_write(mapper, connection, target):
+    invalidate_vector_matrix()
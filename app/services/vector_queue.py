@@ -0,0 +1,108 @@
+"""
+Vector Generation Queue
+Collects products that need (re)vectorizing and processes them in batches
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.db import SessionLocal
+from app.services.vector_service import VectorService
+from app.utils.response_cache import clear_namespace, VECTORIZATION_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+# Products vectorized per batch (one VectorService / session per batch)
+BATCH_SIZE = 32
+# Maximum time a product waits in the queue before its batch is started
+BATCH_INTERVAL = 2.0  # seconds
+# Back-pressure: producers wait once this many products are pending
+MAX_PENDING_PRODUCTS = 1024
+
+def generate_vectors_for_batch(batch: Dict[UUID, bool]) -> Dict[str, int]:
+    """Vectorize a batch of products with a single service instance and session.
+
+    Runs in a worker thread: model inference is CPU-bound.
+    """
+    successful = failed = 0
+    with SessionLocal() as db:
+        vector_service = VectorService(db)
+        for product_id, force_regenerate in batch.items():
+            result = vector_service.generate_vectors_for_product(product_id, force_regenerate)
+            if result['success']:
+                successful += 1
+            else:
+                failed += 1
+                logger.warning(f"⚠️ Failed to generate vectors for product {product_id}: {result['error']}")
+    return {'successful': successful, 'failed': failed}
+
+class VectorGenerationQueue:
+    """Bounded in-process queue drained by a background task in batches"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background worker (call from app startup)."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=MAX_PENDING_PRODUCTS)
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Vector generation queue started")
+
+    async def stop(self):
+        """Stop the worker; products still queued are left for generate-vectors-missing."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"🛑 Vector generation queue stopped ({self._queue.qsize()} products pending)")
+
+    async def enqueue(self, product_id: UUID, force_regenerate: bool = False):
+        """Queue a product for vector generation."""
+        if self._queue is None:
+            # Queue not running (e.g. scripts without the app lifecycle): process inline
+            await asyncio.to_thread(generate_vectors_for_batch, {product_id: force_regenerate})
+            return
+        await self._queue.put((product_id, force_regenerate))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            try:
+                stats = await asyncio.to_thread(generate_vectors_for_batch, batch)
+                logger.info(f"🧠 Vectorized batch of {len(batch)} products: {stats}")
+                await clear_namespace(VECTORIZATION_NAMESPACE)
+            except Exception as e:
+                logger.error(f"❌ Vector generation batch failed: {e}")
+
+    async def _collect_batch(self) -> Dict[UUID, bool]:
+        """Wait for the first product, then gather more until full or BATCH_INTERVAL elapses.
+
+        Repeated entries for the same product collapse into one, forced if any was.
+        """
+        loop = asyncio.get_running_loop()
+        batch: Dict[UUID, bool] = {}
+
+        product_id, force_regenerate = await self._queue.get()
+        batch[product_id] = force_regenerate
+        deadline = loop.time() + BATCH_INTERVAL
+
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                product_id, force_regenerate = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch[product_id] = batch.get(product_id, False) or force_regenerate
+        return batch
+
+vector_queue = VectorGenerationQueue()
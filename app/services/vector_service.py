@@ -3,23 +3,170 @@ Vector Service for managing product vectors and similarity search
 """
 import logging
 import json
+import csv
+import io
 import asyncio
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, text, select, bindparam, any_, all_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from datetime import datetime
 import numpy as np
 import pickle
 import os
 from pathlib import Path
+from threading import RLock
 
 from app.models import Product, Swipe
 from app.utils.vectorization import get_vectorizer, ProductVectorizer
+from app.services.vector_matrix import get_vector_matrix, invalidate_vector_matrix
+from app.services.query_helpers import not_swiped_by
 
 logger = logging.getLogger(__name__)
 
+# HNSW graph settings for the FAISS indexes: neighbours per node, build-time and
+# query-time beam width. Higher efSearch trades latency for recall.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Large catalogues get an IVF-PQ index instead: vectors compressed to PQ_M bytes,
+# searched by probing the IVF_NPROBE nearest of IVF_NLIST clusters
+IVF_PQ_MIN_VECTORS = 100_000
+IVF_NLIST = 256
+IVF_NPROBE = 16
+PQ_M = 8
+PQ_NBITS = 8
+
+# Indexes read from vector_indexes/, shared by every VectorService in the process
+_faiss_state: Optional[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = None
+_faiss_lock = RLock()
+
+def create_ann_index(dimension: int, training_vectors: Optional[np.ndarray] = None):
+    """Empty HNSW index over inner product (cosine on unit vectors).
+
+    Given training vectors, the graph stores 8-bit scalar-quantized vectors
+    (a quarter of float32 memory and bandwidth); the quantizer's per-dimension
+    ranges are trained on them. Without them, vectors are stored as float32.
+    From IVF_PQ_MIN_VECTORS training vectors on, an IVF-PQ index is built instead.
+    """
+    import faiss
+
+    if training_vectors is not None and len(training_vectors) >= IVF_PQ_MIN_VECTORS and dimension % PQ_M == 0:
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, IVF_NLIST, PQ_M, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        index.train(training_vectors)
+        index.nprobe = IVF_NPROBE
+        # The coarse quantizer must outlive this function
+        index.own_fields = True
+        quantizer.this.disown()
+        return index
+    if training_vectors is not None and len(training_vectors):
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.train(training_vectors)
+    else:
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+def _configure_search(index):
+    """Apply query-time settings to a loaded index: HNSW beam width, IVF probe count."""
+    if hasattr(index, 'hnsw'):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    if hasattr(index, 'nprobe'):
+        index.nprobe = IVF_NPROBE
+    return index
+
+# All vector coverage counts in one scan of products
+VECTORIZATION_STATUS_SQL = text("""
+    SELECT
+        COUNT(*) AS total_products,
+        COUNT(image_vector) AS with_image_vectors,
+        COUNT(text_vector) AS with_text_vectors,
+        COUNT(combined_vector) AS with_combined_vectors,
+        COUNT(*) FILTER (
+            WHERE image_vector IS NOT NULL
+              AND text_vector IS NOT NULL
+              AND combined_vector IS NOT NULL
+        ) AS with_all_vectors
+    FROM products
+""")
+
+# One bound uuid[] instead of an expanding IN: a single cached statement for any batch size
+PRODUCT_IDS_TYPE = ARRAY(PG_UUID(as_uuid=True))
+
+PRODUCTS_BY_IDS = select(Product).where(
+    Product.id == any_(bindparam("ids", type_=PRODUCT_IDS_TYPE))
+)
+
+def exclude_product_ids(product_ids) -> Any:
+    """Product.id != ALL(:excluded_ids): one array bind, so the SQL text is the same
+    however many ids there are (an IN list renders one placeholder per id)."""
+    return Product.id != all_(bindparam("excluded_ids", list(product_ids), type_=PRODUCT_IDS_TYPE))
+
+# Bulk vector writes: COPY into a per-connection temp table (unlogged, emptied
+# on commit), then apply the whole batch with a single UPDATE ... FROM
+VECTOR_STAGE_DDL = text("""
+    CREATE TEMP TABLE IF NOT EXISTS vec_stage (
+        id uuid PRIMARY KEY,
+        image_vector float8[],
+        text_vector float8[],
+        combined_vector float8[],
+        vector_metadata text
+    ) ON COMMIT DELETE ROWS
+""")
+
+VECTOR_STAGE_COPY = (
+    "COPY vec_stage (id, image_vector, text_vector, combined_vector, vector_metadata) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+VECTOR_STAGE_APPLY_SQL = text("""
+    UPDATE products p
+    SET image_vector = s.image_vector,
+        text_vector = s.text_vector,
+        combined_vector = s.combined_vector,
+        vector_metadata = s.vector_metadata,
+        updated_at = timezone('utc', now())
+    FROM vec_stage s
+    WHERE p.id = s.id
+""")
+
+def _pg_array_literal(vector: Optional[List[float]]) -> Optional[str]:
+    """float8[] literal for COPY; None becomes an unquoted empty field (NULL)."""
+    if not vector:
+        return None
+    return "{" + ",".join(repr(float(value)) for value in vector) + "}"
+
+def build_vectorization_status(row) -> Dict[str, Any]:
+    """Turn a VECTORIZATION_STATUS_SQL row into the status payload."""
+    total_products = row['total_products']
+    
+    def coverage(count: int) -> float:
+        return round((count / total_products) * 100, 2) if total_products > 0 else 0
+    
+    return {
+        'total_products': total_products,
+        'with_image_vectors': row['with_image_vectors'],
+        'with_text_vectors': row['with_text_vectors'],
+        'with_combined_vectors': row['with_combined_vectors'],
+        'with_all_vectors': row['with_all_vectors'],
+        'image_coverage': coverage(row['with_image_vectors']),
+        'text_coverage': coverage(row['with_text_vectors']),
+        'combined_coverage': coverage(row['with_combined_vectors']),
+        'full_coverage': coverage(row['with_all_vectors'])
+    }
+
+def _stack_padded(vectors: List[List[float]]) -> np.ndarray:
+    """(N, D) float32 matrix of the vectors, zero-padded to the longest."""
+    matrix = np.zeros((len(vectors), max(len(v) for v in vectors)), dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        matrix[i, :len(vector)] = vector
+    return matrix
+
 class VectorService:
     """Service for managing product vectors and similarity search"""
     
@@ -35,13 +182,19 @@ class VectorService:
         self.preference_cache = {}
         self.cache_ttl = 300  # 5 minutes
         
-        # Initialize FAISS indexes
-        self._initialize_faiss_indexes()
+        # Initialize FAISS indexes (read from disk once per process)
+        global _faiss_state
+        with _faiss_lock:
+            if _faiss_state is None:
+                self._initialize_faiss_indexes()
+                _faiss_state = (self.indexes, self.dimension_info)
+            self.indexes, self.dimension_info = _faiss_state
         
         logger.info("✅ VectorService initialized with FAISS and caching")
     
     def _initialize_faiss_indexes(self):
         """Initialize FAISS indexes for efficient similarity search"""
+        self.dimension_info = None
         try:
             import faiss
             
@@ -70,7 +223,7 @@ class VectorService:
                     
                     if index_path.exists() and mapping_path.exists():
                         try:
-                            index = faiss.read_index(str(index_path))
+                            index = _configure_search(faiss.read_index(str(index_path)))
                             with open(mapping_path, 'rb') as f:
                                 mapping = pickle.load(f)
                             
@@ -90,7 +243,7 @@ class VectorService:
                 
                 if index_path.exists() and mapping_path.exists():
                     try:
-                        index = faiss.read_index(str(index_path))
+                        index = _configure_search(faiss.read_index(str(index_path)))
                         with open(mapping_path, 'rb') as f:
                             mapping = pickle.load(f)
                         
@@ -121,14 +274,14 @@ class VectorService:
             
             if os.path.exists(index_path) and os.path.exists(mapping_path):
                 # Load existing index
-                index = faiss.read_index(index_path)
+                index = _configure_search(faiss.read_index(index_path))
                 with open(mapping_path, 'rb') as f:
                     mapping = pickle.load(f)
                 logger.info(f"📂 Loaded existing {vector_type} index with {index.ntotal} vectors")
                 return {'index': index, 'mapping': mapping}
             else:
                 # Create new index
-                index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+                index = create_ann_index(dimension)
                 mapping = {}
                 logger.info(f"🆕 Created new {vector_type} index")
                 return {'index': index, 'mapping': mapping}
@@ -180,8 +333,9 @@ class VectorService:
                     index = index_data['index']
                     mapping = index_data['mapping']
                     
-                    # Convert to numpy array
+                    # Convert to numpy array; unit length so inner product is cosine
                     vector_array = np.array([vector], dtype=np.float32)
+                    faiss.normalize_L2(vector_array)
                     
                     # Add to index
                     index.add(vector_array)
@@ -232,8 +386,9 @@ class VectorService:
                     if index.ntotal == 0:
                         continue
                     
-                    # Convert query vector
+                    # Convert query vector; unit length so inner product is cosine
                     query_array = np.array([query_vector], dtype=np.float32)
+                    faiss.normalize_L2(query_array)
                     
                     # Search
                     scores, indices = index.search(query_array, min(limit * 2, index.ntotal))
@@ -309,83 +464,22 @@ class VectorService:
         try:
             product = self.db.query(Product).filter(Product.id == product_id).first()
             if not product:
-                return {
-                    'success': False,
-                    'error': 'Product not found',
-                    'product_id': str(product_id)
-                }
-            
-            # Check cache first
-            cache_key = f"vectors:{product_id}"
-            if not force_regenerate and cache_key in self.vector_cache:
-                logger.info(f"📋 Cache hit for product {product_id}")
-                return {
-                    'success': True,
-                    'message': 'Vectors loaded from cache',
-                    'product_id': str(product_id),
-                    'regenerated': False,
-                    'from_cache': True
-                }
-            
-            # Check if vectors already exist (unless force_regenerate)
-            if not force_regenerate and self._has_vectors(product):
-                # Cache the existing vectors
-                vectors = {
-                    'image_vector': product.image_vector,
-                    'text_vector': product.text_vector,
-                    'combined_vector': product.combined_vector
-                }
-                self.vector_cache[cache_key] = vectors
+                return self._product_not_found(product_id)
+            
+            result, vectors = self._vectorize_product(product, force_regenerate)
+            if vectors is not None:
+                # Update product with vectors
+                product.image_vector = vectors['image_vector']
+                product.text_vector = vectors['text_vector']
+                product.combined_vector = vectors['combined_vector']
+                product.vector_metadata = json.dumps(vectors['metadata'])
                 
-                return {
-                    'success': True,
-                    'message': 'Vectors already exist',
-                    'product_id': str(product_id),
-                    'regenerated': False
-                }
-            
-            # Generate vectors
-            vectors = self.vectorizer.generate_product_vectors(product)
+                # Commit to database
+                self.db.commit()
+                self._index_product_vectors(product_id, vectors)
+                logger.info(f"Successfully generated vectors for product {product_id}")
             
-            # Update product with vectors
-            product.image_vector = vectors['image_vector']
-            product.text_vector = vectors['text_vector']
-            product.combined_vector = vectors['combined_vector']
-            product.vector_metadata = json.dumps(vectors['metadata'])
-            
-            # Commit to database
-            self.db.commit()
-            
-            # Cache the vectors
-            self.vector_cache[cache_key] = {
-                'image_vector': vectors['image_vector'],
-                'text_vector': vectors['text_vector'],
-                'combined_vector': vectors['combined_vector']
-            }
-            
-            # Add to FAISS indexes
-            self.add_product_to_index(product_id, {
-                'image': vectors['image_vector'],
-                'text': vectors['text_vector'],
-                'combined': vectors['combined_vector']
-            })
-            
-            logger.info(f"Successfully generated vectors for product {product_id}")
-            
-            return {
-                'success': True,
-                'message': 'Vectors generated successfully',
-                'product_id': str(product_id),
-                'regenerated': True,
-                'vector_info': {
-                    'has_image_vector': bool(vectors['image_vector']),
-                    'has_text_vector': bool(vectors['text_vector']),
-                    'has_combined_vector': bool(vectors['combined_vector']),
-                    'image_vector_dim': len(vectors['image_vector']) if vectors['image_vector'] else 0,
-                    'text_vector_dim': len(vectors['text_vector']) if vectors['text_vector'] else 0,
-                    'combined_vector_dim': len(vectors['combined_vector']) if vectors['combined_vector'] else 0
-                }
-            }
+            return result
             
         except Exception as e:
             logger.error(f"Failed to generate vectors for product {product_id}: {e}")
@@ -396,11 +490,83 @@ class VectorService:
                 'product_id': str(product_id)
             }
     
+    def _product_not_found(self, product_id: UUID) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'error': 'Product not found',
+            'product_id': str(product_id)
+        }
+    
+    def _vectorize_product(self, product: Product, force_regenerate: bool) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Generate vectors for a loaded product; the caller writes them.
+        
+        Returns the result payload and the generated vectors (None if nothing was generated).
+        """
+        product_id = product.id
+        
+        # Check cache first
+        cache_key = f"vectors:{product_id}"
+        if not force_regenerate and cache_key in self.vector_cache:
+            logger.info(f"📋 Cache hit for product {product_id}")
+            return {
+                'success': True,
+                'message': 'Vectors loaded from cache',
+                'product_id': str(product_id),
+                'regenerated': False,
+                'from_cache': True
+            }, None
+        
+        # Check if vectors already exist (unless force_regenerate)
+        if not force_regenerate and self._has_vectors(product):
+            # Cache the existing vectors
+            self.vector_cache[cache_key] = {
+                'image_vector': product.image_vector,
+                'text_vector': product.text_vector,
+                'combined_vector': product.combined_vector
+            }
+            
+            return {
+                'success': True,
+                'message': 'Vectors already exist',
+                'product_id': str(product_id),
+                'regenerated': False
+            }, None
+        
+        # Generate vectors
+        vectors = self.vectorizer.generate_product_vectors(product)
+        
+        return {
+            'success': True,
+            'message': 'Vectors generated successfully',
+            'product_id': str(product_id),
+            'regenerated': True,
+            'vector_info': {
+                'has_image_vector': bool(vectors['image_vector']),
+                'has_text_vector': bool(vectors['text_vector']),
+                'has_combined_vector': bool(vectors['combined_vector']),
+                'image_vector_dim': len(vectors['image_vector']) if vectors['image_vector'] else 0,
+                'text_vector_dim': len(vectors['text_vector']) if vectors['text_vector'] else 0,
+                'combined_vector_dim': len(vectors['combined_vector']) if vectors['combined_vector'] else 0
+            }
+        }, vectors
+    
+    def _index_product_vectors(self, product_id: UUID, vectors: Dict[str, Any]):
+        """Cache committed vectors and add them to the FAISS indexes."""
+        self.vector_cache[f"vectors:{product_id}"] = {
+            'image_vector': vectors['image_vector'],
+            'text_vector': vectors['text_vector'],
+            'combined_vector': vectors['combined_vector']
+        }
+        
+        self.add_product_to_index(product_id, {
+            'image': vectors['image_vector'],
+            'text': vectors['text_vector'],
+            'combined': vectors['combined_vector']
+        })
+    
     def generate_vectors_batch(self, product_ids: List[UUID], batch_size: int = 10) -> Dict[str, Any]:
         """Generate vectors for multiple products in batches"""
         try:
-            import time
-            
             results = {
                 'total_products': len(product_ids),
                 'successful': 0,
@@ -411,8 +577,7 @@ class VectorService:
             for i in range(0, len(product_ids), batch_size):
                 batch = product_ids[i:i + batch_size]
                 
-                for product_id in batch:
-                    result = self.generate_vectors_for_product(product_id)
+                for result in self._generate_vectors_for_ids(batch):
                     results['results'].append(result)
                     
                     if result['success']:
@@ -436,6 +601,76 @@ class VectorService:
                 'failed': len(product_ids)
             }
     
+    def _generate_vectors_for_ids(self, product_ids: List[UUID]) -> List[Dict[str, Any]]:
+        """Vectorize one batch: one lookup, one COPY + UPDATE, one commit."""
+        products = {
+            product.id: product
+            for product in self.db.execute(PRODUCTS_BY_IDS, {'ids': list(product_ids)}).scalars()
+        }
+        
+        results = []
+        generated = []
+        for product_id in product_ids:
+            product = products.get(product_id)
+            if product is None:
+                results.append(self._product_not_found(product_id))
+                continue
+            try:
+                result, vectors = self._vectorize_product(product, force_regenerate=False)
+            except Exception as e:
+                logger.error(f"Failed to generate vectors for product {product_id}: {e}")
+                result, vectors = {'success': False, 'error': str(e), 'product_id': str(product_id)}, None
+            results.append(result)
+            if vectors is not None:
+                generated.append((product_id, vectors, len(results) - 1))
+        
+        if not generated:
+            return results
+        
+        try:
+            self._copy_vectors([(product_id, vectors) for product_id, vectors, _ in generated])
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save vectors for batch: {e}")
+            self.db.rollback()
+            for product_id, _, position in generated:
+                results[position] = {'success': False, 'error': str(e), 'product_id': str(product_id)}
+            return results
+        
+        for product_id, vectors, _ in generated:
+            self._index_product_vectors(product_id, vectors)
+        logger.info(f"Successfully generated vectors for {len(generated)} products")
+        return results
+    
+    def _copy_vectors(self, rows: List[Tuple[UUID, Dict[str, Any]]]):
+        """Write a batch of vectors with COPY into a staging table and one UPDATE ... FROM.
+        
+        Runs inside the session's transaction; the caller commits.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for product_id, vectors in rows:
+            writer.writerow([
+                str(product_id),
+                _pg_array_literal(vectors['image_vector']),
+                _pg_array_literal(vectors['text_vector']),
+                _pg_array_literal(vectors['combined_vector']),
+                json.dumps(vectors['metadata'])
+            ])
+        buffer.seek(0)
+        
+        # Vectors are regenerable, so a crash losing the last batch is acceptable
+        self.db.execute(text("SET LOCAL synchronous_commit = off"))
+        self.db.execute(VECTOR_STAGE_DDL)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(VECTOR_STAGE_COPY, buffer)
+        finally:
+            cursor.close()
+        self.db.execute(VECTOR_STAGE_APPLY_SQL)
+        # Raw UPDATE: no mapper events, so drop the cached matrix here
+        invalidate_vector_matrix()
+    
     def generate_vectors_for_missing(self) -> Dict[str, Any]:
         """Generate vectors for all products that don't have them"""
         try:
@@ -484,31 +719,6 @@ class VectorService:
             if not self._has_vectors(query_product):
                 return []
             
-            # Build query for candidate products
-            query = self.db.query(Product).filter(
-                Product.id != product_id,
-                Product.combined_vector.isnot(None)  # Must have at least combined vector
-            )
-            
-            # Apply filters
-            if exclude_swiped_by:
-                swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                    Swipe.user_id == exclude_swiped_by
-                ).all())
-                query = query.filter(~Product.id.in_(swiped_ids))
-            
-            if category_filter:
-                query = query.filter(Product.category == category_filter)
-            
-            if brand_filter:
-                query = query.filter(Product.brand_id == brand_filter)
-            
-            # Get candidate products
-            candidate_products = query.all()
-            
-            if not candidate_products:
-                return []
-            
             # Prepare query vectors
             query_vectors = {}
             if query_product.image_vector:
@@ -518,25 +728,16 @@ class VectorService:
             if query_product.combined_vector:
                 query_vectors['combined_vector'] = query_product.combined_vector
             
-            # Prepare product vectors for comparison
-            product_vectors = []
-            for product in candidate_products:
-                product_vec = {'product': product}
-                if product.image_vector:
-                    product_vec['image_vector'] = product.image_vector
-                if product.text_vector:
-                    product_vec['text_vector'] = product.text_vector
-                if product.combined_vector:
-                    product_vec['combined_vector'] = product.combined_vector
-                product_vectors.append(product_vec)
-            
-            # Find similar products
-            similar_products = self.vectorizer.find_similar_products(
-                query_vectors=query_vectors,
-                product_vectors=product_vectors,
-                limit=limit,
-                weights=weights
+            # Score every candidate against the cached column-only matrix and
+            # hydrate just the top results
+            matrix = get_vector_matrix(self.db)
+            scores = matrix.score(query_vectors, weights)
+            top = matrix.top_k(
+                scores, limit,
+                exclude_ids=self._swiped_ids(exclude_swiped_by) | {product_id},
+                category=category_filter, brand_id=brand_filter
             )
+            similar_products = self._hydrate_ranked(top)
             
             return similar_products
             
@@ -555,46 +756,35 @@ class VectorService:
             if not text_vector:
                 return []
             
-            # Build query for candidate products
-            query = self.db.query(Product).filter(
-                Product.text_vector.isnot(None)
+            # Text similarity against the cached column-only matrix; products
+            # without a text vector get no score
+            matrix = get_vector_matrix(self.db)
+            sims, present = matrix.similarities(text_vector, 'text_vector')
+            scores = np.where(present, sims, -np.inf)
+            top = matrix.top_k(
+                scores, limit,
+                exclude_ids=self._swiped_ids(exclude_swiped_by),
+                category=category_filter, brand_id=brand_filter
             )
-            
-            # Apply filters
-            if exclude_swiped_by:
-                swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                    Swipe.user_id == exclude_swiped_by
-                ).all())
-                query = query.filter(~Product.id.in_(swiped_ids))
-            
-            if category_filter:
-                query = query.filter(Product.category == category_filter)
-            
-            if brand_filter:
-                query = query.filter(Product.brand_id == brand_filter)
-            
-            # Get candidate products
-            candidate_products = query.all()
-            
-            if not candidate_products:
-                return []
-            
-            # Calculate similarities
-            scored_products = []
-            for product in candidate_products:
-                similarity = self.vectorizer.calculate_similarity(
-                    text_vector, product.text_vector
-                )
-                scored_products.append((product, similarity))
-            
-            # Sort by similarity
-            scored_products.sort(key=lambda x: x[1], reverse=True)
-            return scored_products[:limit]
+            return self._hydrate_ranked(top)
             
         except Exception as e:
             logger.error(f"Failed to find similar products by text: {e}")
             return []
     
+    def _swiped_ids(self, user_id: Optional[UUID]) -> set:
+        """Ids of products the user has swiped (empty without a user)."""
+        if not user_id:
+            return set()
+        return set(self.db.execute(select(Swipe.product_id).where(Swipe.user_id == user_id)).scalars())
+    
+    def _hydrate_ranked(self, ranked: List[Tuple[UUID, float]]) -> List[Tuple[Product, float]]:
+        """Load the products for ranked (id, score) pairs in one query, keeping the order."""
+        if not ranked:
+            return []
+        products = {p.id: p for p in self.db.execute(PRODUCTS_BY_IDS, {"ids": [pid for pid, _ in ranked]}).scalars()}
+        return [(products[pid], score) for pid, score in ranked if pid in products]
+    
     def get_user_preference_vectors(self, user_id: UUID, limit_likes: int = 10) -> Dict[str, List[float]]:
         """Get aggregated preference vectors from user's liked products"""
         try:
@@ -670,39 +860,8 @@ class VectorService:
     def get_vectorization_status(self) -> Dict[str, Any]:
         """Get overall vectorization status"""
         try:
-            total_products = self.db.query(Product).count()
-            
-            products_with_image_vectors = self.db.query(Product).filter(
-                Product.image_vector.isnot(None)
-            ).count()
-            
-            products_with_text_vectors = self.db.query(Product).filter(
-                Product.text_vector.isnot(None)
-            ).count()
-            
-            products_with_combined_vectors = self.db.query(Product).filter(
-                Product.combined_vector.isnot(None)
-            ).count()
-            
-            products_with_all_vectors = self.db.query(Product).filter(
-                and_(
-                    Product.image_vector.isnot(None),
-                    Product.text_vector.isnot(None),
-                    Product.combined_vector.isnot(None)
-                )
-            ).count()
-            
-            return {
-                'total_products': total_products,
-                'with_image_vectors': products_with_image_vectors,
-                'with_text_vectors': products_with_text_vectors,
-                'with_combined_vectors': products_with_combined_vectors,
-                'with_all_vectors': products_with_all_vectors,
-                'image_coverage': round((products_with_image_vectors / total_products) * 100, 2) if total_products > 0 else 0,
-                'text_coverage': round((products_with_text_vectors / total_products) * 100, 2) if total_products > 0 else 0,
-                'combined_coverage': round((products_with_combined_vectors / total_products) * 100, 2) if total_products > 0 else 0,
-                'full_coverage': round((products_with_all_vectors / total_products) * 100, 2) if total_products > 0 else 0
-            }
+            row = self.db.execute(VECTORIZATION_STATUS_SQL).mappings().one()
+            return build_vectorization_status(row)
             
         except Exception as e:
             logger.error(f"Failed to get vectorization status: {e}")
@@ -717,22 +876,9 @@ class VectorService:
         if not vectors:
             return []
         
-        # Pad vectors to same length
-        max_len = max(len(v) for v in vectors)
-        padded_vectors = []
-        
-        for vector in vectors:
-            if len(vector) < max_len:
-                vector = vector + [0.0] * (max_len - len(vector))
-            padded_vectors.append(vector)
-        
-        # Calculate average
-        avg_vector = []
-        for i in range(max_len):
-            avg_val = sum(v[i] for v in padded_vectors) / len(padded_vectors)
-            avg_vector.append(avg_val)
-        
-        return avg_vector 
+        # Mean of the stacked, zero-padded vectors in one numpy pass; since
+        # mean(L) @ p == mean(L @ p), scoring against it averages the per-like cosines
+        return np.mean(_stack_padded(vectors), axis=0).tolist()
 
     def find_similar_products_optimized(self, product_id: UUID, limit: int = 10, 
                                       exclude_swiped_by: Optional[UUID] = None,
@@ -775,10 +921,7 @@ class VectorService:
             
             # Apply filters
             if exclude_swiped_by:
-                swiped_ids = set(r[0] for r in self.db.query(Swipe.product_id).filter(
-                    Swipe.user_id == exclude_swiped_by
-                ).all())
-                query = query.filter(~Product.id.in_(swiped_ids))
+                query = query.filter(not_swiped_by(exclude_swiped_by))
             
             if category_filter:
                 query = query.filter(Product.category == category_filter)
@@ -1165,20 +1308,12 @@ class VectorService:
             if not vectors or not weights or len(vectors) != len(weights):
                 return self._average_vectors(vectors)
             
-            # Normalize weights
+            # np.average normalizes by the weight total
             total_weight = sum(weights)
             if total_weight == 0:
                 return self._average_vectors(vectors)
             
-            normalized_weights = [w / total_weight for w in weights]
-            
-            # Calculate weighted average
-            result = []
-            for i in range(len(vectors[0])):
-                weighted_sum = sum(vectors[j][i] * normalized_weights[j] for j in range(len(vectors)))
-                result.append(weighted_sum)
-            
-            return result
+            return np.average(_stack_padded(vectors), axis=0, weights=weights).tolist()
             
         except Exception as e:
             logger.error(f"Failed to calculate weighted average: {e}")
@@ -1321,8 +1456,10 @@ class VectorService:
             
             logger.info(f"🚀 Using {index_key} index for {query_dimension}D vectors")
             
-            # Reshape query vector for FAISS
+            # Reshape query vector for FAISS; unit length so inner product is cosine
+            import faiss
             query_vector = query_vector.reshape(1, -1)
+            faiss.normalize_L2(query_vector)
             
             # Search FAISS index - expand search for more diversity
             search_limit = min(limit * 10, faiss_index.ntotal)  # Increased from 3x to 10x
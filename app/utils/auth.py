@@ -1,11 +1,23 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from argon2 import PasswordHasher
+from typing import List
+import asyncio
 import os
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Argon2id (OWASP parameters) for brand member accounts. Created once at import
+# so the parameters are derived once and reused for every hash.
+password_hasher = PasswordHasher(time_cost=3, memory_cost=46 * 1024, parallelism=1)
+
+# Hashing is CPU-bound; a dedicated pool sized to the cores keeps a burst of
+# signups from occupying the shared threadpool used by sync endpoints.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwhash")
+
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
@@ -19,6 +31,19 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password with Argon2id without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, password_hasher.hash, password)
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """Hash many passwords with Argon2id, spread across the hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(
+        loop.run_in_executor(_hash_executor, password_hasher.hash, password)
+        for password in passwords
+    ))
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -0,0 +1,97 @@
+"""
+Response cache for read-heavy, low-churn listing endpoints (fastapi-cache2 + Redis)
+"""
+import logging
+from typing import Optional
+
+import anyio.from_thread
+import redis.asyncio as aioredis
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "flikra"
+LISTING_CACHE_TTL = 120  # seconds
+VECTORIZATION_CACHE_TTL = 30  # seconds; changes as the vector queue drains
+PRODUCTS_COUNT_TTL = 600  # seconds; dropped on product writes anyway
+
+# Namespaces, so writes can drop just the listings they affect
+BRANDS_NAMESPACE = "brands"
+CATEGORIES_NAMESPACE = "categories"
+TAGS_NAMESPACE = "tags"
+VECTORIZATION_NAMESPACE = "vectorization"
+CATALOGUE_NAMESPACE = "catalogue"
+
+# Product listings derived from the products table, dropped on product writes
+PRODUCT_LISTING_NAMESPACES = (CATEGORIES_NAMESPACE, TAGS_NAMESPACE, VECTORIZATION_NAMESPACE, CATALOGUE_NAMESPACE)
+
+async def init_response_cache():
+    """Initialise the cache backend (await from app startup)."""
+    try:
+        redis = aioredis.from_url("redis://localhost:6379/0")
+        # from_url connects lazily; ping so an unreachable Redis falls back here
+        await redis.ping()
+        FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX)
+        logger.info("✅ Response cache using Redis")
+    except Exception as e:
+        FastAPICache.init(InMemoryBackend(), prefix=CACHE_PREFIX)
+        logger.warning(f"⚠️ Redis not available, response cache is in-process: {e}")
+
+def endpoint_key_builder(
+    func,
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: tuple = (),
+    kwargs: Optional[dict] = None,
+) -> str:
+    """Key on the endpoint and its query string only.
+
+    The default builder hashes all kwargs, which include the per-request DB
+    session, so no two requests would ever share a key. The namespace passed
+    in already carries the cache prefix, so keys land under the
+    "<prefix>:<namespace>:" pattern that FastAPICache.clear deletes.
+    """
+    query = str(request.query_params) if request else ""
+    return f"{namespace}:{func.__module__}.{func.__name__}:{query}"
+
+def _value_key(namespace: str, name: str) -> str:
+    return f"{FastAPICache.get_prefix()}:{namespace}:{name}"
+
+async def get_cached_int(namespace: str, name: str) -> Optional[int]:
+    """A cached integer (e.g. a count), or None on a miss."""
+    try:
+        value = await FastAPICache.get_backend().get(_value_key(namespace, name))
+        return int(value) if value is not None else None
+    except Exception as e:
+        logger.warning(f"⚠️ Response cache read failed for {namespace}:{name}: {e}")
+        return None
+
+async def set_cached_int(namespace: str, name: str, value: int, expire: int):
+    """Cache an integer under a namespace, so clearing the namespace drops it."""
+    try:
+        await FastAPICache.get_backend().set(_value_key(namespace, name), str(value).encode(), expire)
+    except Exception as e:
+        logger.warning(f"⚠️ Response cache write failed for {namespace}:{name}: {e}")
+
+async def clear_namespace(namespace: str):
+    """Drop every cached response in a namespace."""
+    try:
+        await FastAPICache.clear(namespace=namespace)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to clear response cache namespace {namespace}: {e}")
+
+async def clear_namespaces(*namespaces: str):
+    """clear_namespace for several namespaces."""
+    for namespace in namespaces:
+        await clear_namespace(namespace)
+
+def clear_namespace_sync(namespace: str):
+    """clear_namespace for sync endpoints running in the threadpool."""
+    anyio.from_thread.run(clear_namespace, namespace)
@@ -187,6 +187,10 @@ class ProductVectorizer:
             elif vectors['text_vector']:
                 vectors['combined_vector'] = vectors['text_vector']
             
+            # Stored vectors are unit length, so cosine similarity is a plain dot product
+            for vector_type in ('image_vector', 'text_vector', 'combined_vector'):
+                vectors[vector_type] = l2_normalize(vectors[vector_type])
+            
             # Add metadata
             vectors['metadata'] = {
                 'generated_at': datetime.utcnow().isoformat(),
@@ -295,91 +299,92 @@ class ProductVectorizer:
         logger.info(f"📊 Query vectors available: {list(query_vectors.keys())}")
         logger.info(f"⚖️ Weights: {weights}")
         
-        scored_products = []
+        n = len(product_vectors)
+        total_scores = np.zeros(n)
+        score_counts = np.zeros(n)
+        components = {}
         
-        for i, product_vec in enumerate(product_vectors):
-            product = product_vec['product']
-            total_score = 0.0
-            score_count = 0
-            individual_scores = {}
-            
-            # Image similarity
-            if ('image_vector' in query_vectors and 
-                product_vec.get('image_vector') and 
-                weights.get('image_similarity', 0) > 0):
-                
-                img_sim = self.calculate_similarity(
-                    query_vectors['image_vector'], 
-                    product_vec['image_vector']
-                )
-                weighted_img_score = img_sim * weights['image_similarity']
-                total_score += weighted_img_score
-                score_count += 1
-                individual_scores['image_similarity'] = {
-                    'raw_score': img_sim,
-                    'weighted_score': weighted_img_score,
-                    'weight': weights['image_similarity']
-                }
-                
-                logger.debug(f"📸 Product {product.name}: Image similarity = {img_sim:.4f} (weighted: {weighted_img_score:.4f})")
-            
-            # Text similarity
-            if ('text_vector' in query_vectors and 
-                product_vec.get('text_vector') and 
-                weights.get('text_similarity', 0) > 0):
-                
-                txt_sim = self.calculate_similarity(
-                    query_vectors['text_vector'], 
-                    product_vec['text_vector']
-                )
-                weighted_txt_score = txt_sim * weights['text_similarity']
-                total_score += weighted_txt_score
-                score_count += 1
-                individual_scores['text_similarity'] = {
-                    'raw_score': txt_sim,
-                    'weighted_score': weighted_txt_score,
-                    'weight': weights['text_similarity']
-                }
-                
-                logger.debug(f"📝 Product {product.name}: Text similarity = {txt_sim:.4f} (weighted: {weighted_txt_score:.4f})")
-            
-            # Combined vector similarity (fallback)
-            if score_count == 0 and product_vec.get('combined_vector'):
-                if 'combined_vector' in query_vectors:
-                    combined_sim = self.calculate_similarity(
-                        query_vectors['combined_vector'], 
-                        product_vec['combined_vector']
-                    )
-                    total_score = combined_sim
-                    score_count = 1
-                    individual_scores['combined_similarity'] = {
-                        'raw_score': combined_sim,
-                        'weighted_score': combined_sim,
-                        'weight': 1.0
-                    }
-                    
-                    logger.debug(f"🔄 Product {product.name}: Combined similarity = {combined_sim:.4f}")
-            
-            # Normalize score
-            if score_count > 0:
-                final_score = total_score / score_count
-                scored_products.append((product, final_score, individual_scores))
-                
-                logger.debug(f"🎯 Product {product.name}: Final score = {final_score:.4f} (from {score_count} vector types)")
-            else:
-                logger.debug(f"❌ Product {product.name}: No vector similarity calculated")
+        # One matrix-vector product per vector type instead of a Python loop per product
+        for vector_key, weight_key in (('image_vector', 'image_similarity'), ('text_vector', 'text_similarity')):
+            weight = weights.get(weight_key, 0)
+            if vector_key not in query_vectors or weight <= 0:
+                continue
+            sims, present = _cosine_similarities(
+                query_vectors[vector_key], [pv.get(vector_key) for pv in product_vectors]
+            )
+            total_scores += np.where(present, sims * weight, 0.0)
+            score_counts += present
+            components[weight_key] = (sims, present, weight)
+        
+        # Combined vector similarity (fallback for products with no other score)
+        if 'combined_vector' in query_vectors:
+            sims, present = _cosine_similarities(
+                query_vectors['combined_vector'], [pv.get('combined_vector') for pv in product_vectors]
+            )
+            use_combined = present & (score_counts == 0)
+            total_scores = np.where(use_combined, sims, total_scores)
+            score_counts = np.where(use_combined, 1, score_counts)
+            components['combined_similarity'] = (sims, use_combined, 1.0)
         
-        # Sort by similarity score
-        scored_products.sort(key=lambda x: x[1], reverse=True)
+        # Normalize score
+        scored = np.flatnonzero(score_counts > 0)
+        final_scores = total_scores[scored] / score_counts[scored]
+        
+        # Top-k without sorting every candidate
+        if limit < len(scored):
+            top = np.argpartition(-final_scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scored))
+        top = top[np.argsort(-final_scores[top], kind='stable')]
         
         logger.info(f"🏆 Top 5 similarity scores:")
-        for i, (product, score, scores) in enumerate(scored_products[:5]):
-            logger.info(f"  {i+1}. {product.name}: {score:.4f}")
-            for score_type, score_data in scores.items():
-                logger.info(f"     - {score_type}: {score_data['raw_score']:.4f} (weighted: {score_data['weighted_score']:.4f})")
+        for rank, position in enumerate(top[:5], start=1):
+            i = scored[position]
+            logger.info(f"  {rank}. {product_vectors[i]['product'].name}: {final_scores[position]:.4f}")
+            for score_type, (sims, present, weight) in components.items():
+                if present[i]:
+                    logger.info(f"     - {score_type}: {sims[i]:.4f} (weighted: {sims[i] * weight:.4f})")
         
         # Return only the top results
-        return [(product, score) for product, score, _ in scored_products[:limit]]
+        return [(product_vectors[scored[position]]['product'], float(final_scores[position])) for position in top]
+
+def _cosine_similarities(query_vector: List[float], vectors: List[Optional[List[float]]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Cosine similarity of one query against many vectors in a single matmul.
+    
+    Returns (similarities, present) where present marks candidates that have a
+    vector. Shorter vectors are zero-padded, as in calculate_similarity.
+    """
+    present = np.array([bool(v) for v in vectors], dtype=bool)
+    sims = np.zeros(len(vectors))
+    if not query_vector or not present.any():
+        return sims, present
+    
+    rows = [v for v in vectors if v]
+    dim = max(len(query_vector), max(len(row) for row in rows))
+    matrix = np.zeros((len(rows), dim))
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    query = np.zeros(dim)
+    query[:len(query_vector)] = query_vector
+    
+    query_norm = np.linalg.norm(query)
+    if query_norm == 0:
+        return sims, present
+    norms = np.linalg.norm(matrix, axis=1)
+    dots = matrix @ query
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sims[present] = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+    return sims, present
+
+def l2_normalize(vector: Optional[List[float]]) -> Optional[List[float]]:
+    """Unit-length copy of a vector (zero and empty vectors are returned as is)."""
+    if not vector:
+        return vector
+    array = np.asarray(vector, dtype=np.float64)
+    norm = np.linalg.norm(array)
+    if norm == 0:
+        return [float(x) for x in vector]
+    return (array / norm).tolist()
 
 # Global vectorizer instance
 _vectorizer = None
@@ -16,7 +16,7 @@ sys.path.append('app')
 
 from app.db import get_db
 from app.models import Product
-from app.services.vector_service import VectorService
+from app.services.vector_service import VectorService, create_ann_index
 
 def build_faiss_indexes():
     """Build FAISS indexes for all vector types"""
@@ -83,12 +83,12 @@ def build_faiss_indexes():
             if vectors:
                 vectors = np.vstack(vectors)
                 
-                # Create FAISS index for this dimension
-                index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-                
                 # Normalize vectors for cosine similarity
                 faiss.normalize_L2(vectors)
                 
+                # Create FAISS index for this dimension (HNSW over 8-bit quantized vectors)
+                index = create_ann_index(dimension, vectors)
+                
                 # Add vectors to index
                 index.add(vectors)
                 
@@ -119,8 +119,8 @@ def build_faiss_indexes():
             image_vectors = np.vstack(image_vectors)
             dimension = image_vectors.shape[1]
             
-            index = faiss.IndexFlatIP(dimension)
             faiss.normalize_L2(image_vectors)
+            index = create_ann_index(dimension, image_vectors)
             index.add(image_vectors)
             
             index_path = indexes_dir / "image_index.faiss"
@@ -147,8 +147,8 @@ def build_faiss_indexes():
             text_vectors = np.vstack(text_vectors)
             dimension = text_vectors.shape[1]
             
-            index = faiss.IndexFlatIP(dimension)
             faiss.normalize_L2(text_vectors)
+            index = create_ann_index(dimension, text_vectors)
             index.add(text_vectors)
             
             index_path = indexes_dir / "text_index.faiss"
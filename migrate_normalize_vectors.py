@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration script to normalize product vectors stored before vectors were
+written unit length (one-off; new vectors are normalized when generated)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from app.db import engine
+
+def normalize_vectors():
+    """Rescale every non-unit product vector to unit length."""
+    
+    print("🔧 Normalizing product vectors...")
+    
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION pg_temp.l2_norm(v float8[])
+            RETURNS float8 LANGUAGE sql IMMUTABLE
+            AS $$ SELECT sqrt(sum(x * x)) FROM unnest(v) AS x $$
+        """))
+        conn.execute(text("""
+            CREATE OR REPLACE FUNCTION pg_temp.l2_normalize(v float8[])
+            RETURNS float8[] LANGUAGE sql IMMUTABLE
+            AS $$
+                SELECT CASE WHEN coalesce(n, 0) = 0 THEN v
+                       ELSE ARRAY(SELECT x / n FROM unnest(v) WITH ORDINALITY AS u(x, i) ORDER BY i)
+                       END
+                FROM (SELECT pg_temp.l2_norm(v) AS n) AS s
+            $$
+        """))
+        result = conn.execute(text("""
+            UPDATE products
+            SET image_vector = pg_temp.l2_normalize(image_vector),
+                text_vector = pg_temp.l2_normalize(text_vector),
+                combined_vector = pg_temp.l2_normalize(combined_vector)
+            WHERE abs(coalesce(nullif(pg_temp.l2_norm(image_vector), 0), 1) - 1) > 1e-6
+               OR abs(coalesce(nullif(pg_temp.l2_norm(text_vector), 0), 1) - 1) > 1e-6
+               OR abs(coalesce(nullif(pg_temp.l2_norm(combined_vector), 0), 1) - 1) > 1e-6
+        """))
+        
+        # Commit changes
+        conn.commit()
+        
+        print(f"✅ Normalized vectors of {result.rowcount} products")
+
+if __name__ == "__main__":
+    try:
+        normalize_vectors()
+    except Exception as e:
+        print(f"❌ Error normalizing vectors: {e}")
+        sys.exit(1)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script to check cold-start paging through the popular pool and on into the catalogue
+"""
+import sys
+import os
+import uuid
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.routers.recommendations import _popular_page, _cold_start_split
+
+def cold_start_page(pool_ids, catalogue_ids, offset, limit):
+    """One page the way recommend builds it: pool ids, then the catalogue (pool excluded)."""
+    pool_page, catalogue_offset = _cold_start_split(pool_ids, offset, limit)
+    rest = [p for p in catalogue_ids if p not in pool_ids]
+    return pool_page + rest[catalogue_offset:catalogue_offset + limit - len(pool_page)]
+
+def test_popular_page():
+    """_popular_page skips swiped ids and returns None once the pool can't fill a page"""
+
+    pool_ids = [uuid.uuid4() for _ in range(10)]
+    swiped_ids = {pool_ids[1], pool_ids[4]}
+    unswiped = [p for p in pool_ids if p not in swiped_ids]
+
+    assert _popular_page(pool_ids, swiped_ids, 0, 3) == unswiped[:3]
+    assert _popular_page(pool_ids, swiped_ids, 3, 3) == unswiped[3:6]
+    assert _popular_page(pool_ids, swiped_ids, 6, 2) == unswiped[6:8]
+    # 8 unswiped ids: a page that would run past them is not served from the pool
+    assert _popular_page(pool_ids, swiped_ids, 6, 3) is None
+    assert _popular_page(pool_ids, swiped_ids, 9, 3) is None
+    assert _popular_page([], set(), 0, 1) is None
+    print('✅ _popular_page')
+
+def test_cold_start_pages_cover_pool_then_catalogue():
+    """Consecutive pages serve every pool product, then every other product, once each"""
+
+    catalogue_ids = sorted((uuid.uuid4() for _ in range(23)), reverse=True)  # id DESC, like the query
+    for pool_size in (0, 1, 7, 10, 23):
+        # The pool is a subset of the catalogue, in popularity (not id) order
+        pool_ids = catalogue_ids[::2][:pool_size][::-1]
+        expected = pool_ids + [p for p in catalogue_ids if p not in pool_ids]
+        for limit in (1, 3, 5, 20):
+            served = []
+            offset = 0
+            while True:
+                page = cold_start_page(pool_ids, catalogue_ids, offset, limit)
+                if not page:
+                    break
+                # Every page is full until both pool and catalogue are exhausted
+                assert len(page) == limit or offset + len(page) == len(expected)
+                served += page
+                offset += limit
+            assert served == expected, f'pool {pool_size}, limit {limit}: pages skip or repeat products'
+        print(f'✅ pool of {pool_size}: every page size serves pool then catalogue exactly once')
+
+if __name__ == "__main__":
+    test_popular_page()
+    test_cold_start_pages_cover_pool_then_catalogue()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test script to check random product picks (one index seek per product, topped up on collisions)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import get_db
+from app.models import Product
+from app.services.random_products import random_products
+
+def test_random_products():
+    """Picks are unique, stay inside the query and fill the page while rows remain"""
+
+    db = next(get_db())
+
+    try:
+        product_ids = [row.id for row in db.query(Product.id).limit(4).all()]
+        assert product_ids, 'needs at least one product in the database'
+        query = db.query(Product).filter(Product.id.in_(product_ids))
+
+        for limit in range(1, len(product_ids) + 3):
+            # Repeat: with this few rows, pivots often share a gap and need the top-up
+            for _ in range(20):
+                picked = [product.id for product in random_products(query, limit)]
+                assert len(picked) == len(set(picked)), f'limit {limit}: duplicate picks'
+                assert set(picked) <= set(product_ids), f'limit {limit}: pick outside the query'
+                # Pool exhaustion: a page is short only once every row has been picked
+                assert len(picked) == min(limit, len(product_ids)), f'limit {limit}: got {len(picked)}'
+            print(f'✅ limit {limit}: {min(limit, len(product_ids))} unique products')
+
+        # Nothing matches: no picks, no error
+        assert random_products(db.query(Product).filter(Product.id.in_([])), 3) == []
+        print('✅ empty query')
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    test_random_products()
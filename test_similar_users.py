@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script to check SIMILAR_USERS_SQL against the per-user Jaccard loop it replaced
+"""
+import sys
+import os
+import uuid
+from collections import defaultdict
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import get_db
+from app.models import Product, User, Swipe
+from app.services.recommendations import SIMILAR_USERS_SQL
+
+def reference_similar_users(db, user_id, user_likes, min_similarity, limit=10):
+    """Jaccard similarity against every other user with a like, as _find_similar_users computed it."""
+    likes_by_user = defaultdict(set)
+    for other_user_id, product_id in db.query(Swipe.user_id, Swipe.product_id).filter(Swipe.action == "right"):
+        likes_by_user[other_user_id].add(product_id)
+
+    similar_users = []
+    for other_user_id, other_likes in likes_by_user.items():
+        if other_user_id == user_id:
+            continue
+        intersection = len(user_likes & other_likes)
+        similarity = intersection / len(user_likes | other_likes)
+        if similarity >= min_similarity:
+            similar_users.append({'user_id': other_user_id, 'similarity': similarity, 'common_likes': intersection})
+    similar_users.sort(key=lambda x: x['similarity'], reverse=True)
+    return similar_users[:limit]
+
+def test_similar_users():
+    """Fixture users with known overlaps rank and score the same both ways"""
+
+    db = next(get_db())
+
+    try:
+        # Fixture, rolled back at the end
+        products = [Product(id=uuid.uuid4(), name=f'Similarity fixture {i}') for i in range(6)]
+        users = [User(id=uuid.uuid4(), email=f'similarity-{uuid.uuid4()}@example.com') for _ in range(5)]
+        db.add_all(products + users)
+        db.flush()
+        likes = {
+            0: [0, 1, 2, 3],  # the user we look up
+            1: [0, 1, 2],     # 3/4
+            2: [0, 4, 5],     # 1/6
+            3: [4],           # no overlap
+            4: [0, 1, 2, 3],  # identical
+        }
+        for user_index, product_indexes in likes.items():
+            for product_index in product_indexes:
+                db.add(Swipe(user_id=users[user_index].id, product_id=products[product_index].id, action="right"))
+        # A dislike never counts towards either side
+        db.add(Swipe(user_id=users[2].id, product_id=products[1].id, action="left"))
+        db.flush()
+
+        user_id = users[0].id
+        user_likes = {products[i].id for i in likes[0]}
+        for min_similarity in (0.0, 0.1, 0.3, 0.8):
+            rows = db.execute(SIMILAR_USERS_SQL, {
+                "user_id": user_id,
+                "likes": list(user_likes),
+                "like_count": len(user_likes),
+                "min_similarity": min_similarity,
+                "limit": 10,
+            }).all()
+            actual = {row.user_id: (row.similarity, row.common_likes) for row in rows}
+            # Every qualifying user, so ties at the limit can't make the check flaky.
+            # The SQL never reads users without a common like; the loop kept them
+            # at similarity 0 when min_similarity was 0.
+            reference = {
+                user['user_id']: user
+                for user in reference_similar_users(db, user_id, user_likes, min_similarity, limit=None)
+                if user['common_likes'] > 0
+            }
+            
+            expected_similarities = sorted((user['similarity'] for user in reference.values()), reverse=True)[:10]
+            assert len(rows) == len(expected_similarities), f'min {min_similarity}: {len(rows)} != {len(expected_similarities)} users'
+            for row, expected_similarity in zip(rows, expected_similarities):
+                assert abs(row.similarity - expected_similarity) < 1e-9, 'not ordered by similarity'
+                user = reference[row.user_id]
+                assert abs(row.similarity - user['similarity']) < 1e-9
+                assert row.common_likes == user['common_likes']
+            
+            fixture = {users[i].id: i for i in range(1, 5)}
+            found = sorted(fixture[u] for u in actual if u in fixture)
+            print(f'✅ min_similarity {min_similarity}: fixture users {found}, {len(rows)} users in total')
+    finally:
+        db.rollback()
+        db.close()
+
+if __name__ == "__main__":
+    test_similar_users()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script to check the product term index against the per-product semantic search scoring it replaced
+"""
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.term_index import ProductTermIndex
+
+PRODUCTS = [
+    SimpleNamespace(id=uuid.uuid4(), name="Red Summer Dress", description="Light linen dress for summer",
+                    category="Dresses", color="Red", tags=["Summer", "Linen"], brand_name="Sunny"),
+    SimpleNamespace(id=uuid.uuid4(), name="Blue Denim Jacket", description=None,
+                    category="Jackets", color="Blue", tags=["denim"], brand_name="Redwood"),
+    SimpleNamespace(id=uuid.uuid4(), name="Wool Scarf", description="Warm winter scarf",
+                    category="Accessories", color=None, tags=None, brand_name=None),
+    SimpleNamespace(id=uuid.uuid4(), name="Summerland Tee", description="Cotton tee",
+                    category="T-Shirts", color="White", tags=[], brand_name="Sunny"),
+]
+
+QUERIES = [
+    "summer",          # whole word in name, description and tags
+    "red",             # substring of "redwood" (brand) as well as the color
+    "dress summer",    # several terms; "dress" is also a substring of "dresses"
+    "SUMMER summer",   # case and a repeated term
+    "den",             # prefix of a tag and a name term
+    "scarf winter",
+    "nothing",         # no match at all
+]
+
+def reference_score(product, query_text):
+    """The scoring loop SearchService.semantic_search ran for every product."""
+    query_terms = query_text.lower().split()
+    score = 0
+
+    product_name_terms = product.name.lower().split()
+    score += sum(1 for term in query_terms if any(term in name_term for name_term in product_name_terms)) * 0.3
+
+    if product.description:
+        desc_terms = product.description.lower().split()
+        score += sum(1 for term in query_terms if any(term in desc_term for desc_term in desc_terms)) * 0.2
+
+    if product.category and any(term in product.category.lower() for term in query_terms):
+        score += 0.2
+
+    if product.tags:
+        score += sum(1 for term in query_terms if any(term in tag.lower() for tag in product.tags)) * 0.1
+
+    if product.color and any(term in product.color.lower() for term in query_terms):
+        score += 0.1
+
+    if product.brand_name and any(term in product.brand_name.lower() for term in query_terms):
+        score += 0.1
+
+    return score
+
+def test_term_index_matches_reference():
+    """Every query scores every product exactly as the old loop did"""
+
+    index = ProductTermIndex(PRODUCTS)
+
+    for query_text in QUERIES:
+        scores = index.score(query_text)
+        for product in PRODUCTS:
+            expected = reference_score(product, query_text)
+            actual = scores.get(product.id, 0)
+            assert abs(actual - expected) < 1e-9, f'{query_text!r} / {product.name}: {actual} != {expected}'
+            # Products that match nothing are left out, as the old loop did
+            assert (product.id in scores) == (expected > 0)
+        print(f'✅ {query_text!r}: {len(scores)} matching products')
+
+def test_term_index_top():
+    """top() orders by score and cuts at the limit"""
+
+    index = ProductTermIndex(PRODUCTS)
+
+    top = index.top("summer", 2)
+    expected = sorted(((p.id, reference_score(p, "summer")) for p in PRODUCTS), key=lambda x: x[1], reverse=True)[:2]
+    assert [round(score, 9) for _, score in top] == [round(score, 9) for _, score in expected]
+    assert top[0][0] == PRODUCTS[0].id
+    print(f'✅ top("summer", 2): {[round(score, 2) for _, score in top]}')
+
+if __name__ == "__main__":
+    test_term_index_matches_reference()
+    test_term_index_top()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script to check the product vector matrix against per-product similarity scoring
+"""
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from app.services.vector_matrix import ProductVectorMatrix
+
+WEIGHTS = {'image_similarity': 0.6, 'text_similarity': 0.4}
+BRANDS = [uuid.uuid4(), uuid.uuid4()]
+
+def random_vector(rng, dim=8, scale=1.0):
+    return (rng.normal(size=dim) * scale).tolist()
+
+def make_products(rng):
+    """Products with every mix of vectors, some not unit length."""
+    products = []
+    for i in range(12):
+        products.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            category='Dresses' if i % 3 == 0 else 'Jackets',
+            brand_id=BRANDS[i % 2],
+            # Every fourth product has no image vector, every fifth no text vector
+            image_vector=None if i % 4 == 0 else random_vector(rng, scale=i + 1),
+            text_vector=None if i % 5 == 0 else random_vector(rng),
+            combined_vector=random_vector(rng),
+        ))
+    # Only a combined vector: scored through the fallback
+    products.append(SimpleNamespace(id=uuid.uuid4(), category='Dresses', brand_id=BRANDS[0],
+                                    image_vector=None, text_vector=None, combined_vector=random_vector(rng)))
+    # No vectors at all: never scored
+    products.append(SimpleNamespace(id=uuid.uuid4(), category='Dresses', brand_id=BRANDS[0],
+                                    image_vector=None, text_vector=None, combined_vector=None))
+    return products
+
+def cosine(v1, v2):
+    v1, v2 = np.asarray(v1, dtype=np.float64), np.asarray(v2, dtype=np.float64)
+    norm1, norm2 = np.linalg.norm(v1), np.linalg.norm(v2)
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+    return float(v1 @ v2 / (norm1 * norm2))
+
+def reference_score(product, query_vectors, weights):
+    """Per-product scoring as ProductVectorizer.find_similar_products did it, or None."""
+    total, count = 0.0, 0
+    for vector_key, weight_key in (('image_vector', 'image_similarity'), ('text_vector', 'text_similarity')):
+        product_vector = getattr(product, vector_key)
+        if vector_key in query_vectors and weights.get(weight_key, 0) > 0 and product_vector:
+            total += cosine(query_vectors[vector_key], product_vector) * weights[weight_key]
+            count += 1
+    if count == 0 and 'combined_vector' in query_vectors and product.combined_vector:
+        total, count = cosine(query_vectors['combined_vector'], product.combined_vector), 1
+    return total / count if count else None
+
+def reference_top_k(products, query_vectors, weights, k, exclude_ids=(), category=None, brand_id=None):
+    scored = []
+    for product in products:
+        score = reference_score(product, query_vectors, weights)
+        if score is None or product.id in exclude_ids:
+            continue
+        if (category and product.category != category) or (brand_id and product.brand_id != brand_id):
+            continue
+        scored.append((product.id, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:k]
+
+def assert_same_ranking(actual, expected):
+    assert [product_id for product_id, _ in actual] == [product_id for product_id, _ in expected], 'ranking differs'
+    for (_, actual_score), (_, expected_score) in zip(actual, expected):
+        assert abs(actual_score - expected_score) < 1e-5, f'{actual_score} != {expected_score}'
+
+def test_vector_matrix_scores():
+    """score() matches the per-product loop, including the combined-vector fallback"""
+
+    rng = np.random.default_rng(42)
+    products = make_products(rng)
+    matrix = ProductVectorMatrix(products)
+
+    for name, query_vectors in (
+        ('all vectors', {key: random_vector(rng) for key in ('image_vector', 'text_vector', 'combined_vector')}),
+        ('text and combined', {'text_vector': random_vector(rng), 'combined_vector': random_vector(rng)}),
+        ('combined only', {'combined_vector': random_vector(rng)}),
+    ):
+        scores = matrix.score(query_vectors, WEIGHTS)
+        for row, product in enumerate(products):
+            expected = reference_score(product, query_vectors, WEIGHTS)
+            if expected is None:
+                assert not np.isfinite(scores[row]), f'{name}: row {row} should not be scored'
+            else:
+                assert abs(scores[row] - expected) < 1e-5, f'{name}: row {row}: {scores[row]} != {expected}'
+        print(f'✅ score() with {name}: {int(np.isfinite(scores).sum())}/{len(products)} products scored')
+
+def test_vector_matrix_top_k():
+    """top_k() applies exclusions and filters and ranks like the reference"""
+
+    rng = np.random.default_rng(7)
+    products = make_products(rng)
+    matrix = ProductVectorMatrix(products)
+    query_vectors = {key: random_vector(rng) for key in ('image_vector', 'text_vector', 'combined_vector')}
+    scores = matrix.score(query_vectors, WEIGHTS)
+
+    exclude_ids = {products[1].id, products[2].id, uuid.uuid4()}  # one id not in the matrix
+    for kwargs in (
+        {},
+        {'exclude_ids': exclude_ids},
+        {'category': 'Dresses'},
+        {'brand_id': BRANDS[1], 'exclude_ids': exclude_ids},
+    ):
+        for k in (1, 5, 100):
+            actual = matrix.top_k(scores, k, **kwargs)
+            expected = reference_top_k(products, query_vectors, WEIGHTS, k, **kwargs)
+            assert_same_ranking(actual, expected)
+            if 'exclude_ids' in kwargs:
+                assert not exclude_ids & {product_id for product_id, _ in actual}
+        print(f'✅ top_k() with {sorted(kwargs) or "no filters"}')
+
+if __name__ == "__main__":
+    test_vector_matrix_scores()
+    test_vector_matrix_top_k()